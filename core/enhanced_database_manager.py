@@ -727,6 +727,58 @@ class EnhancedShamelaDatabaseManager:
         # حفظ قسم الكتاب والحصول على ID
         book_section_id = self.save_book_section(book.book_section) if book.book_section else None
         
+        if result:
+            book_id = result[0]['id']
+            edition_number_final, edition_data_int = self._book_edition_numbers(book)
+            # تحديث الكتاب الموجود
+            update_query = f"""
+                UPDATE {self.tables['books']} 
+                SET title = %s, slug = %s, publisher_id = %s, book_section_id = %s,
+                    edition = %s, edition_number = %s, edition_DATA = %s, pages_count = %s, volumes_count = %s,
+                    description = %s, source_url = %s, has_original_pagination = %s, status = %s, updated_at = %s
+                WHERE id = %s
+            """
+            self.cursor.execute(update_query, (
+                book.title, book.slug, publisher_id, book_section_id,
+                None, edition_number_final, edition_data_int, book.page_count, book.volume_count,
+                book.description, book.source_url, book.has_original_pagination, 'published', datetime.now(), book_id
+            ))
+            logger.info(f"تم تحديث الكتاب: {book.title}")
+        else:
+            # إدراج كتاب جديد
+            now = datetime.now()
+            book_id = self.execute_insert(
+                self._book_insert_query(),
+                self._book_insert_row(book, publisher_id, book_section_id, now)
+            )
+            logger.info(f"تم إدراج كتاب جديد: {book.title} (ID: {book_id})")
+        
+        return book_id
+    
+    def _book_insert_query(self) -> str:
+        """استعلام إدراج صف في جدول الكتب"""
+        return f"""
+            INSERT INTO {self.tables['books']} 
+            (title, slug, shamela_id, publisher_id, book_section_id,
+             edition, edition_number, edition_DATA, pages_count, volumes_count, 
+             description, source_url, has_original_pagination, status, visibility, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+    
+    def _book_insert_row(self, book: Book, publisher_id: Optional[int],
+                         book_section_id: Optional[int], now: datetime) -> tuple:
+        """قيم صف إدراج الكتاب بترتيب أعمدة _book_insert_query"""
+        edition_number_final, edition_data_int = self._book_edition_numbers(book)
+        return (
+            book.title, book.slug, book.shamela_id, publisher_id, book_section_id,
+            None, edition_number_final, edition_data_int, book.page_count, book.volume_count,
+            book.description, book.source_url, book.has_original_pagination, 'published', 'public',
+            now, now
+        )
+    
+    @staticmethod
+    def _book_edition_numbers(book: Book) -> Tuple[Optional[int], Optional[int]]:
+        """رقم الطبعة وسنة الطبعة الهجرية كأرقام (edition_number, edition_DATA)"""
         # تحويل edition_date_hijri إلى رقم
         edition_data_int = None
         if hasattr(book, 'edition_date_hijri') and book.edition_date_hijri:
@@ -757,40 +809,53 @@ class EnhancedShamelaDatabaseManager:
             except (ValueError, TypeError):
                 pass
         
-        if result:
-            book_id = result[0]['id']
-            # تحديث الكتاب الموجود
-            update_query = f"""
-                UPDATE {self.tables['books']} 
-                SET title = %s, slug = %s, publisher_id = %s, book_section_id = %s,
-                    edition = %s, edition_number = %s, edition_DATA = %s, pages_count = %s, volumes_count = %s,
-                    description = %s, source_url = %s, has_original_pagination = %s, status = %s, updated_at = %s
-                WHERE id = %s
-            """
-            self.cursor.execute(update_query, (
-                book.title, book.slug, publisher_id, book_section_id,
-                None, edition_number_final, edition_data_int, book.page_count, book.volume_count,
-                book.description, book.source_url, book.has_original_pagination, 'published', datetime.now(), book_id
-            ))
-            logger.info(f"تم تحديث الكتاب: {book.title}")
-        else:
-            # إدراج كتاب جديد
-            insert_query = f"""
-                INSERT INTO {self.tables['books']} 
-                (title, slug, shamela_id, publisher_id, book_section_id,
-                 edition, edition_number, edition_DATA, pages_count, volumes_count, 
-                 description, source_url, has_original_pagination, status, visibility, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            book_id = self.execute_insert(insert_query, (
-                book.title, book.slug, book.shamela_id, publisher_id, book_section_id,
-                None, edition_number_final, edition_data_int, book.page_count, book.volume_count,
-                book.description, book.source_url, book.has_original_pagination, 'published', 'public', 
-                datetime.now(), datetime.now()
-            ))
-            logger.info(f"تم إدراج كتاب جديد: {book.title} (ID: {book_id})")
+        return edition_number_final, edition_data_int
+    
+    def bulk_insert_books(self, books: List[Book]) -> int:
+        """
+        إدراج كتب جديدة دفعة واحدة عبر executemany (commit لكل دفعة)
+        الكتب بلا shamela_id والمكررة والموجودة مسبقاً تُتخطى - التحديث عبر save_enhanced_book
+        """
+        # إزالة التكرار داخل الدفعة (أول ظهور لكل shamela_id)
+        unique_books: Dict[str, Book] = {}
+        for book in books:
+            if not book.shamela_id:
+                logger.warning(f"تخطي كتاب بلا shamela_id: {book.title}")
+                continue
+            unique_books.setdefault(str(book.shamela_id), book)
+        
+        if not unique_books:
+            return 0
+        
+        # تخطي الكتب الموجودة مسبقاً باستعلام واحد
+        ids = list(unique_books)
+        placeholders = ', '.join(['%s'] * len(ids))
+        existing = self.execute_query(
+            f"SELECT shamela_id FROM {self.tables['books']} WHERE shamela_id IN ({placeholders})",
+            tuple(ids)
+        )
+        for row in existing:
+            unique_books.pop(str(row['shamela_id']), None)
         
-        return book_id
+        now = datetime.now()
+        rows = []
+        for book in unique_books.values():
+            publisher_id = self.save_publisher(book.publisher) if book.publisher else None
+            book_section_id = self.save_book_section(book.book_section) if book.book_section else None
+            rows.append(self._book_insert_row(book, publisher_id, book_section_id, now))
+        
+        query = self._book_insert_query()
+        batch_size = self.performance_config.batch_size
+        try:
+            for start in range(0, len(rows), batch_size):
+                self.execute_batch_insert(query, rows[start:start + batch_size])
+                self.connection.commit()
+        except Error:
+            self.connection.rollback()
+            raise
+        
+        logger.info(f"تم إدراج {len(rows)} كتاب (تم تخطي {len(books) - len(rows)})")
+        return len(rows)
     
     def save_volume_link(self, volume_link: VolumeLink, book_id: int) -> int:
         """حفظ رابط المجلد وإرجاع ID"""
@@ -1202,7 +1267,12 @@ class EnhancedShamelaDatabaseManager:
 def load_enhanced_book_from_json(json_path: str) -> Book:
     """تحميل كتاب محسن من ملف JSON"""
     with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+        if json_path.endswith('.jsonl'):
+            # JSON Lines: سطر لبيانات الكتاب ثم سطر لكل صفحة
+            data = json.loads(f.readline())
+            data['pages'] = [json.loads(line) for line in f if line.strip()]
+        else:
+            data = json.load(f)
     
     # تحويل البيانات إلى كائنات محسنة
     authors = [Author(**author_data) for author_data in data.get('authors', [])]
@@ -1309,6 +1379,14 @@ def save_enhanced_json_to_database(json_path: str, db_config: Dict[str, Any],
     
     return result
 
+def bulk_save_json_to_database(json_paths: List[str], db_config: Dict[str, Any],
+                               performance_config: PerformanceConfig = None) -> int:
+    """إدراج بيانات الكتب (دون الصفحات والفصول) من عدة ملفات JSON دفعة واحدة"""
+    books = [load_enhanced_book_from_json(path) for path in json_paths]
+    
+    with EnhancedShamelaDatabaseManager(db_config, performance_config) as db:
+        return db.bulk_insert_books(books)
+
 # ========= واجهة سطر الأوامر المحسنة =========
 def main():
     """الوظيفة الرئيسية المحسنة لسطر الأوامر"""
@@ -1318,9 +1396,9 @@ def main():
         description="إدارة قاعدة البيانات المحسنة للكتب المستخرجة من الشاملة"
     )
     
-    parser.add_argument('action', choices=['save', 'stats', 'create-tables'], 
+    parser.add_argument('action', choices=['save', 'bulk-save', 'stats', 'create-tables'], 
                        help='العملية المطلوبة')
-    parser.add_argument('--json', help='مسار ملف JSON للكتاب')
+    parser.add_argument('--json', nargs='+', help='مسار ملف JSON للكتاب (عدة ملفات مع bulk-save)')
     parser.add_argument('--book-id', type=int, help='معرف الكتاب في قاعدة البيانات')
     parser.add_argument('--db-host', default='localhost', help='عنوان قاعدة البيانات')
     parser.add_argument('--db-port', type=int, default=3306, help='منفذ قاعدة البيانات')
@@ -1349,7 +1427,7 @@ def main():
                 print("خطأ: يجب تحديد مسار ملف JSON")
                 return
             
-            result = save_enhanced_json_to_database(args.json, db_config)
+            result = save_enhanced_json_to_database(args.json[0], db_config)
             print(f"✓ تم حفظ الكتاب المحسن بنجاح!")
             print(f"معرف الكتاب: {result['book_id']}")
             print(f"عدد الصفحات: {result['total_pages']}")
@@ -1361,6 +1439,14 @@ def main():
             print(f"القسم: {result['book_section'] or 'غير محدد'}")
             print(f"ترقيم أصلي: {'نعم' if result['has_original_pagination'] else 'لا'}")
         
+        elif args.action == 'bulk-save':
+            if not args.json:
+                print("خطأ: يجب تحديد مسار ملف JSON")
+                return
+            
+            inserted = bulk_save_json_to_database(args.json, db_config)
+            print(f"✓ تم إدراج {inserted} كتاب من {len(args.json)} ملف")
+        
         elif args.action == 'stats':
             if not args.book_id:
                 print("خطأ: يجب تحديد معرف الكتاب")
@@ -13,13 +13,15 @@ Enhanced Shamela Runner GUI - واجهة رسومية محسنة لتشغيل ا
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
+import tkinter.font as tkfont
 import os
 import sys
 import json
 import threading
+import queue
+import asyncio
 import subprocess
 import time
-from datetime import datetime
 from pathlib import Path
 
 # المكتبات المطلوبة لاستخراج الأقسام
@@ -47,6 +49,35 @@ if sys.platform.startswith('win'):
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
+# تفريغ طابور السجل في الواجهة: كل 50 ملّي ثانية وبحد 500 سطر للدفعة
+LOG_DRAIN_INTERVAL_MS = 50
+LOG_DRAIN_BATCH = 500
+
+# حد أسطر عنصر السجل: عند تجاوزه بهامش يُحذف الأقدم دفعة واحدة
+LOG_MAX_LINES = 20000
+LOG_TRIM_SLACK = 2000
+# حفظ السجل على دفعات من الأسطر بدل نسخة نصية واحدة للعنصر كله
+LOG_SAVE_CHUNK_LINES = 2000
+# مهلة انتظار إنهاء العملية الفرعية عند إغلاق النافذة (بالثواني)
+TERMINATE_TIMEOUT = 5
+
+# معاملات قاعدة البيانات لأوامر enhanced_runner.py (بترتيب قيم _database_args)
+DB_FLAGS = ("--db-host", "--db-port", "--db-user", "--db-name", "--db-password")
+
+# طابع الوقت يُنسق مرة واحدة لكل ثانية: (الثانية، النص)
+_timestamp_cache = (None, "")
+
+def _timestamp() -> str:
+    """الوقت المحلي HH:MM:SS لرسائل السجل"""
+    global _timestamp_cache
+    now = int(time.time())
+    second, text = _timestamp_cache
+    if now != second:
+        text = time.strftime("%H:%M:%S", time.localtime(now))
+        # إسناد صف واحد - آمن مع الاستدعاء من عدة خيوط
+        _timestamp_cache = (now, text)
+    return text
+
 # كلاس مستخرج الأقسام المضمن
 class CategoryExtractor:
     """مستخرج كتب الأقسام من موقع الشاملة - مضمن في الواجهة"""
@@ -183,6 +214,26 @@ class EnhancedRunnerGUI:
         self.root.geometry("1000x800")
         self.root.configure(bg='#f0f0f0')
         
+        # طابور رسائل السجل: الخيوط العاملة تضيف والخيط الرئيسي وحده يكتب في الواجهة
+        self.log_queue = queue.Queue()
+        # طابور نتائج حلقة العمليات الفرعية: (دالة، معاملات) تُنفذ في الخيط الرئيسي عند التفريغ
+        self.ui_queue = queue.Queue()
+        # موضع آخر قراءة من ملف السجل (تحديث تدريجي بدل إعادة قراءة الملف كاملاً)
+        self._log_offset = 0
+        self._log_inode = None
+        # آخر نص معروض في شريط الحالة (لا إعادة رسم لنفس النص)
+        self._last_status_text = None
+        # مجلدا الكتب والسجلات (وجودهما يُفحص حتى يُرى مرة ثم يُعتمد)
+        self._books_folder = os.path.join(current_dir, "enhanced_books")
+        self._books_folder_exists = False
+        self._logs_folder = os.path.join(current_dir, "logs")
+        self._logs_folder_exists = False
+        # فهرس أسماء ملفات مجلد الكتب (بأحرف صغيرة) يُعاد بناؤه عند تغير المجلد
+        self._books_index_mtime = None
+        self._books_index = []
+        # مجمعات اتصالات اختبار قاعدة البيانات حسب (الخادم، المنفذ، المستخدم، القاعدة)
+        self._db_pools = {}
+        
         # متغيرات الواجهة
         self.setup_variables()
         
@@ -191,11 +242,16 @@ class EnhancedRunnerGUI:
         
         # إنشاء الواجهة
         self.create_widgets()
+        self.root.after(LOG_DRAIN_INTERVAL_MS, self._drain_logs)
         
         # متغيرات التحكم
         self.current_process = None
         self.is_running = False
         
+        # حلقة asyncio واحدة في خيط خلفي تدير كل العمليات الفرعية وأنابيبها
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="subprocess-loop", daemon=True).start()
+        
     def setup_variables(self):
         """إعداد متغيرات الواجهة"""
         # متغيرات الكتاب
@@ -223,6 +279,11 @@ class EnhancedRunnerGUI:
         self.db_password_var = tk.StringVar(value="")  # فارغة افتراضياً
         self.db_name_var = tk.StringVar(value="bms_db")
         
+        # تغيير أي من بيانات الاتصال يُسقط المجمعات القائمة
+        for db_var in (self.db_host_var, self.db_port_var, self.db_user_var,
+                       self.db_password_var, self.db_name_var):
+            db_var.trace_add('write', self._reset_db_pools)
+        
         # متغيرات التحكم
         self.operation_var = tk.StringVar(value="extract")
         self.progress_var = tk.DoubleVar()
@@ -232,6 +293,14 @@ class EnhancedRunnerGUI:
         style = ttk.Style()
         style.theme_use('clam')
         
+        # خطوط مسماة تُنشأ مرة واحدة وتشترك فيها الأنماط والعناصر بدل وصف الخط لكل عنصر
+        self._font_title = tkfont.Font(family='Arial', size=16, weight='bold')
+        self._font_heading = tkfont.Font(family='Arial', size=11, weight='bold')
+        self._font_button = tkfont.Font(family='Arial', size=10, weight='bold')
+        self._font_body = tkfont.Font(family='Arial', size=11)
+        self._font_small = tkfont.Font(family='Arial', size=9)
+        self._font_mono = tkfont.Font(family='Consolas', size=10)
+        
         # تعريف الألوان الرئيسية
         self.primary_color = "#1e88e5"  # أزرق داكن
         self.secondary_color = "#43a047"  # أخضر
@@ -249,31 +318,31 @@ class EnhancedRunnerGUI:
         # أنماط مخصصة
         style.configure('TFrame', background=self.bg_color)
         style.configure('TLabelframe', background=self.bg_color)
-        style.configure('TLabelframe.Label', background=self.bg_color, foreground=self.dark_color, font=('Arial', 11, 'bold'))
+        style.configure('TLabelframe.Label', background=self.bg_color, foreground=self.dark_color, font=self._font_heading)
         
-        style.configure('Title.TLabel', font=('Arial', 16, 'bold'), foreground=self.primary_color, background=self.bg_color)
-        style.configure('Heading.TLabel', font=('Arial', 11, 'bold'), foreground=self.dark_color, background=self.bg_color)
+        style.configure('Title.TLabel', font=self._font_title, foreground=self.primary_color, background=self.bg_color)
+        style.configure('Heading.TLabel', font=self._font_heading, foreground=self.dark_color, background=self.bg_color)
         style.configure('Success.TLabel', foreground=self.success_color, background=self.bg_color)
         style.configure('Error.TLabel', foreground=self.error_color, background=self.bg_color)
         style.configure('Warning.TLabel', foreground=self.warning_color, background=self.bg_color)
         
         # أزرار جميلة
-        style.configure('Accent.TButton', font=('Arial', 10, 'bold'), background=self.primary_color, foreground=self.light_color)
-        style.configure('Success.TButton', font=('Arial', 10, 'bold'), background=self.success_color, foreground=self.light_color)
-        style.configure('Warning.TButton', font=('Arial', 10, 'bold'), background=self.warning_color, foreground=self.light_color)
-        style.configure('Error.TButton', font=('Arial', 10, 'bold'), background=self.error_color, foreground=self.light_color)
+        style.configure('Accent.TButton', font=self._font_button, background=self.primary_color, foreground=self.light_color)
+        style.configure('Success.TButton', font=self._font_button, background=self.success_color, foreground=self.light_color)
+        style.configure('Warning.TButton', font=self._font_button, background=self.warning_color, foreground=self.light_color)
+        style.configure('Error.TButton', font=self._font_button, background=self.error_color, foreground=self.light_color)
         
         # أنماط للتبويبات الرئيسية
         style.configure('LeftPane.TNotebook', background=self.primary_color, borderwidth=0)
         style.map('LeftPane.TNotebook.Tab', background=[('selected', self.light_color), ('!selected', self.primary_color)],
                  foreground=[('selected', self.primary_color), ('!selected', self.light_color)])
-        style.configure('LeftPane.TNotebook.Tab', font=('Arial', 11, 'bold'), padding=[15, 10], background=self.primary_color, foreground=self.light_color)
+        style.configure('LeftPane.TNotebook.Tab', font=self._font_heading, padding=[15, 10], background=self.primary_color, foreground=self.light_color)
         
         # أنماط شريط التقدم
         style.configure('TProgressbar', background=self.primary_color, troughcolor=self.bg_color, borderwidth=0)
         
         # أنماط قائمة الملفات
-        style.configure('TListbox', background=self.light_color, font=('Arial', 9))
+        style.configure('TListbox', background=self.light_color, font=self._font_small)
         
     def create_widgets(self):
         """إنشاء عناصر الواجهة"""
@@ -299,11 +368,17 @@ class EnhancedRunnerGUI:
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=5)
         
         # إنشاء التبويبات
+        self._db_config_frame = None
+        self._db_config_slots = {}
         self.create_extract_tab()
         self.create_database_tab()
         self.create_category_tab()
         self.create_management_tab()
         
+        # إطار إعدادات قاعدة البيانات المشترك يتبع التبويب المعروض
+        self.notebook.bind('<<NotebookTabChanged>>', self._place_database_config)
+        self._place_database_config()
+        
         # إضافة الجزء الأيسر للحاوي الرئيسي
         main_container.add(left_frame, weight=3)
         
@@ -350,19 +425,19 @@ class EnhancedRunnerGUI:
         # معرف الكتاب
         ttk.Label(book_frame, text="معرف الكتاب:", style='Heading.TLabel').grid(
             row=0, column=0, sticky=tk.W, padx=(0, 10))
-        book_entry = ttk.Entry(book_frame, textvariable=self.book_id_var, width=15, font=('Arial', 11))
+        book_entry = ttk.Entry(book_frame, textvariable=self.book_id_var, width=15, font=self._font_body)
         book_entry.grid(row=0, column=1, sticky=tk.W, padx=(0, 20))
         
         # عدد الصفحات المحدود
         ttk.Label(book_frame, text="عدد الصفحات (اختياري):", style='Heading.TLabel').grid(
             row=0, column=2, sticky=tk.W, padx=(0, 10))
-        pages_entry = ttk.Entry(book_frame, textvariable=self.max_pages_var, width=15, font=('Arial', 11))
+        pages_entry = ttk.Entry(book_frame, textvariable=self.max_pages_var, width=15, font=self._font_body)
         pages_entry.grid(row=0, column=3, sticky=tk.W)
         
         # مجلد الإخراج
         ttk.Label(book_frame, text="مجلد الإخراج (اختياري):", style='Heading.TLabel').grid(
             row=1, column=0, sticky=tk.W, padx=(0, 10), pady=(10, 0))
-        output_entry = ttk.Entry(book_frame, textvariable=self.output_dir_var, width=40, font=('Arial', 9))
+        output_entry = ttk.Entry(book_frame, textvariable=self.output_dir_var, width=40, font=self._font_small)
         output_entry.grid(row=1, column=1, columnspan=2, sticky=(tk.W, tk.E), padx=(0, 10), pady=(10, 0))
         browse_btn = ttk.Button(book_frame, text="تصفح", command=self.browse_output_dir)
         browse_btn.grid(row=1, column=3, sticky=tk.W, pady=(10, 0))
@@ -414,7 +489,7 @@ class EnhancedRunnerGUI:
         # اختيار ملف JSON واحد
         ttk.Label(single_upload_frame, text="ملف JSON:", style='Heading.TLabel').grid(
             row=0, column=0, sticky=tk.W, padx=(0, 10))
-        json_entry = ttk.Entry(single_upload_frame, textvariable=self.json_file_var, width=50, font=('Arial', 9))
+        json_entry = ttk.Entry(single_upload_frame, textvariable=self.json_file_var, width=50, font=self._font_small)
         json_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 10))
         browse_json_btn = ttk.Button(single_upload_frame, text="تصفح", command=self.browse_json_file)
         browse_json_btn.grid(row=0, column=2, sticky=tk.W)
@@ -437,7 +512,7 @@ class EnhancedRunnerGUI:
         ttk.Label(multiple_upload_frame, text="مجلد ملفات JSON:", style='Heading.TLabel').grid(
             row=0, column=0, sticky=tk.W, padx=(0, 10))
         self.json_folder_var = tk.StringVar()
-        folder_entry = ttk.Entry(multiple_upload_frame, textvariable=self.json_folder_var, width=50, font=('Arial', 9))
+        folder_entry = ttk.Entry(multiple_upload_frame, textvariable=self.json_folder_var, width=50, font=self._font_small)
         folder_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 10))
         browse_folder_btn = ttk.Button(multiple_upload_frame, text="تصفح مجلد", command=self.browse_json_folder)
         browse_folder_btn.grid(row=0, column=2, sticky=tk.W)
@@ -448,7 +523,7 @@ class EnhancedRunnerGUI:
         ttk.Label(multiple_upload_frame, text="أو اختر ملفات متعددة:", style='Heading.TLabel').grid(
             row=1, column=0, sticky=tk.W, padx=(0, 10), pady=(10, 0))
         self.selected_files_var = tk.StringVar()
-        files_entry = ttk.Entry(multiple_upload_frame, textvariable=self.selected_files_var, width=50, font=('Arial', 9))
+        files_entry = ttk.Entry(multiple_upload_frame, textvariable=self.selected_files_var, width=50, font=self._font_small)
         files_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=(0, 10), pady=(10, 0))
         browse_files_btn = ttk.Button(multiple_upload_frame, text="اختر ملفات", command=self.browse_multiple_json_files)
         browse_files_btn.grid(row=1, column=2, sticky=tk.W, pady=(10, 0))
@@ -463,7 +538,7 @@ class EnhancedRunnerGUI:
         listbox_frame = ttk.Frame(files_list_frame)
         listbox_frame.pack(fill="both", expand=True, pady=(5, 0))
         
-        self.files_listbox = tk.Listbox(listbox_frame, height=6, font=('Arial', 9))
+        self.files_listbox = tk.Listbox(listbox_frame, height=6, font=self._font_small)
         files_scrollbar = ttk.Scrollbar(listbox_frame, orient="vertical", command=self.files_listbox.yview)
         self.files_listbox.configure(yscrollcommand=files_scrollbar.set)
         
@@ -506,7 +581,7 @@ class EnhancedRunnerGUI:
                                           command=self.fix_database_structure)
         self.fix_database_btn.pack(side=tk.LEFT, padx=(0, 10))
         
-        # إطار إعدادات قاعدة البيانات (مكرر للتبويب)
+        # إطار إعدادات قاعدة البيانات (المشترك)
         self.create_database_config(db_frame)
         
     def create_management_tab(self):
@@ -525,7 +600,7 @@ class EnhancedRunnerGUI:
         # معرف الكتاب في قاعدة البيانات
         ttk.Label(stats_frame, text="معرف الكتاب في قاعدة البيانات:", style='Heading.TLabel').grid(
             row=0, column=0, sticky=tk.W, padx=(0, 10))
-        db_book_entry = ttk.Entry(stats_frame, textvariable=self.db_book_id_var, width=15, font=('Arial', 11))
+        db_book_entry = ttk.Entry(stats_frame, textvariable=self.db_book_id_var, width=15, font=self._font_body)
         db_book_entry.grid(row=0, column=1, sticky=tk.W, padx=(0, 20))
         
         self.show_stats_btn = ttk.Button(stats_frame, text="📊 عرض الإحصائيات", 
@@ -614,7 +689,7 @@ class EnhancedRunnerGUI:
         info_frame = ttk.LabelFrame(category_frame, text="ℹ️ معلومات القسم", padding=10)
         info_frame.pack(fill="x", padx=10, pady=5)
         
-        self.category_info_text = tk.Text(info_frame, height=4, wrap="word", font=('Arial', 9))
+        self.category_info_text = tk.Text(info_frame, height=4, wrap="word", font=self._font_small)
         self.category_info_text.pack(fill="x")
         
         # أزرار التحكم (تم نقلها إلى الأعلى)
@@ -695,7 +770,7 @@ class EnhancedRunnerGUI:
         
         # عرض الحالة
         self.shared_status_label = ttk.Label(status_header_frame, text="جاهز للبدء ✓", 
-                                           style='Success.TLabel', font=('Arial', 11, 'bold'))
+                                           style='Success.TLabel', font=self._font_heading)
         self.shared_status_label.pack(side=tk.LEFT)
         
         # شريط التقدم بتصميم أفضل
@@ -724,9 +799,10 @@ class EnhancedRunnerGUI:
         
         # منطقة عرض السجلات (نسق أفضل)
         self.logs_text = scrolledtext.ScrolledText(logs_frame, height=15, wrap=tk.WORD,
-                                                  font=('Consolas', 10), bg=self.light_color,
+                                                  font=self._font_mono, bg=self.light_color,
                                                   fg=self.dark_color, padx=10, pady=10,
-                                                  insertbackground=self.primary_color)
+                                                  insertbackground=self.primary_color,
+                                                  undo=False, maxundo=0)
         self.logs_text.pack(fill=tk.BOTH, expand=True)
         
         # تطبيق ألوان على نص السجلات
@@ -737,9 +813,30 @@ class EnhancedRunnerGUI:
         self.logs_text.tag_configure("timestamp", foreground=self.dark_color)
         
     def create_database_config(self, parent):
-        """إنشاء إطار إعدادات قاعدة البيانات"""
-        db_frame = ttk.LabelFrame(parent, text="🗄️ إعدادات قاعدة البيانات", padding="10")
-        db_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        """
+        حجز مكان إعدادات قاعدة البيانات في التبويب
+        الإطار نفسه يُبنى مرة واحدة ويُنقل بين التبويبات بدل نسخة لكل تبويب
+        """
+        slot = ttk.Frame(parent)
+        slot.pack(fill=tk.X, padx=10, pady=(0, 10))
+        self._db_config_slots[str(parent)] = slot
+        
+        if self._db_config_frame is None:
+            self._db_config_frame = self._build_database_config()
+    
+    def _place_database_config(self, event=None):
+        """عرض إطار إعدادات قاعدة البيانات في مكانه من التبويب الحالي"""
+        slot = self._db_config_slots.get(self.notebook.select())
+        if slot is None:
+            self._db_config_frame.pack_forget()
+            return
+        self._db_config_frame.pack(in_=slot, fill=tk.X)
+        # الإطار ابن للنافذة الرئيسية: رفعه فوق حاويات التبويبات حتى لا تغطيه
+        self._db_config_frame.lift()
+    
+    def _build_database_config(self):
+        """إنشاء إطار إعدادات قاعدة البيانات (ابن للنافذة الرئيسية ليُعرض في أي تبويب)"""
+        db_frame = ttk.LabelFrame(self.root, text="🗄️ إعدادات قاعدة البيانات", padding="10")
         
         # الصف الأول
         ttk.Label(db_frame, text="الخادم:", style='Heading.TLabel').grid(
@@ -773,6 +870,8 @@ class EnhancedRunnerGUI:
         test_btn = ttk.Button(db_frame, text="🔌 اختبار الاتصال", command=self.test_database_connection)
         test_btn.grid(row=2, column=2, columnspan=2, sticky=tk.W, pady=(10, 0))
         
+        return db_frame
+        
     def create_status_bar(self):
         """إنشاء شريط الحالة"""
         self.status_bar = ttk.Frame(self.root)
@@ -977,11 +1076,7 @@ class EnhancedRunnerGUI:
                 os.path.join(current_dir, "enhanced_runner.py"),
                 "save-db",
                 file_path,
-                "--db-host", self.db_host_var.get(),
-                "--db-port", self.db_port_var.get(),
-                "--db-user", self.db_user_var.get(),
-                "--db-name", self.db_name_var.get(),
-                "--db-password", self.db_password_var.get()
+                *self._database_args()
             ]
             
             # إعداد متغيرات البيئة
@@ -1059,18 +1154,19 @@ class EnhancedRunnerGUI:
     def start_extraction(self):
         """بدء عملية الاستخراج"""
         # التحقق من صحة البيانات
-        if not self.book_id_var.get().strip():
+        book_id = self.book_id_var.get().strip()
+        if not book_id:
             messagebox.showerror("خطأ", "يجب إدخال معرف الكتاب")
             return
         
         try:
-            int(self.book_id_var.get().strip())
+            int(book_id)
         except ValueError:
             messagebox.showerror("خطأ", "معرف الكتاب يجب أن يكون رقماً")
             return
         
         # بناء الأمر
-        command = self.build_extraction_command()
+        command = self.build_extraction_command(book_id)
         
         # تحديث الواجهة
         self.is_running = True
@@ -1079,99 +1175,100 @@ class EnhancedRunnerGUI:
         self.shared_status_label.configure(text="جاري الاستخراج...", style='Success.TLabel')
         self.shared_progress_bar.start()
         
-        # بدء العملية في خيط منفصل
-        self.extraction_thread = threading.Thread(target=self.run_extraction, args=(command,))
-        self.extraction_thread.daemon = True
-        self.extraction_thread.start()
+        # بدء العملية على حلقة العمليات الفرعية
+        asyncio.run_coroutine_threadsafe(self.run_extraction(command), self._loop)
         
         # بدء مراقبة التقدم
         self.start_time = time.time()
         self.monitor_progress()
     
-    def build_extraction_command(self):
+    def build_extraction_command(self, book_id):
         """بناء أمر الاستخراج"""
-        command = ["python", "enhanced_runner.py", "extract", self.book_id_var.get().strip()]
+        command = ["python", "enhanced_runner.py", "extract", book_id]
         
         # إضافة المعاملات الاختيارية
-        if self.max_pages_var.get().strip():
-            command.extend(["--max-pages", self.max_pages_var.get().strip()])
+        max_pages = self.max_pages_var.get().strip()
+        if max_pages:
+            command.extend(["--max-pages", max_pages])
         
-        if self.output_dir_var.get().strip():
-            command.extend(["--output-dir", self.output_dir_var.get().strip()])
+        output_dir = self.output_dir_var.get().strip()
+        if output_dir:
+            command.extend(["--output-dir", output_dir])
         
         # إضافة إعدادات قاعدة البيانات إذا كان نوع العملية يتطلب ذلك
         if self.operation_var.get() == "extract + database":
-            command.extend([
-                "--db-host", self.db_host_var.get(),
-                "--db-port", self.db_port_var.get(),
-                "--db-user", self.db_user_var.get(),
-                "--db-name", self.db_name_var.get(),
-                "--db-password", self.db_password_var.get()  # تمرير كلمة السر دائماً حتى لو فارغة
-            ])
+            command.extend(self._database_args())
         
         return command
     
-    def run_extraction(self, command):
-        """تشغيل عملية الاستخراج"""
+    def _database_args(self):
+        """معاملات --db-* لأوامر enhanced_runner.py (قراءة واحدة لكل متغير)"""
+        credentials = (
+            self.db_host_var.get(),
+            self.db_port_var.get(),
+            self.db_user_var.get(),
+            self.db_name_var.get(),
+            self.db_password_var.get()  # تمرير كلمة السر دائماً حتى لو فارغة
+        )
+        return [value for pair in zip(DB_FLAGS, credentials) for value in pair]
+    
+    async def _run_logged_process(self, command):
+        """
+        تشغيل أمر فرعي وتمرير مخرجاته إلى السجل
+        القراءة بكتل 64 كيلوبايت من الأنبوب بدل readline لكل سطر - يعيد رمز الخروج
+        """
+        # إعداد متغيرات البيئة للترميز
+        env = os.environ.copy()
+        env['PYTHONIOENCODING'] = 'utf-8'
+        env['PYTHONUTF8'] = '1'
+        
+        self.current_process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            cwd=current_dir,
+            env=env
+        )
+        
+        # قراءة المخرجات: الأسطر الكاملة تُسجل والجزء الأخير ينتظر الكتلة التالية
+        pending = bytearray()
+        while True:
+            chunk = await self.current_process.stdout.read(65536)
+            if not chunk:
+                break
+            pending += chunk
+            *lines, tail = pending.split(b'\n')
+            pending = bytearray(tail)
+            for line in lines:
+                self.log_message(line.decode('utf-8', 'replace').strip())
+        
+        if pending:
+            self.log_message(pending.decode('utf-8', 'replace').strip())
+        
+        # التحقق من رمز الخروج
+        return await self.current_process.wait()
+    
+    async def run_extraction(self, command):
+        """تشغيل عملية الاستخراج (على حلقة العمليات الفرعية - النتيجة تُعرض عبر الخيط الرئيسي)"""
         try:
-            # إعداد متغيرات البيئة للترميز
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-            env['PYTHONUTF8'] = '1'
-            
-            self.current_process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                cwd=current_dir,
-                env=env
-            )
-            
-            # قراءة المخرجات
-            while True:
-                try:
-                    output = self.current_process.stdout.readline()
-                    if output == '' and self.current_process.poll() is not None:
-                        break
-                    if output:
-                        self.log_message(output.strip())
-                except UnicodeDecodeError as e:
-                    self.log_message(f"❌ خطأ في ترميز النص: {str(e)}")
-                    continue
-            
-            # التحقق من رمز الخروج
-            return_code = self.current_process.poll()
-            
-            if return_code == 0:
-                self.extraction_completed(True)
-            else:
-                self.extraction_completed(False)
-                
+            return_code = await self._run_logged_process(command)
+            self.ui_queue.put((self.extraction_completed, (return_code == 0,)))
         except Exception as e:
-            self.extraction_error(str(e))
+            self.ui_queue.put((self.extraction_error, (str(e),)))
     
     def upload_to_database(self):
         """رفع ملف JSON إلى قاعدة البيانات"""
-        if not self.json_file_var.get().strip():
+        json_file = self.json_file_var.get()
+        if not json_file.strip():
             messagebox.showerror("خطأ", "يجب اختيار ملف JSON")
             return
         
-        if not os.path.exists(self.json_file_var.get()):
+        if not os.path.exists(json_file):
             messagebox.showerror("خطأ", "الملف المحدد غير موجود")
             return
         
         # بناء الأمر
-        command = [
-            "python", "enhanced_runner.py", "save-db", self.json_file_var.get(),
-            "--db-host", self.db_host_var.get(),
-            "--db-port", self.db_port_var.get(),
-            "--db-user", self.db_user_var.get(),
-            "--db-name", self.db_name_var.get(),
-            "--db-password", self.db_password_var.get()  # تمرير كلمة السر دائماً حتى لو فارغة
-        ]
+        command = ["python", "enhanced_runner.py", "save-db", json_file, *self._database_args()]
         
         # تحديث الواجهة
         self.is_running = True
@@ -1180,18 +1277,11 @@ class EnhancedRunnerGUI:
         self.shared_progress_bar.start()
         
         # تشغيل العملية
-        threading.Thread(target=self.run_database_operation, args=(command, "upload")).start()
+        asyncio.run_coroutine_threadsafe(self.run_database_operation(command, "upload"), self._loop)
     
     def create_database_tables(self):
         """إنشاء جداول قاعدة البيانات"""
-        command = [
-            "python", "enhanced_runner.py", "create-tables",
-            "--db-host", self.db_host_var.get(),
-            "--db-port", self.db_port_var.get(),
-            "--db-user", self.db_user_var.get(),
-            "--db-name", self.db_name_var.get(),
-            "--db-password", self.db_password_var.get()  # تمرير كلمة السر دائماً حتى لو فارغة
-        ]
+        command = ["python", "enhanced_runner.py", "create-tables", *self._database_args()]
         
         # تحديث الواجهة
         self.is_running = True
@@ -1200,7 +1290,7 @@ class EnhancedRunnerGUI:
         self.shared_progress_bar.start()
         
         # تشغيل العملية
-        threading.Thread(target=self.run_database_operation, args=(command, "create_tables")).start()
+        asyncio.run_coroutine_threadsafe(self.run_database_operation(command, "create_tables"), self._loop)
     
     def fix_database_structure(self):
         """إصلاح هيكل قاعدة البيانات"""
@@ -1358,24 +1448,18 @@ class EnhancedRunnerGUI:
     
     def show_book_stats(self):
         """عرض إحصائيات كتاب"""
-        if not self.db_book_id_var.get().strip():
+        book_id = self.db_book_id_var.get().strip()
+        if not book_id:
             messagebox.showerror("خطأ", "يجب إدخال معرف الكتاب")
             return
         
         try:
-            int(self.db_book_id_var.get().strip())
+            int(book_id)
         except ValueError:
             messagebox.showerror("خطأ", "معرف الكتاب يجب أن يكون رقماً")
             return
         
-        command = [
-            "python", "enhanced_runner.py", "stats", self.db_book_id_var.get(),
-            "--db-host", self.db_host_var.get(),
-            "--db-port", self.db_port_var.get(),
-            "--db-user", self.db_user_var.get(),
-            "--db-name", self.db_name_var.get(),
-            "--db-password", self.db_password_var.get()  # تمرير كلمة السر دائماً حتى لو فارغة
-        ]
+        command = ["python", "enhanced_runner.py", "stats", book_id, *self._database_args()]
         
         # تحديث الواجهة
         self.is_running = True
@@ -1384,55 +1468,21 @@ class EnhancedRunnerGUI:
         self.shared_progress_bar.start()
         
         # تشغيل العملية
-        threading.Thread(target=self.run_database_operation, args=(command, "stats")).start()
+        asyncio.run_coroutine_threadsafe(self.run_database_operation(command, "stats"), self._loop)
     
-    def run_database_operation(self, command, operation_type):
-        """تشغيل عملية قاعدة البيانات"""
+    async def run_database_operation(self, command, operation_type):
+        """تشغيل عملية قاعدة البيانات (على حلقة العمليات الفرعية - النتيجة تُعرض عبر الخيط الرئيسي)"""
         try:
-            # إعداد متغيرات البيئة للترميز
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-            env['PYTHONUTF8'] = '1'
-            
-            self.current_process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                cwd=current_dir,
-                env=env
-            )
-            
-            # قراءة المخرجات
-            while True:
-                try:
-                    output = self.current_process.stdout.readline()
-                    if output == '' and self.current_process.poll() is not None:
-                        break
-                    if output:
-                        self.log_message(output.strip())
-                except UnicodeDecodeError as e:
-                    self.log_message(f"❌ خطأ في ترميز النص: {str(e)}")
-                    continue
-            
-            # التحقق من رمز الخروج
-            return_code = self.current_process.poll()
-            
-            if return_code == 0:
-                self.database_operation_completed(True, operation_type)
-            else:
-                self.database_operation_completed(False, operation_type)
-                
+            return_code = await self._run_logged_process(command)
+            self.ui_queue.put((self.database_operation_completed, (return_code == 0, operation_type)))
         except Exception as e:
-            self.database_operation_error(str(e), operation_type)
+            self.ui_queue.put((self.database_operation_error, (str(e), operation_type)))
     
     def test_database_connection(self):
         """اختبار اتصال قاعدة البيانات"""
         try:
             # محاولة الاتصال بقاعدة البيانات
-            import mysql.connector
+            from mysql.connector import pooling
             
             # إعداد معاملات الاتصال
             connection_params = {
@@ -1443,21 +1493,55 @@ class EnhancedRunnerGUI:
                 'password': self.db_password_var.get()  # تمرير كلمة السر دائماً حتى لو فارغة
             }
             
-            connection = mysql.connector.connect(**connection_params)
+            # الاختبار الأول يفتح المجمع، والتالية تكتفي بـ ping على اتصال قائم
+            pool_key = (connection_params['host'], connection_params['port'],
+                        connection_params['user'], connection_params['database'])
+            pool = self._db_pools.get(pool_key)
+            if pool is None:
+                pool = pooling.MySQLConnectionPool(pool_name="shamela_gui", pool_size=2, **connection_params)
+                self._db_pools[pool_key] = pool
             
-            if connection.is_connected():
+            connection = pool.get_connection()
+            try:
+                connection.ping(reconnect=True, attempts=1, delay=0)
+                connected = connection.is_connected()
+            finally:
+                # close يعيد الاتصال إلى المجمع حتى عند الفشل - وإلا نفد المجمع بعد اختبارين فاشلين
                 connection.close()
-                messagebox.showinfo("نجح الاتصال", "تم الاتصال بقاعدة البيانات بنجاح! ✅")
-                self.log_message("✅ نجح اختبار الاتصال بقاعدة البيانات")
+            
+            if not connected:
+                raise ConnectionError("الاتصال غير نشط بعد ping")
+            messagebox.showinfo("نجح الاتصال", "تم الاتصال بقاعدة البيانات بنجاح! ✅")
+            self.log_message("✅ نجح اختبار الاتصال بقاعدة البيانات")
             
         except Exception as e:
             messagebox.showerror("فشل الاتصال", f"فشل الاتصال بقاعدة البيانات:\n{str(e)}")
             self.log_message(f"❌ فشل اختبار الاتصال: {str(e)}")
     
+    def _reset_db_pools(self, *args):
+        """إسقاط مجمعات الاتصال عند تغيير بيانات قاعدة البيانات"""
+        for pool in self._db_pools.values():
+            # إغلاق الاتصالات الخاملة في المجمع المتروك بدل تركها مفتوحة على الخادم
+            pool._remove_connections()
+        self._db_pools.clear()
+    
+    @staticmethod
+    async def _terminate_and_wait(process):
+        """إنهاء العملية الفرعية وانتظار خروجها (على حلقة العمليات الفرعية)"""
+        if process.returncode is None:
+            process.terminate()
+        await process.wait()
+    
+    def terminate_current_process(self):
+        """إنهاء العملية الفرعية الجارية (عبر خيط حلقتها) - يعيد Future يمكن انتظاره أو None"""
+        process = self.current_process
+        if process is not None and process.returncode is None:
+            return asyncio.run_coroutine_threadsafe(self._terminate_and_wait(process), self._loop)
+        return None
+    
     def stop_operation(self):
         """إيقاف العملية الجارية"""
-        if self.current_process:
-            self.current_process.terminate()
+        self.terminate_current_process()
         
         # إيقاف جميع أنواع العمليات
         self.is_running = False
@@ -1472,22 +1556,35 @@ class EnhancedRunnerGUI:
         self.output_dir_var.set("")
         self.log_message("🗑️ تم مسح النموذج")
     
+    @staticmethod
+    def _open_folder(folder):
+        """فتح مجلد في مدير الملفات دون انتظار (startfile يحجز حلقة Tk حتى يستجيب المستكشف)"""
+        if sys.platform.startswith('win'):
+            command = ['explorer', folder]
+        elif sys.platform == 'darwin':
+            command = ['open', folder]
+        else:
+            command = ['xdg-open', folder]
+        subprocess.Popen(command, close_fds=True)
+    
     def open_books_folder(self):
         """فتح مجلد الكتب"""
-        books_folder = os.path.join(current_dir, "enhanced_books")
-        if os.path.exists(books_folder):
-            os.startfile(books_folder)
+        if not self._books_folder_exists:
+            self._books_folder_exists = os.path.isdir(self._books_folder)
+        if self._books_folder_exists:
+            self._open_folder(self._books_folder)
         else:
             messagebox.showwarning("تحذير", "مجلد الكتب غير موجود")
     
     def open_logs_folder(self):
         """فتح مجلد السجلات"""
-        logs_folder = os.path.join(current_dir, "logs")
-        if os.path.exists(logs_folder):
-            os.startfile(logs_folder)
+        if not self._logs_folder_exists:
+            self._logs_folder_exists = os.path.isdir(self._logs_folder)
+        if self._logs_folder_exists:
+            self._open_folder(self._logs_folder)
         else:
             # فتح المجلد الحالي إذا لم يوجد مجلد السجلات
-            os.startfile(current_dir)
+            self._open_folder(current_dir)
     
     def search_files(self):
         """البحث في الملفات"""
@@ -1507,13 +1604,19 @@ class EnhancedRunnerGUI:
                 return
             
             # البحث في ملفات JSON
-            books_folder = os.path.join(current_dir, "enhanced_books")
+            books_folder = self._books_folder
             if os.path.exists(books_folder):
-                results = []
-                for file in os.listdir(books_folder):
-                    if file.endswith('.json') or file.endswith('.json.gz'):
-                        if search_term.lower() in file.lower():
-                            results.append(file)
+                st = os.stat(books_folder)
+                if st.st_mtime != self._books_index_mtime:
+                    with os.scandir(books_folder) as entries:
+                        self._books_index = [
+                            (entry.name.lower(), entry.name) for entry in entries
+                            if entry.name.endswith(('.json', '.json.gz')) and entry.is_file()
+                        ]
+                    self._books_index_mtime = st.st_mtime
+                
+                needle = search_term.lower()
+                results = [name for lower_name, name in self._books_index if needle in lower_name]
                 
                 if results:
                     result_text = "\n".join(results)
@@ -1529,10 +1632,23 @@ class EnhancedRunnerGUI:
         log_file = os.path.join(current_dir, "enhanced_shamela_runner.log")
         if os.path.exists(log_file):
             try:
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                st = os.stat(log_file)
+                # ملف جديد أو مقتطع (تدوير السجل): إعادة العرض من البداية
+                if st.st_ino != self._log_inode or st.st_size < self._log_offset:
+                    self._log_inode = st.st_ino
+                    self._log_offset = 0
                     self.logs_text.delete(1.0, tk.END)
-                    self.logs_text.insert(tk.END, content)
+                
+                with open(log_file, 'rb') as f:
+                    f.seek(self._log_offset)
+                    new_data = f.read()
+                
+                # الأسطر المكتملة فقط - السطر الجاري يُقرأ في التحديث التالي
+                complete = new_data.rfind(b'\n') + 1
+                if complete:
+                    self._log_offset += complete
+                    self.logs_text.insert(tk.END, new_data[:complete].decode('utf-8', errors='replace'))
+                    self._trim_logs()
                     self.logs_text.see(tk.END)
             except Exception as e:
                 self.log_message(f"خطأ في قراءة ملف السجل: {str(e)}")
@@ -1550,15 +1666,16 @@ class EnhancedRunnerGUI:
         )
         if file_path:
             try:
-                content = self.logs_text.get(1.0, tk.END)
+                line_count = int(self.logs_text.index('end-1c').split('.')[0])
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                    for start in range(1, line_count + 1, LOG_SAVE_CHUNK_LINES):
+                        f.write(self.logs_text.get(f'{start}.0', f'{start + LOG_SAVE_CHUNK_LINES}.0'))
                 messagebox.showinfo("تم الحفظ", f"تم حفظ السجل في:\n{file_path}")
             except Exception as e:
                 messagebox.showerror("خطأ", f"فشل في حفظ السجل:\n{str(e)}")
     
     def log_message(self, message):
-        """إضافة رسالة للسجل"""
+        """إضافة رسالة للسجل (آمنة من أي خيط - تُعرض عند التفريغ التالي)"""
         try:
             # التأكد من أن الرسالة نص صحيح
             if isinstance(message, bytes):
@@ -1566,31 +1683,67 @@ class EnhancedRunnerGUI:
             elif not isinstance(message, str):
                 message = str(message)
                 
-            timestamp = datetime.now().strftime("%H:%M:%S")
+            timestamp = _timestamp()
             formatted_message = f"[{timestamp}] {message}\n"
             
-            self.logs_text.insert(tk.END, formatted_message)
-            self.logs_text.see(tk.END)
-            
-            # تحديث شريط الحالة إذا كان موجوداً
-            if hasattr(self, 'status_text'):
-                self.status_text.configure(text=message[:100])
+            self.log_queue.put((formatted_message, message))
         except Exception as e:
             # في حالة فشل كل شيء، اعرض رسالة خطأ بسيطة
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            error_message = f"[{timestamp}] ❌ خطأ في عرض الرسالة: {str(e)}\n"
-            self.logs_text.insert(tk.END, error_message)
+            timestamp = _timestamp()
+            error_message = f"❌ خطأ في عرض الرسالة: {str(e)}"
+            self.log_queue.put((f"[{timestamp}] {error_message}\n", error_message))
+    
+    def _trim_logs(self):
+        """إبقاء آخر LOG_MAX_LINES سطر فقط في عنصر السجل"""
+        line_count = int(self.logs_text.index('end-1c').split('.')[0])
+        if line_count > LOG_MAX_LINES + LOG_TRIM_SLACK:
+            self.logs_text.delete('1.0', f'{line_count - LOG_MAX_LINES + 1}.0')
+    
+    def _set_status_text(self, text):
+        """تحديث شريط الحالة فقط عند تغير النص"""
+        if text != self._last_status_text:
+            self._last_status_text = text
+            self.status_text.configure(text=text)
+    
+    def _drain_logs(self):
+        """كتابة الرسائل المنتظرة في السجل بإدراج واحد ثم إعادة الجدولة"""
+        lines = []
+        last_message = None
+        try:
+            while len(lines) < LOG_DRAIN_BATCH:
+                formatted_message, last_message = self.log_queue.get_nowait()
+                lines.append(formatted_message)
+        except queue.Empty:
+            pass
+        
+        if lines:
+            self.logs_text.insert(tk.END, "".join(lines))
+            self._trim_logs()
             self.logs_text.see(tk.END)
+            # شريط الحالة يعرض آخر رسالة فقط
+            self._set_status_text(last_message[:100])
+        
+        # نتائج العمليات الفرعية لا تُنفذ إلا بعد تفريغ كل رسائلها السابقة في السجل
+        if len(lines) < LOG_DRAIN_BATCH:
+            try:
+                while True:
+                    callback, args = self.ui_queue.get_nowait()
+                    callback(*args)
+            except queue.Empty:
+                pass
+        
+        self.root.after(LOG_DRAIN_INTERVAL_MS, self._drain_logs)
     
     def monitor_progress(self):
         """مراقبة التقدم"""
         if self.is_running:
-            elapsed = time.time() - self.start_time
-            elapsed_str = time.strftime("%H:%M:%S", time.gmtime(elapsed))
+            minutes, seconds = divmod(int(time.time() - self.start_time), 60)
+            hours, minutes = divmod(minutes, 60)
+            elapsed_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
             # تحديث معلومات الوقت في شريط الحالة
             if hasattr(self, 'status_text'):
                 current_text = self.shared_status_label.cget("text")
-                self.status_text.configure(text=f"{current_text} - الوقت: {elapsed_str}")
+                self._set_status_text(f"{current_text} - الوقت: {elapsed_str}")
     
     # ===== وظائف استخراج الأقسام =====
     
@@ -2148,8 +2301,12 @@ def main():
     def on_closing():
         if app.is_running:
             if messagebox.askokcancel("إنهاء التطبيق", "هناك عملية جارية. هل تريد إنهاء التطبيق؟"):
-                if app.current_process:
-                    app.current_process.terminate()
+                future = app.terminate_current_process()
+                if future is not None:
+                    try:
+                        future.result(timeout=TERMINATE_TIMEOUT)
+                    except Exception:
+                        pass
                 root.destroy()
         else:
             root.destroy()
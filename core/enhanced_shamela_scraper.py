@@ -23,6 +23,8 @@ Enhanced Shamela Scraper - سكربت محسن لسحب الكتب من المك
 
 from __future__ import annotations
 import re, json, time, os, sys
+import itertools
+import html as html_lib
 from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Tuple, Union, Any
 import asyncio
@@ -34,8 +36,102 @@ except ImportError:
     LXML_AVAILABLE = False
     print("⚠️  lxml غير متوفر - سيتم استخدام BeautifulSoup (أبطأ)")
 
+# ترميز JSON المشترك (orjson عند توفره)
+sys.path.append(os.path.dirname(__file__))
+from json_utils import json_bytes
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# محلل HTML مبني على lexbor بلغة C (اختياري)
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# مطابقة عدة أنماط بمسح واحد (اختياري)
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# حلقة أحداث أسرع مبنية على libuv (غير متوفرة على ويندوز)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = sys.platform != 'win32'
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# تخزين مؤقت دائم لردود HTTP بين التشغيلات (اختياري)
+try:
+    import requests_cache
+    REQUESTS_CACHE_AVAILABLE = True
+except ImportError:
+    REQUESTS_CACHE_AVAILABLE = False
+
+# تجميعات عددية سريعة على أعمدة الصفحات (اختياري)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# ترجمة JIT لعدّاد الكلمات (اختياري)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# صيغ إخراج ثنائية بديلة لـ JSON (اختيارية)
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import cbor2
+    CBOR_AVAILABLE = True
+except ImportError:
+    CBOR_AVAILABLE = False
+
+# عميل HTTP/2 متزامن يعدد الطلبات على اتصال TLS واحد (اختياري)
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+# عملاء HTTP اختيارية مبنية على Rust / curl للاستخراج غير المتزامن
+try:
+    import rusty_req
+    RUSTY_REQ_AVAILABLE = True
+except ImportError:
+    RUSTY_REQ_AVAILABLE = False
+
+try:
+    import arequest
+    AREQUEST_AVAILABLE = True
+except ImportError:
+    AREQUEST_AVAILABLE = False
+
+# محلل BeautifulSoup المفضل
+BS4_PARSER = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import argparse
 from pathlib import Path
 import logging
@@ -43,9 +139,13 @@ from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed, ProcessPoolExecutor
 import threading
 import multiprocessing as mp
+from multiprocessing import util as mp_util
 from logging.handlers import RotatingFileHandler
 import hashlib
 from functools import lru_cache
+from array import array
+from bisect import bisect_right
+import heapq
 import io
 import gzip
 import psutil
@@ -116,22 +216,31 @@ class PerformanceConfig:
     # خيارات التحسينات المتقدمة الجديدة
     aiohttp_workers: int = 8
     use_lxml: bool = False
+    parser_backend: str = 'lxml'  # lxml | lexbor
     force_traditional: bool = False
     
     # تحسينات الشبكة
     enable_http2: bool = True
     enable_compression: bool = False  # تم تعطيل ضغط ملفات JSON
+    compression: str = 'gzip'  # gzip | zstd
     enable_keepalive: bool = True
-    dns_cache_ttl: int = 300
+    dns_cache_ttl: int = 600
+    keepalive_timeout: float = 75.0
+    http_backend: str = 'aiohttp'  # aiohttp | rusty_req | arequest
+    sync_client: str = 'requests'  # requests | httpx (عميل الطلبات المتزامنة)
+    http_cache: bool = False  # التخزين المؤقت الدائم (requests-cache) - يفعله main ما لم يُعط --no-cache
+    use_uvloop: bool = True
     
     # تحسينات الذاكرة والأداء
     stream_json: bool = False
+    json_lines: bool = False  # سطر لبيانات الكتاب ثم سطر لكل صفحة
     skip_existing: bool = True
     resume_enabled: bool = True
     memory_efficient: bool = True
     max_memory_mb: int = 2048
     gc_threshold: int = 1000
     debug: bool = False
+    quiet: bool = False  # إخفاء الشعارات والملخص المطبوع
     
     def __post_init__(self):
         if self.max_processes is None:
@@ -159,6 +268,7 @@ DB_TABLES = {
     'volume_links': 'volume_links'
 }
 
+@lru_cache(maxsize=256)
 def normalize_book_id(book_id: str) -> str:
     """تطبيع معرف الكتاب - يقبل BK000043 أو 43 ويحولهما إلى 43"""
     book_id = book_id.strip()
@@ -220,23 +330,88 @@ class OptimizedHTTPSession:
     
     def __init__(self):
         if not hasattr(self, 'session'):
-            self.session = requests.Session()
-            adapter = requests.adapters.HTTPAdapter(
-                pool_connections=10,
-                pool_maxsize=20,
-                max_retries=requests.adapters.Retry(
-                    total=3,
-                    backoff_factor=1,
-                    status_forcelist=[500, 502, 503, 504]
-                )
+            # جلسة requests عادية عند الاستيراد - التخزين الدائم لا يُفعل إلا عبر enable_cache
+            self.session = self._configure(requests.Session())
+    
+    @staticmethod
+    def _configure(session: requests.Session) -> requests.Session:
+        """تركيب مجمع الاتصالات والترويسات الثابتة على الجلسة"""
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=requests.adapters.Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[500, 502, 503, 504]
             )
-            self.session.mount('http://', adapter)
-            self.session.mount('https://', adapter)
-            self.session.headers.update(HEADERS)
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        # الترويسات ثابتة لكل الطلبات - تُضبط مرة واحدة على الجلسة
+        session.headers.update(HEADERS)
+        session.headers.update({
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'ar,en-US;q=0.7,en;q=0.3',
+            # gzip/deflate دائماً، و br عند توفر brotli لفك الضغط
+            'Accept-Encoding': requests.utils.DEFAULT_ACCEPT_ENCODING,
+            'DNT': '1',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        })
+        return session
+    
+    def enable_cache(self) -> bool:
+        """
+        تفعيل التخزين المؤقت الدائم (requests-cache) - يُستدعى من main ما لم يُعط --no-cache
+        الصفحات تبقى في SQLite يوماً واحداً ثم يُعاد التحقق منها بـ ETag/Last-Modified
+        """
+        if not REQUESTS_CACHE_AVAILABLE:
+            return False
+        if not isinstance(self.session, requests_cache.CachedSession):
+            self.session.close()
+            self.session = self._configure(requests_cache.CachedSession(
+                "shamela_cache", backend="sqlite", expire_after=86400,
+                cache_control=True, allowable_codes=(200,)
+            ))
+        return True
     
     def get(self, url: str, **kwargs):
         return self.session.get(url, **kwargs)
     
+    def is_cached(self, url: str) -> bool:
+        """هل للرابط رد محفوظ في التخزين المؤقت الدائم (يُسأل قبل أخذ رمز الدلو فقط)"""
+        if not REQUESTS_CACHE_AVAILABLE or not isinstance(self.session, requests_cache.CachedSession):
+            return False
+        return not self.session.settings.disabled and self.session.cache.contains(url=url)
+    
+    def use_httpx(self, http2: bool = True, timeout: float = None) -> bool:
+        """
+        استبدال جلسة requests بعميل httpx (--sync-client httpx)
+        مع HTTP/2 تمر طلبات صفحات الكتاب عبر اتصال TLS واحد بدل مصافحة لكل اتصال
+        """
+        if not HTTPX_AVAILABLE:
+            logger.warning("⚠️ httpx غير مثبت - سيتم استخدام requests")
+            return False
+        if http2 and not H2_AVAILABLE:
+            logger.warning("⚠️ حزمة h2 غير مثبتة (httpx[http2]) - سيتم استخدام HTTP/1.1")
+            http2 = False
+        
+        # ترويسة Connection خاصة بـ HTTP/1.1 وممنوعة في HTTP/2
+        headers = {k: v for k, v in self.session.headers.items() if k.lower() != 'connection'}
+        self.session.close()
+        # مع transport= يتجاهل httpx قيمتي limits و http2 على مستوى العميل - تُمرران للنقل نفسه
+        self.session = httpx.Client(
+            headers=headers,
+            timeout=REQ_TIMEOUT if timeout is None else timeout,
+            follow_redirects=True,
+            transport=httpx.HTTPTransport(
+                http2=http2,
+                retries=3,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+            )
+        )
+        return True
+    
     def close(self):
         if hasattr(self, 'session'):
             self.session.close()
@@ -244,6 +419,35 @@ class OptimizedHTTPSession:
 # جلسة HTTP عامة
 http_session = OptimizedHTTPSession()
 
+# أخطاء الشبكة التي يعيد safe_request المحاولة عندها (requests أو httpx)
+_HTTP_ERRORS = (requests.RequestException, httpx.HTTPError) if HTTPX_AVAILABLE else (requests.RequestException,)
+
+class TokenBucket:
+    """دلو رموز آمن للخيوط: rate طلب/ثانية مع سماح بدفعة حتى capacity"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """انتظار رمز متاح ثم استهلاكه"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+# محدد معدل الطلبات للخادم أثناء الاستخراج المتوازي (None = بلا تحديد)
+_request_throttle: Optional[TokenBucket] = None
+
 # ========= جلسة HTTP متقدمة غير متزامنة =========
 class AdvancedHTTPSession:
     """جلسة HTTP متقدمة مع دعم aiohttp"""
@@ -255,13 +459,21 @@ class AdvancedHTTPSession:
         
     async def __aenter__(self):
         """إنشاء الجلسة عند الدخول"""
+        return await self.open()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """إغلاق الجلسة عند الخروج"""
+        await self.close()
+    
+    async def open(self) -> aiohttp.ClientSession:
+        """إنشاء الجلسة (لجلسة طويلة العمر تُستخدم خارج async with)"""
         # إعداد الموصل المتقدم
         self.connector = aiohttp.TCPConnector(
             limit=self.config.max_connections,
             limit_per_host=self.config.max_connections_per_host,
             ttl_dns_cache=self.config.dns_cache_ttl,
             use_dns_cache=True,
-            keepalive_timeout=60 if self.config.enable_keepalive else 0,
+            keepalive_timeout=self.config.keepalive_timeout if self.config.enable_keepalive else 0,
             enable_cleanup_closed=True,
             force_close=not self.config.enable_keepalive,
             ssl=False
@@ -293,14 +505,41 @@ class AdvancedHTTPSession:
         
         return self.session
     
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """إغلاق الجلسة عند الخروج"""
+    async def close(self) -> None:
+        """إغلاق الجلسة والموصل"""
         if self.session:
             await self.session.close()
         if self.connector:
             await self.connector.close()
 
 # ========= معالج HTML سريع =========
+if LXML_AVAILABLE:
+    # مسارات XPath مترجمة مرة واحدة عند التحميل
+    # التركيز على div.nass أولاً - هو الحاوي الصحيح للمحتوى
+    _CONTENT_XPATHS = tuple(etree.XPath(xpath) for xpath in (
+        "//div[@class='nass']",  # هذا هو الحاوي الرئيسي للمحتوى في شاملة
+        "//div[@id='book']",
+        "//div[@id='text']",
+        "//article",
+        "//div[contains(@class, 'reader-text')]",
+        "//div[contains(@class, 'col-md-9')]",
+        "//div[contains(@class, 'book-content')]",
+        "//div[contains(@class, 'page-content')]",
+        "//main"
+    ))
+    _BODY_XPATH = etree.XPath("//body")
+    # العناصر غير المرغوبة في استعلام واحد (اتحاد المسارات)
+    _UNWANTED_XPATH = etree.XPath(" | ".join((
+        ".//script", ".//style", ".//nav", ".//*[contains(@class, 'share')]",
+        ".//*[contains(@class, 'social')]", ".//*[contains(@class, 'ad')]",
+        ".//*[contains(@class, 'advertisement')]", ".//*[contains(@class, 'menu')]",
+        ".//*[contains(@class, 'sidebar')]", ".//*[contains(@class, 'header')]",
+        ".//*[contains(@class, 'footer')]", ".//*[contains(@class, 'btn')]",
+        ".//*[@class='input-group']", ".//*[@class='modal']",
+        ".//button", ".//*[contains(@id, 'modal')]"
+    )))
+    _BR_XPATH = etree.XPath(".//br")
+
 class FastHTMLProcessor:
     """معالج HTML سريع باستخدام lxml أو BeautifulSoup"""
     
@@ -316,126 +555,127 @@ class FastHTMLProcessor:
             logger.error(f"خطأ في معالجة HTML للصفحة {page_num}: {e}")
             return None
     
+    @staticmethod
+    def extract_page_content_from_tree(tree, page_num: int) -> Optional[Dict[str, Any]]:
+        """استخراج محتوى الصفحة من شجرة lxml محللة مسبقاً (مثلاً أثناء التنزيل)"""
+        try:
+            return FastHTMLProcessor._extract_from_tree(tree, page_num)
+        except Exception as e:
+            logger.error(f"خطأ في معالجة HTML للصفحة {page_num}: {e}")
+            return None
+    
+    @staticmethod
+    def extract_page_content_with_bs4(html: str, page_num: int) -> Optional[Dict[str, Any]]:
+        """استخراج محتوى الصفحة من HTML مخزن كاملاً بـ BeautifulSoup (تراجع عند فشل التحليل التدريجي)"""
+        try:
+            return FastHTMLProcessor._extract_with_bs4(html, page_num)
+        except Exception as e:
+            logger.error(f"خطأ في معالجة HTML للصفحة {page_num}: {e}")
+            return None
+    
     @staticmethod
     def _extract_with_lxml(html: str, page_num: int) -> Dict[str, Any]:
         """استخراج باستخدام lxml (الأسرع)"""
         try:
             tree = lxml_html.fromstring(html)
-            
-            # التركيز على div.nass أولاً - هو الحاوي الصحيح للمحتوى
-            content_selectors = [
-                "//div[@class='nass']",  # هذا هو الحاوي الرئيسي للمحتوى في شاملة
-                "//div[@id='book']", 
-                "//div[@id='text']", 
-                "//article", 
-                "//div[contains(@class, 'reader-text')]",
-                "//div[contains(@class, 'col-md-9')]",
-                "//div[contains(@class, 'book-content')]", 
-                "//div[contains(@class, 'page-content')]", 
-                "//main"
-            ]
-            
-            content_elem = None
-            for selector in content_selectors:
-                elements = tree.xpath(selector)
-                if elements:
-                    content_elem = elements[0]
-                    break
-            
-            if not content_elem:
-                # استخدام body كاحتياط
-                body_elements = tree.xpath("//body")
-                if body_elements:
-                    content_elem = body_elements[0]
-                else:
-                    content_elem = tree
-            
-            if content_elem is not None:
-                # إزالة العناصر غير المرغوبة
-                unwanted_xpath = [
-                    ".//script", ".//style", ".//nav", ".//*[contains(@class, 'share')]",
-                    ".//*[contains(@class, 'social')]", ".//*[contains(@class, 'ad')]",
-                    ".//*[contains(@class, 'advertisement')]", ".//*[contains(@class, 'menu')]",
-                    ".//*[contains(@class, 'sidebar')]", ".//*[contains(@class, 'header')]",
-                    ".//*[contains(@class, 'footer')]", ".//*[contains(@class, 'btn')]",
-                    ".//*[@class='input-group']", ".//*[@class='modal']",
-                    ".//button", ".//*[contains(@id, 'modal')]"
-                ]
-                
-                for xpath in unwanted_xpath:
-                    for elem in content_elem.xpath(xpath):
-                        if elem.getparent() is not None:
-                            elem.getparent().remove(elem)
-                
-                text_content = content_elem.text_content().strip()
-                
-                # فلترة النصوص غير المرغوبة
-                unwanted_phrases = [
-                    'للمساهمة في دعم المكتبة الشاملة',
-                    'حول المشروع',
-                    'اتصل بنا',
-                    'الموقع القديم',
-                    'المكتبة الشاملة',
-                    'اذهب',
-                    'بحث في هذا الكتاب',
-                    'رقم الجزء',
-                    'مسار الصفحة الحالية',
-                    'فهرس الكتاب',
-                    'التشكيل',
-                    'نسخ الفقرة ورابط لها',
-                    'إغلاق',
-                    'btn',
-                    'fa fa-'
-                ]
-                
-                # تقسيم النص إلى فقرات وتنظيف كل فقرة
-                paragraphs = text_content.split('\n')
-                cleaned_paragraphs = []
-                
-                for paragraph in paragraphs:
-                    paragraph = paragraph.strip()
-                    # تخطي الفقرات الفارغة أو القصيرة جداً
-                    if len(paragraph) < 10:
-                        continue
-                    # تخطي الفقرات التي تحتوي على عبارات غير مرغوبة
-                    if any(phrase in paragraph for phrase in unwanted_phrases):
-                        continue
-                    # تخطي الفقرات التي تحتوي أرقام وحيدة (أرقام الصفحات)
-                    if paragraph.isdigit() or re.match(r'^[٠-٩]+$', paragraph):
-                        continue
-                    
-                    cleaned_paragraphs.append(paragraph)
-                
-                # إعادة تجميع النص المنظف
-                text_content = '\n'.join(cleaned_paragraphs)
-                
-                # تطبيع النص النهائي
-                text_content = re.sub(r'\n{3,}', '\n\n', text_content)
-                text_content = text_content.strip()
-                
-                html_content = lxml_html.tostring(content_elem, encoding='unicode', method='html')
-                
-                return {
-                    'page_number': page_num,
-                    'content': text_content,
-                    'html_content': html_content,
-                    'word_count': len(text_content.split()),
-                    'char_count': len(text_content),
-                    'extracted_at': datetime.now().isoformat(),
-                    'extraction_method': 'lxml'
-                }
+            return FastHTMLProcessor._extract_from_tree(tree, page_num)
             
         except Exception as e:
-            logger.debug(f"خطأ في lxml للصفحة {page_num}: {e}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"خطأ في lxml للصفحة {page_num}: {e}")
             # تراجع إلى BeautifulSoup
             pass
         
         return FastHTMLProcessor._extract_with_bs4(html, page_num)
     
+    @staticmethod
+    def _extract_from_tree(tree, page_num: int) -> Dict[str, Any]:
+        """استخراج المحتوى من شجرة lxml"""
+        content_elem = None
+        for content_xpath in _CONTENT_XPATHS:
+            elements = content_xpath(tree)
+            if elements:
+                content_elem = elements[0]
+                break
+        
+        if content_elem is None:
+            # استخدام body كاحتياط
+            body_elements = _BODY_XPATH(tree)
+            if body_elements:
+                content_elem = body_elements[0]
+            else:
+                content_elem = tree
+        
+        # إزالة العناصر غير المرغوبة
+        for elem in _UNWANTED_XPATH(content_elem):
+            parent = elem.getparent()
+            if parent is not None:
+                parent.remove(elem)
+        
+        # تحويل <br> إلى فاصل أسطر في النص دون المرور عبر BeautifulSoup
+        for br in _BR_XPATH(content_elem):
+            br.tail = '\n' + br.tail if br.tail else '\n'
+        
+        text_content = content_elem.text_content().strip()
+        
+        # فلترة النصوص غير المرغوبة
+        unwanted_phrases = [
+            'للمساهمة في دعم المكتبة الشاملة',
+            'حول المشروع',
+            'اتصل بنا',
+            'الموقع القديم',
+            'المكتبة الشاملة',
+            'اذهب',
+            'بحث في هذا الكتاب',
+            'رقم الجزء',
+            'مسار الصفحة الحالية',
+            'فهرس الكتاب',
+            'التشكيل',
+            'نسخ الفقرة ورابط لها',
+            'إغلاق',
+            'btn',
+            'fa fa-'
+        ]
+        
+        # تقسيم النص إلى فقرات وتنظيف كل فقرة
+        paragraphs = text_content.split('\n')
+        cleaned_paragraphs = []
+        
+        for paragraph in paragraphs:
+            paragraph = paragraph.strip()
+            # تخطي الفقرات الفارغة أو القصيرة جداً
+            if len(paragraph) < 10:
+                continue
+            # تخطي الفقرات التي تحتوي على عبارات غير مرغوبة
+            if any(phrase in paragraph for phrase in unwanted_phrases):
+                continue
+            # تخطي الفقرات التي تحتوي أرقام وحيدة (أرقام الصفحات)
+            # isdigit تشمل الأرقام العربية-الهندية
+            if paragraph.isdigit():
+                continue
+            
+            cleaned_paragraphs.append(paragraph)
+        
+        # إعادة تجميع النص المنظف (فقرات غير فارغة - لا أسطر فارغة متكررة)
+        text_content = '\n'.join(cleaned_paragraphs)
+        
+        html_content = lxml_html.tostring(content_elem, encoding='unicode', method='html')
+        
+        return {
+            'page_number': page_num,
+            'content': text_content,
+            'html_content': html_content,
+            'word_count': count_words(text_content),
+            'char_count': len(text_content),
+            'extracted_at': datetime.now().isoformat(),
+            'extraction_method': 'lxml'
+        }
+    
     @staticmethod
     def _extract_with_bs4(html: str, page_num: int) -> Dict[str, Any]:
         """استخراج باستخدام BeautifulSoup (بديل)"""
-        soup = BeautifulSoup(html, 'html.parser')
+        # <hr> و <br> تُستبدل بنص واضح في HTML الخام قبل التحليل
+        soup = BeautifulSoup(_mark_line_breaks(html), BS4_PARSER)
         
         # البحث عن المحتوى - نركز على div.nass أولاً
         content_selectors = [
@@ -472,13 +712,6 @@ class FastHTMLProcessor:
                 for element in main_content.select(selector):
                     element.decompose()
             
-            # استبدال <hr> و <br> بنص واضح قبل استخراج النص
-            for hr in main_content.find_all("hr"):
-                hr.replace_with("\n<hr/>\n")
-            
-            for br in main_content.find_all("br"):
-                br.replace_with("<br/>\n")
-            
             # استخراج النص مع الحفاظ على فواصل الأسطر
             text_content = main_content.get_text(separator="\n", strip=True)
             
@@ -514,25 +747,22 @@ class FastHTMLProcessor:
                 if any(phrase in paragraph for phrase in unwanted_phrases):
                     continue
                 # تخطي الفقرات التي تحتوي أرقام وحيدة (أرقام الصفحات)
-                if paragraph.isdigit() or re.match(r'^[٠-٩]+$', paragraph):
+                # isdigit تشمل الأرقام العربية-الهندية
+                if paragraph.isdigit():
                     continue
                 
                 cleaned_paragraphs.append(paragraph)
             
-            # إعادة تجميع النص المنظف
+            # إعادة تجميع النص المنظف (فقرات غير فارغة - لا أسطر فارغة متكررة)
             text_content = '\n'.join(cleaned_paragraphs)
             
-            # تطبيع فواصل الأسطر النهائية
-            text_content = re.sub(r'\n{3,}', '\n\n', text_content)
-            text_content = text_content.strip()
-            
-            html_content = str(main_content)
+            html_content = main_content.decode()
             
             return {
                 'page_number': page_num,
                 'content': text_content,
                 'html_content': html_content,
-                'word_count': len(text_content.split()),
+                'word_count': count_words(text_content),
                 'char_count': len(text_content),
                 'extracted_at': datetime.now().isoformat(),
                 'extraction_method': 'beautifulsoup'
@@ -711,6 +941,164 @@ class PageContent:
     printed_missing: bool = False  # هل فشل استخراج الترقيم المطبوع
     internal_index: Optional[int] = None  # N من المسار
 
+# قيمة بديلة لـ None داخل المصفوفات العددية
+_NO_INT = -1
+
+def _int_column(column: str) -> property:
+    """خاصية تقرأ وتكتب مباشرة في عمود عددي من PageStore"""
+    def fget(self):
+        value = getattr(self._store, column)[self._index]
+        return None if value == _NO_INT else value
+    def fset(self, value):
+        getattr(self._store, column)[self._index] = _NO_INT if value is None else value
+    return property(fget, fset)
+
+class PageView:
+    """
+    عرض لصفحة واحدة داخل PageStore بنفس واجهة PageContent
+    القراءة والتعديل يمران مباشرة إلى مصفوفات المخزن
+    """
+    __slots__ = ('_store', '_index')
+    
+    def __init__(self, store: "PageStore", index: int):
+        self._store = store
+        self._index = index
+    
+    page_number = _int_column('page_numbers')
+    volume_number = _int_column('volume_numbers')
+    chapter_id = _int_column('chapter_ids')
+    word_count = _int_column('word_counts')
+    original_page_number = _int_column('original_page_numbers')
+    page_index_internal = _int_column('page_index_internals')
+    internal_index = _int_column('internal_indexes')
+    
+    @property
+    def content(self) -> str:
+        return self._store.contents[self._index]
+    
+    @content.setter
+    def content(self, value: str):
+        self._store.contents[self._index] = value
+    
+    @property
+    def html_content(self) -> Optional[str]:
+        html_contents = self._store.html_contents
+        return html_contents[self._index] if html_contents is not None else None
+    
+    @html_content.setter
+    def html_content(self, value: Optional[str]):
+        self._store._ensure_html_column(value)
+        if self._store.html_contents is not None:
+            self._store.html_contents[self._index] = value
+    
+    @property
+    def printed_missing(self) -> bool:
+        return bool(self._store.printed_missing[self._index])
+    
+    @printed_missing.setter
+    def printed_missing(self, value: bool):
+        self._store.printed_missing[self._index] = bool(value)
+    
+    def to_page(self) -> PageContent:
+        """نسخة PageContent مستقلة عن المخزن"""
+        return PageContent(**{name: getattr(self, name) for name in PageStore.FIELDS})
+    
+    def __repr__(self) -> str:
+        return f"PageView(page_number={self.page_number}, word_count={self.word_count})"
+
+class PageStore:
+    """
+    تخزين صفحات الكتاب بتخطيط أعمدة (SoA) بدلاً من قائمة كائنات PageContent
+    الحقول العددية في مصفوفات array('i') والنصوص في قوائم متوازية،
+    وعمود HTML لا يُنشأ إلا عند وجود HTML فعلاً
+    """
+    FIELDS = (
+        'page_number', 'content', 'html_content', 'volume_number', 'chapter_id', 'word_count',
+        'original_page_number', 'page_index_internal', 'printed_missing', 'internal_index'
+    )
+    _INT_COLUMNS = (
+        ('page_number', 'page_numbers'), ('volume_number', 'volume_numbers'),
+        ('chapter_id', 'chapter_ids'), ('word_count', 'word_counts'),
+        ('original_page_number', 'original_page_numbers'),
+        ('page_index_internal', 'page_index_internals'), ('internal_index', 'internal_indexes')
+    )
+    
+    def __init__(self, pages: Optional[List[PageContent]] = None):
+        for _, column in self._INT_COLUMNS:
+            setattr(self, column, array('i'))
+        self.printed_missing = array('b')
+        self.contents: List[str] = []
+        self.html_contents: Optional[List[Optional[str]]] = None
+        if pages:
+            self.extend(pages)
+    
+    def _ensure_html_column(self, html_content: Optional[str]) -> None:
+        """إنشاء عمود HTML عند أول قيمة فعلية"""
+        if html_content is not None and self.html_contents is None:
+            self.html_contents = [None] * len(self.contents)
+    
+    def append(self, page: PageContent) -> None:
+        for name, column in self._INT_COLUMNS:
+            value = getattr(page, name)
+            getattr(self, column).append(_NO_INT if value is None else value)
+        self.printed_missing.append(bool(page.printed_missing))
+        self._ensure_html_column(page.html_content)
+        if self.html_contents is not None:
+            self.html_contents.append(page.html_content)
+        self.contents.append(page.content)
+    
+    def extend(self, pages: List[PageContent]) -> None:
+        for page in pages:
+            self.append(page)
+    
+    def total_words(self) -> int:
+        """مجموع كلمات الصفحات باختزال واحد على العمود"""
+        if NUMPY_AVAILABLE:
+            counts = np.frombuffer(self.word_counts, dtype=np.int32)
+            total = int(counts.sum(where=counts > 0))
+            del counts  # تحرير العرض ليبقى العمود قابلاً للتوسيع
+            return total
+        return sum(count for count in self.word_counts if count > 0)
+    
+    def iter_dicts(self):
+        """قواميس الصفحات للحفظ - صفحة واحدة في كل مرة مباشرة من المصفوفات"""
+        html_contents = self.html_contents
+        optional = lambda value: None if value == _NO_INT else value
+        for i in range(len(self.contents)):
+            yield {
+                'page_number': self.page_numbers[i],
+                'content': self.contents[i],
+                'html_content': html_contents[i] if html_contents is not None else None,
+                'volume_number': optional(self.volume_numbers[i]),
+                'word_count': optional(self.word_counts[i]),
+                'original_page_number': optional(self.original_page_numbers[i]),
+                'page_index_internal': optional(self.page_index_internals[i]),
+                'internal_index': optional(self.internal_indexes[i]),
+                'printed_missing': bool(self.printed_missing[i])
+            }
+    
+    def __len__(self) -> int:
+        return len(self.contents)
+    
+    def __iter__(self):
+        for i in range(len(self.contents)):
+            yield PageView(self, i)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [PageView(self, i) for i in range(*index.indices(len(self.contents)))]
+        if index < 0:
+            index += len(self.contents)
+        if not 0 <= index < len(self.contents):
+            raise IndexError("page index out of range")
+        return PageView(self, index)
+
+def total_words(pages: Union[List[PageContent], PageStore]) -> int:
+    """مجموع كلمات الصفحات - مباشرة من عمود PageStore عند توفره"""
+    if isinstance(pages, PageStore):
+        return pages.total_words()
+    return sum(page.word_count or 0 for page in pages)
+
 @dataclass
 class Book:
     """نموذج الكتاب المحسن"""
@@ -732,7 +1120,7 @@ class Book:
     index: List[Chapter] = field(default_factory=list)
     volumes: List[Volume] = field(default_factory=list)
     volume_links: List[VolumeLink] = field(default_factory=list)
-    pages: List[PageContent] = field(default_factory=list)
+    pages: Union[List[PageContent], PageStore] = field(default_factory=list)
     description: Optional[str] = None  # بطاقة الكتاب الكاملة
     language: str = "ar"
     source_url: Optional[str] = None
@@ -748,6 +1136,60 @@ class EnhancedShamelaScraperError(Exception):
     pass
 
 # ========= وظائف المساعدة =========
+def _compile_patterns() -> None:
+    """
+    ترجمة أنماط المسار الساخن مرة واحدة عند التحميل
+    الأنماط المترجمة لا تمر بذاكرة re الداخلية المحدودة، والتي قد تطردها
+    الأنماط الديناميكية (المبنية بمعرف الكتاب) في الكتب الكبيرة
+    """
+    global _WS_RE, _HSPACE_RE, _NUMBER_RE, _BR_RE, _HR_RE, _BR_BYTES_RE, _HR_BYTES_RE
+    # توسيع ذاكرة re لما تبقى من أنماط ديناميكية
+    re._MAXCACHE = max(getattr(re, '_MAXCACHE', 512), 4096)
+    
+    _WS_RE = re.compile(r'\s+')           # أي مسافات (clean_text)
+    _HSPACE_RE = re.compile(r'[ \t]+')    # مسافات أفقية فقط
+    _NUMBER_RE = re.compile(r'(\d+)')     # أول عدد في النص
+    
+    # وسوم <br> و <hr> في HTML الخام (نص وبايتات)
+    _BR_RE = re.compile(r'<br\b[^>]*>', re.IGNORECASE)
+    _HR_RE = re.compile(r'<hr\b[^>]*>', re.IGNORECASE)
+    _BR_BYTES_RE = re.compile(rb'<br\b[^>]*>', re.IGNORECASE)
+    _HR_BYTES_RE = re.compile(rb'<hr\b[^>]*>', re.IGNORECASE)
+
+# علامات نصية تحل محل <br> و <hr> قبل التحليل (تظهر في النص المستخرج كما هي)
+_BR_MARKER = '\n&lt;br/&gt;\n'
+_HR_MARKER = '\n&lt;hr/&gt;\n'
+
+def _mark_line_breaks(html: Union[str, bytes]) -> Union[str, bytes]:
+    """
+    استبدال <br> و <hr> بعلامات نصية في HTML الخام بتمرير regex واحد لكل وسم
+    بدلاً من البحث عنها واستبدالها داخل شجرة BeautifulSoup
+    """
+    if isinstance(html, bytes):
+        html = _HR_BYTES_RE.sub(_HR_MARKER.encode(), html)
+        return _BR_BYTES_RE.sub(_BR_MARKER.encode(), html)
+    html = _HR_RE.sub(_HR_MARKER, html)
+    return _BR_RE.sub(_BR_MARKER, html)
+
+_compile_patterns()
+
+@lru_cache(maxsize=64)
+def _book_link_re(book_id: str) -> re.Pattern:
+    """نمط مترجم لرقم الصفحة في رابط /book/{id}/{N}"""
+    return re.compile(rf"/book/{re.escape(book_id)}/(\d+)")
+
+@lru_cache(maxsize=65536)
+def _extract_page_id(book_id: str, href: str) -> Optional[int]:
+    """
+    رقم الصفحة N من رابط /book/{id}/{N} أو None
+    روابط الفهرس والأجزاء والتنقل تتكرر كثيراً، فالنتيجة تُحفظ لكل رابط
+    """
+    page_match = _book_link_re(book_id).search(href)
+    return int(page_match.group(1)) if page_match else None
+
+# هل وصل آخر طلب في هذا الخيط إلى الشبكة فعلاً (لتخطي تأخير الاحترام عند ردود التخزين المؤقت)
+_request_state = threading.local()
+
 def safe_request(url: str, retries: int = MAX_RETRIES, timeout: int = REQ_TIMEOUT, 
                 use_cache: bool = True) -> requests.Response:
     """طلب آمن محسن مع تجمع الاتصالات والتخزين المؤقت"""
@@ -764,17 +1206,12 @@ def safe_request(url: str, retries: int = MAX_RETRIES, timeout: int = REQ_TIMEOU
             if attempt > 0:
                 time.sleep(delay)
             
-            enhanced_headers = HEADERS.copy()
-            enhanced_headers.update({
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'ar,en-US;q=0.7,en;q=0.3',
-                'Accept-Encoding': 'gzip, deflate',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            })
-            
-            response = http_session.get(url, headers=enhanced_headers, timeout=timeout)
+            # الرمز يُؤخذ قبل كل محاولة تصل للخادم؛ فحص التخزين الدائم لا يجري إلا مع الدلو
+            if _request_throttle is not None and not http_session.is_cached(url):
+                _request_throttle.acquire()
+            response = http_session.get(url, timeout=timeout)
+            # رد من التخزين المؤقت الدائم (requests-cache) لم يلمس الخادم - لا تأخير احترام بعده
+            _request_state.hit_network = not getattr(response, 'from_cache', False)
             
             if response.status_code == 200:
                 # حفظ في التخزين المؤقت
@@ -793,7 +1230,8 @@ def safe_request(url: str, retries: int = MAX_RETRIES, timeout: int = REQ_TIMEOU
             else:
                 response.raise_for_status()
                 
-        except requests.RequestException as e:
+        except _HTTP_ERRORS as e:
+            _request_state.hit_network = True
             if attempt < retries - 1:
                 logger.warning(f"محاولة {attempt + 1} فشلت لـ {url}: {e}")
             else:
@@ -807,17 +1245,91 @@ def get_soup(url: str, use_cache: bool = True) -> BeautifulSoup:
     response = safe_request(url, use_cache=use_cache)
     return BeautifulSoup(response.content, 'html.parser')
 
+# أسطر فارغة متكررة
+_MULTI_NL_RE = re.compile(r'\n{3,}')
+
+# ========= عدّ الكلمات =========
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _count_words_utf8(buf) -> int:
+        """
+        عدّ الكلمات في نص UTF-8 بالانتقال من فاصل إلى غير فاصل
+        الفواصل هي نفسها فواصل str.split(): المسافات ومحارف التحكم \t-\r و \x1c-\x1f
+        و U+0085 و U+00A0 و U+1680 و U+2000-U+200A و U+2028/2029 و U+202F و U+205F و U+3000
+        """
+        count = 0
+        in_word = False
+        n = len(buf)
+        i = 0
+        while i < n:
+            b = buf[i]
+            width = 1
+            space = False
+            if b < 0x80:
+                space = b == 0x20 or 0x09 <= b <= 0x0D or 0x1C <= b <= 0x1F
+            elif b == 0xC2 and i + 1 < n:
+                space = buf[i + 1] == 0x85 or buf[i + 1] == 0xA0
+                width = 2
+            elif b == 0xE1 and i + 2 < n:
+                space = buf[i + 1] == 0x9A and buf[i + 2] == 0x80
+                width = 3
+            elif b == 0xE2 and i + 2 < n:
+                b1 = buf[i + 1]
+                b2 = buf[i + 2]
+                space = (b1 == 0x80 and (0x80 <= b2 <= 0x8A or b2 == 0xA8 or b2 == 0xA9 or b2 == 0xAF)) \
+                    or (b1 == 0x81 and b2 == 0x9F)
+                width = 3
+            elif b == 0xE3 and i + 2 < n:
+                space = buf[i + 1] == 0x80 and buf[i + 2] == 0x80
+                width = 3
+            
+            if space:
+                in_word = False
+                i += width
+            else:
+                if not in_word:
+                    in_word = True
+                    count += 1
+                i += 1
+        return count
+
+def count_words(text: str) -> int:
+    """عدد كلمات النص (مطابق لـ len(text.split())) - نواة Numba عند توفرها دون بناء قائمة كلمات"""
+    if not text:
+        return 0
+    if NUMBA_AVAILABLE:
+        return _count_words_utf8(np.frombuffer(text.encode('utf-8'), dtype=np.uint8))
+    return len(text.split())
+
+def get_text_forms(soup: BeautifulSoup) -> Tuple[str, str]:
+    """
+    نص الصفحة بصيغتيه بمرور واحد على الشجرة
+    يعيد: (نص مدمج مثل get_text(), نص بأسطر مثل get_text('\\n', strip=True))
+    """
+    strings = list(soup.strings)
+    flat_text = ''.join(strings)
+    lines_text = '\n'.join(stripped for stripped in (s.strip() for s in strings) if stripped)
+    return flat_text, lines_text
+
 def clean_text(text: str) -> str:
     """تنظيف النص من المسافات الزائدة والأحرف غير المرغوبة"""
     if not text:
         return ""
     
-    text = re.sub(r'\s+', ' ', text.strip())
-    text = re.sub(r'[\r\n\t]+', ' ', text)
+    # \s تشمل \r\n\t - تمرير واحد يكفي
+    text = _WS_RE.sub(' ', text.strip())
     text = text.replace('\u200c', '').replace('\u200d', '')  # إزالة zero-width characters
     
     return text.strip()
 
+# مجمع النصوص المتكررة (عناوين الفصول والأجزاء وأسماء المؤلفين) للكتاب الحالي
+# كل تكرار يشير إلى كائن str واحد بدلاً من نسخة جديدة في كل فصل
+_STR_POOL: Dict[str, str] = {}
+
+def intern_str(text: str) -> str:
+    """إرجاع النسخة المشتركة من النص من المجمع"""
+    return _STR_POOL.setdefault(text, text)
+
 # ========= استخراج بيانات الكتاب المحسن =========
 def extract_enhanced_book_info(book_id: str) -> Tuple[Book, BeautifulSoup]:
     """استخراج بيانات الكتاب بطريقة محسنة"""
@@ -843,26 +1355,29 @@ def extract_enhanced_book_info(book_id: str) -> Tuple[Book, BeautifulSoup]:
     if not title:
         raise EnhancedShamelaScraperError(f"لم يتم العثور على عنوان للكتاب {book_id}")
     
+    # نص الصفحة يُحسب مرة واحدة ويُمرر لكل المستخرجات
+    flat_text, lines_text = get_text_forms(soup)
+    
     # استخراج بطاقة الكتاب الكاملة (المحسن)
-    description = extract_book_card(soup)
+    description = extract_book_card(soup, flat_text)
     
     # استخراج المؤلفين
     authors = extract_authors(soup)
     
     # استخراج بيانات الناشر (المحسن)
-    publisher = extract_publisher_info(soup)
+    publisher = extract_publisher_info(soup, lines_text)
     
     # استخراج بيانات القسم (جديد)
-    book_section = extract_book_section(soup)
+    book_section = extract_book_section(soup, flat_text)
     
     # استخراج بيانات الطبعة المحسنة
-    edition, edition_number, publication_year, edition_date_hijri = extract_enhanced_edition_info(soup)
+    edition, edition_number, publication_year, edition_date_hijri = extract_enhanced_edition_info(soup, flat_text)
     
     # فحص الترقيم الأصلي
-    has_original_pagination = check_original_pagination(soup)
+    has_original_pagination = check_original_pagination(soup, flat_text)
     
     # استخراج باقي البيانات
-    page_count, volume_count, categories = extract_additional_info(soup)
+    page_count, volume_count, categories = extract_additional_info(soup, flat_text)
     
     # إنشاء كائن الكتاب
     book = Book(
@@ -886,12 +1401,19 @@ def extract_enhanced_book_info(book_id: str) -> Tuple[Book, BeautifulSoup]:
     logger.info(f"تم استخراج البيانات المحسنة للكتاب {book_id}")
     return book, soup
 
-def extract_book_card(soup: BeautifulSoup) -> str:
+# عناصر الفهرس والمحتويات والروابط الاجتماعية داخل بطاقة الكتاب
+_CARD_UNWANTED_SELECTOR = (
+    ".betaka-index, .book-index, .index, #book-index, .table-of-contents, .s-nav, div.s-nav, ul, ol, "
+    ".share, .social, .social-share, .share-buttons, .social-links"
+)
+
+def extract_book_card(soup: BeautifulSoup, text_content: Optional[str] = None) -> str:
     """
     استخراج بطاقة الكتاب الكاملة من عنوان "بطاقة الكتاب" إلى "فهرس الموضوعات" قبل خيارات المشاركة
     """
     # البحث عن المحتوى بين "بطاقة الكتاب" و "فهرس الموضوعات"
-    text_content = soup.get_text()
+    if text_content is None:
+        text_content = soup.get_text()
     
     # البحث عن نقطة البداية
     start_patterns = [
@@ -943,8 +1465,8 @@ def extract_book_card(soup: BeautifulSoup) -> str:
     
     # تنظيف المسافات الزائدة مع الحفاظ على فواصل الأسطر
     # بدلاً من دمج الأسطر، نقلل التكرارات الزائدة فقط
-    description = re.sub(r'\n{3,}', '\n\n', description)  # تقليل تكرارات \n الزائدة
-    description = re.sub(r'[ \t]+', ' ', description)     # تنظيف المسافات الأفقية فقط
+    description = _MULTI_NL_RE.sub('\n\n', description)  # تقليل تكرارات \n الزائدة
+    description = _HSPACE_RE.sub(' ', description)     # تنظيف المسافات الأفقية فقط
     description = description.strip()
     
     # إذا لم نجد محتوى كافي، نستخدم الطريقة القديمة كبديل
@@ -957,16 +1479,12 @@ def extract_book_card(soup: BeautifulSoup) -> str:
         for selector in card_selectors:
             elements = soup.select(selector)
             for element in elements:
-                # إنشاء نسخة من العنصر لتجنب تعديل الأصل
-                element_copy = element.__copy__()
+                # إنشاء شجرة مستقلة من العنصر لتجنب تعديل الأصل
+                element_copy = BeautifulSoup(element.decode(), BS4_PARSER)
                 
-                # إزالة عناصر الفهرس والمحتويات
-                for index_elem in element_copy.select(".betaka-index, .book-index, .index, #book-index, .table-of-contents, .s-nav, div.s-nav, ul, ol"):
-                    index_elem.decompose()
-                
-                # إزالة عناصر المشاركة والروابط الاجتماعية
-                for share_elem in element_copy.select(".share, .social, .social-share, .share-buttons, .social-links"):
-                    share_elem.decompose()
+                # إزالة عناصر الفهرس والمحتويات والمشاركة بمحدد واحد
+                for unwanted_elem in element_copy.select(_CARD_UNWANTED_SELECTOR):
+                    unwanted_elem.decompose()
                 
                 # استخراج النص مع الحفاظ على فواصل الأسطر
                 text = element_copy.get_text(separator="\n", strip=True)
@@ -976,8 +1494,8 @@ def extract_book_card(soup: BeautifulSoup) -> str:
                     text = text.replace(phrase, "")
                 
                 # تطبيع فواصل الأسطر مع الحفاظ عليها
-                text = re.sub(r'\n{3,}', '\n\n', text)  # تقليل التكرارات الزائدة
-                text = re.sub(r'[ \t]+', ' ', text)     # تنظيف المسافات الأفقية فقط
+                text = _MULTI_NL_RE.sub('\n\n', text)  # تقليل التكرارات الزائدة
+                text = _HSPACE_RE.sub(' ', text)     # تنظيف المسافات الأفقية فقط
                 text = text.strip()
                 
                 if len(text) > 50:
@@ -1005,11 +1523,11 @@ def extract_authors(soup: BeautifulSoup) -> List[Author]:
             if name and len(name) > 2:
                 # تجنب التكرار
                 if not any(author.name == name for author in authors):
-                    authors.append(Author(name=name))
+                    authors.append(Author(name=intern_str(name)))
     
     return authors
 
-def extract_publisher_info(soup: BeautifulSoup) -> Optional[Publisher]:
+def extract_publisher_info(soup: BeautifulSoup, text_content: Optional[str] = None) -> Optional[Publisher]:
     """
     استخراج بيانات الناشر المحسنة - من بعد "الناشر:" حتى نهاية السطر
     """
@@ -1021,7 +1539,8 @@ def extract_publisher_info(soup: BeautifulSoup) -> Optional[Publisher]:
         r'نشر\s*[:：]\s*([^\n]+)',
     ]
     
-    text_content = soup.get_text(separator='\n', strip=True)
+    if text_content is None:
+        text_content = soup.get_text(separator='\n', strip=True)
     
     for pattern in publisher_patterns:
         match = re.search(pattern, text_content)
@@ -1059,7 +1578,7 @@ def extract_publisher_info(soup: BeautifulSoup) -> Optional[Publisher]:
     
     return None
 
-def extract_book_section(soup: BeautifulSoup) -> Optional[BookSection]:
+def extract_book_section(soup: BeautifulSoup, text_content: Optional[str] = None) -> Optional[BookSection]:
     """
     استخراج قسم الكتاب
     """
@@ -1082,7 +1601,8 @@ def extract_book_section(soup: BeautifulSoup) -> Optional[BookSection]:
         r'الموضوع\s*[:：]\s*([^،\n]+)',
     ]
     
-    text_content = soup.get_text()
+    if text_content is None:
+        text_content = soup.get_text()
     for pattern in section_patterns:
         match = re.search(pattern, text_content)
         if match:
@@ -1092,11 +1612,12 @@ def extract_book_section(soup: BeautifulSoup) -> Optional[BookSection]:
     
     return None
 
-def extract_enhanced_edition_info(soup: BeautifulSoup) -> Tuple[Optional[str], Optional[int], Optional[int], Optional[str]]:
+def extract_enhanced_edition_info(soup: BeautifulSoup, text_content: Optional[str] = None) -> Tuple[Optional[str], Optional[int], Optional[int], Optional[str]]:
     """
     استخراج بيانات الطبعة المحسنة مع التعامل مع الكتب بدون تاريخ نشر
     """
-    text_content = soup.get_text()
+    if text_content is None:
+        text_content = soup.get_text()
     
     edition = None
     edition_number = None
@@ -1152,11 +1673,12 @@ def extract_enhanced_edition_info(soup: BeautifulSoup) -> Tuple[Optional[str], O
     
     return edition, edition_number, publication_year, edition_date_hijri
 
-def check_original_pagination(soup: BeautifulSoup) -> bool:
+def check_original_pagination(soup: BeautifulSoup, text_content: Optional[str] = None) -> bool:
     """
     فحص ما إذا كان الكتاب يستخدم ترقيم الصفحات الأصلي
     """
-    text_content = soup.get_text()
+    if text_content is None:
+        text_content = soup.get_text()
     
     pagination_indicators = [
         "ترقيم الكتاب موافق للمطبوع",
@@ -1172,9 +1694,10 @@ def check_original_pagination(soup: BeautifulSoup) -> bool:
     
     return False
 
-def extract_additional_info(soup: BeautifulSoup) -> Tuple[Optional[int], Optional[int], List[str]]:
+def extract_additional_info(soup: BeautifulSoup, text_content: Optional[str] = None) -> Tuple[Optional[int], Optional[int], List[str]]:
     """استخراج المعلومات الإضافية"""
-    text_content = soup.get_text()
+    if text_content is None:
+        text_content = soup.get_text()
     
     page_count = None
     volume_count = None
@@ -1287,20 +1810,15 @@ def extract_enhanced_book_index(book_id: str, soup: BeautifulSoup) -> List[Chapt
                 continue
             
             # استخراج رقم الصفحة
-            page_number = None
             page_end = None
-            
-            href = link.get("href", "")
-            page_match = re.search(rf"/book/{book_id}/(\d+)", href)
-            if page_match:
-                page_number = int(page_match.group(1))
+            page_number = _extract_page_id(book_id, link.get("href", ""))
             
             # تحديد نوع الفصل
             chapter_type = 'sub' if level > 0 else 'main'
             
             # إنشاء الفصل
             chapter = Chapter(
-                title=title,
+                title=intern_str(title),
                 order=current_order,
                 page_number=page_number,
                 page_end=page_end,
@@ -1342,62 +1860,118 @@ def extract_enhanced_book_index(book_id: str, soup: BeautifulSoup) -> List[Chapt
     return chapters
 
 # ========= حساب عدد الصفحات من واجهة القراءة =========
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+def _extract_title_text(html_text: str) -> str:
+    """قراءة نص <title> من HTML الخام دون بناء شجرة"""
+    match = _TITLE_RE.search(html_text)
+    return html_lib.unescape(match.group(1)).strip() if match else ""
+
+def _find_max_reader_page(html_text: str, book_id: str, url: str) -> int:
+    """أكبر رقم صفحة داخلي تشير إليه روابط صفحة القراءة"""
+    # أكبر رقم صفحة في جميع روابط الصفحة بمسح regex واحد للنص الخام
+    max_internal_page = max(
+        (int(m.group(1)) for m in _book_page_re(book_id).finditer(html_text)),
+        default=1
+    )
+
+    # إن لم يُعثر على شيء، نعود لفحص شجرة DOM
+    if max_internal_page == 1:
+        soup = get_soup(url)
+
+        # البحث عن رابط ">>" في شريط الصفحات
+        next_links = soup.find_all("a", string=re.compile(r'>>|»|التالي'))
+        for link in next_links:
+            page_number = _extract_page_id(book_id, link.get("href", ""))
+            if page_number is not None:
+                max_internal_page = max(max_internal_page, page_number)
+
+        # إن غاب ">>", استخرج من جميع الروابط في الصفحة
+        if max_internal_page == 1:
+            all_page_links = soup.find_all("a", href=_book_link_re(book_id))
+            for link in all_page_links:
+                href = link.get("href", "")
+                # تجاهل fragment (#...)
+                href = href.split('#')[0]
+                page_number = _extract_page_id(book_id, href)
+                if page_number is not None:
+                    max_internal_page = max(max_internal_page, page_number)
+
+    return max_internal_page
+
+def _read_printed_page_count(normalized_id: str, page_count_internal: int, first_html_text: str,
+                             has_original_pagination: Optional[bool] = None) -> Optional[int]:
+    """
+    قراءة رقم الصفحة المطبوع لآخر صفحة
+    لا يُرسل طلب إضافي إن كانت الصفحة الأولى هي الأخيرة
+    أو إن خلت من ترقيم مطبوع والكتاب غير موافق للمطبوع
+    """
+    first_printed = extract_printed_page_number(_extract_title_text(first_html_text))
+
+    if page_count_internal <= 1:
+        return first_printed
+
+    if first_printed is None and has_original_pagination is False:
+        logger.info("لا يوجد ترقيم مطبوع - تخطي جلب آخر صفحة")
+        return None
+
+    # فتح آخر صفحة واقرأ رقم ص من <title>
+    try:
+        last_page_url = f"{BASE_URL}/book/{normalized_id}/{page_count_internal}"
+        last_html_text = safe_request(last_page_url).content.decode('utf-8', errors='replace')
+        return extract_printed_page_number(_extract_title_text(last_html_text))
+    except Exception as e:
+        logger.warning(f"خطأ في قراءة آخر صفحة: {e}")
+        return None
+
+def fetch_book_structure(book_id: str, has_original_pagination: Optional[bool] = None
+                         ) -> Tuple[List[Volume], int, Optional[int]]:
+    """
+    استخراج بنية الكتاب من صفحة القراءة الأولى بطلب واحد
+    يعيد: (volumes, page_count_internal, page_count_printed)
+    """
+    logger.info(f"استخراج بنية الكتاب {book_id} من واجهة القراءة")
+
+    normalized_id = normalize_book_id(book_id)
+    url = f"{BASE_URL}/book/{normalized_id}/1"
+    html_bytes = safe_request(url).content
+    html_text = html_bytes.decode('utf-8', errors='replace')
+
+    page_count_internal = _find_max_reader_page(html_text, book_id, url)
+    logger.info(f"عدد الصفحات الداخلي: {page_count_internal}")
+
+    volumes = _volumes_from_reader_html(html_bytes, book_id, url, page_count_internal)
+
+    page_count_printed = _read_printed_page_count(
+        normalized_id, page_count_internal, html_text, has_original_pagination
+    )
+    if page_count_printed:
+        logger.info(f"عدد الصفحات المطبوع: {page_count_printed}")
+    else:
+        logger.info("لا يوجد ترقيم مطبوع في آخر صفحة")
+
+    return volumes, page_count_internal, page_count_printed
+
 def calculate_page_counts_from_reader(book_id: str) -> Tuple[int, Optional[int]]:
     """
     حساب عدد الصفحات من واجهة القراءة (ليس من البطاقة)
     يعيد: (page_count_internal, page_count_printed)
     """
     logger.info(f"حساب عدد الصفحات من واجهة القراءة للكتاب {book_id}")
-    
+
     normalized_id = normalize_book_id(book_id)
-    # الخطوة 1: فتح صفحة /book/{id}/1
     url = f"{BASE_URL}/book/{normalized_id}/1"
-    soup = get_soup(url)
-    
-    max_internal_page = 1
-    
-    # الخطوة 2: البحث عن رابط ">>" في شريط الصفحات
-    next_links = soup.find_all("a", string=re.compile(r'>>|»|التالي'))
-    for link in next_links:
-        href = link.get("href", "")
-        page_match = re.search(rf"/book/{book_id}/(\d+)", href)
-        if page_match:
-            max_internal_page = max(max_internal_page, int(page_match.group(1)))
-    
-    # الخطوة 3: إن غاب ">>", استخرج من جميع الروابط في الصفحة
-    if max_internal_page == 1:
-        all_page_links = soup.find_all("a", href=re.compile(rf"/book/{book_id}/(\d+)"))
-        for link in all_page_links:
-            href = link.get("href", "")
-            # تجاهل fragment (#...)
-            href = href.split('#')[0]
-            page_match = re.search(rf"/book/{book_id}/(\d+)", href)
-            if page_match:
-                page_number = int(page_match.group(1))
-                max_internal_page = max(max_internal_page, page_number)
-    
-    page_count_internal = max_internal_page
+    html_text = safe_request(url).content.decode('utf-8', errors='replace')
+
+    page_count_internal = _find_max_reader_page(html_text, book_id, url)
     logger.info(f"عدد الصفحات الداخلي: {page_count_internal}")
-    
-    # الخطوة 4: حساب عدد الصفحات المطبوع (إن وُجد)
-    page_count_printed = None
-    
-    # فتح آخر صفحة واقرأ رقم ص من <title>
-    try:
-        last_page_url = f"{BASE_URL}/book/{normalized_id}/{page_count_internal}"
-        last_page_soup = get_soup(last_page_url)
-        
-        # استخراج رقم الصفحة المطبوع من <title>
-        printed_page = extract_printed_page_number(last_page_soup)
-        if printed_page:
-            page_count_printed = printed_page
-            logger.info(f"عدد الصفحات المطبوع: {page_count_printed}")
-        else:
-            logger.info("لا يوجد ترقيم مطبوع في آخر صفحة")
-            
-    except Exception as e:
-        logger.warning(f"خطأ في قراءة آخر صفحة: {e}")
-    
+
+    page_count_printed = _read_printed_page_count(normalized_id, page_count_internal, html_text)
+    if page_count_printed:
+        logger.info(f"عدد الصفحات المطبوع: {page_count_printed}")
+    else:
+        logger.info("لا يوجد ترقيم مطبوع في آخر صفحة")
+
     return page_count_internal, page_count_printed
 
 def build_page_navigation_map(book_id: str, total_pages: int, has_original_pagination: bool) -> Dict[int, int]:
@@ -1468,44 +2042,107 @@ def find_internal_page_for_printed(printed_page: int, navigation_map: Dict[int,
     return None
 
 # ========= استخراج المجلدات من dropdown والترقيم المطبوع =========
+_ARABIC_HINDI_DIGITS = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
+
+@lru_cache(maxsize=4096)
 def convert_arabic_hindi_digits(text: str) -> str:
     """
     تحويل الأرقام العربية-الهندية إلى غربية
     """
-    arabic_hindi_map = {
-        '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
-        '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9'
-    }
-    
-    for arabic, western in arabic_hindi_map.items():
-        text = text.replace(arabic, western)
-    
-    return text
+    return text.translate(_ARABIC_HINDI_DIGITS)
 
-def extract_volumes_from_dropdown(book_id: str) -> List[Volume]:
+@lru_cache(maxsize=64)
+def _book_page_re(book_id: str) -> re.Pattern:
+    """نمط مترجم لروابط صفحات الكتاب داخل سمات href"""
+    return re.compile(rf"""href\s*=\s*["']?[^"'\s>]*/book/{re.escape(book_id)}/(\d+)""")
+
+# أرقام غربية أو عربية-هندية أو فارسية
+_HAS_DIGIT = re.compile(r'[0-9\u0660-\u0669\u06F0-\u06F9]')
+
+def _is_volume_link(href: str, text: str, book_id: str) -> bool:
+    """التحقق من أن رابط القائمة يشير إلى جزء من الكتاب"""
+    return bool(href and f"/book/{book_id}/" in href and
+                ("#p1" in href or _HAS_DIGIT.search(text)))
+
+def _stream_dropdown_links(html_bytes: bytes, book_id: str, chunk_size: int = 65536) -> List[Tuple[str, str]]:
     """
-    استخراج المجلدات من قائمة "ج:" في صفحة القراءة
-    يحسب internal_start / internal_end بدقة من dropdown
+    قراءة روابط قائمة الأجزاء بمحلل lxml تدريجي دون بناء شجرة BeautifulSoup
+    بنفس أولوية محددات _select_dropdown_links: كل فئة تُجمع من المستند كله،
+    ويُعاد أول فئة غير فارغة (روابط #p1 في ul.dropdown-menu أولاً)
     """
-    logger.info(f"استخراج المجلدات من dropdown للكتاب {book_id}")
-    
-    normalized_id = normalize_book_id(book_id)
-    # فتح صفحة قراءة واحدة
-    url = f"{BASE_URL}/book/{normalized_id}/1"
-    soup = get_soup(url)
-    
-    volumes = []
-    volume_data = []
-    
-    # البحث عن قائمة dropdown "رقم الجزء"
-    dropdown_selectors = [
-        'ul.dropdown-menu a[href*="#p1"]',
+    parser = etree.HTMLPullParser(events=('start', 'end'), encoding='utf-8')
+    # العناصر المفتوحة التي تحدد فئة ما بداخلها: (العنصر، النوع)
+    open_containers = []
+    open_kinds = {'ul_menu': 0, 'menu': 0, 'volume_select': 0, 'part_select': 0}
+    # بترتيب dropdown_selectors في _select_dropdown_links
+    found_by_selector = ([], [], [], [], [])
+
+    def container_kinds(tag: str, elem) -> List[str]:
+        kinds = []
+        if 'dropdown-menu' in (elem.get('class') or '').split():
+            kinds.append('menu')
+            if tag == 'ul':
+                kinds.append('ul_menu')
+        elif tag == 'select':
+            name = elem.get('name') or ''
+            if 'volume' in name:
+                kinds.append('volume_select')
+            if 'part' in name:
+                kinds.append('part_select')
+        return kinds
+
+    def read_events() -> None:
+        for event, elem in parser.read_events():
+            tag = elem.tag if isinstance(elem.tag, str) else ''
+            if event == 'start':
+                kinds = container_kinds(tag, elem)
+                if kinds:
+                    open_containers.append((elem, kinds))
+                    for kind in kinds:
+                        open_kinds[kind] += 1
+                continue
+
+            if tag == 'a' and open_kinds['menu']:
+                href = elem.get('href', '')
+                text = clean_text(''.join(elem.itertext()))
+                if _is_volume_link(href, text, book_id):
+                    if open_kinds['ul_menu']:
+                        if '#p1' in href:
+                            found_by_selector[0].append((href, text))
+                        if 'book' in href:
+                            found_by_selector[1].append((href, text))
+                    found_by_selector[2].append((href, text))
+            elif tag == 'option' and (open_kinds['volume_select'] or open_kinds['part_select']):
+                href = elem.get('href', '')
+                text = clean_text(''.join(elem.itertext()))
+                if _is_volume_link(href, text, book_id):
+                    if open_kinds['volume_select']:
+                        found_by_selector[3].append((href, text))
+                    if open_kinds['part_select']:
+                        found_by_selector[4].append((href, text))
+            elif open_containers and elem is open_containers[-1][0]:
+                for kind in open_containers.pop()[1]:
+                    open_kinds[kind] -= 1
+
+    for offset in range(0, len(html_bytes), chunk_size):
+        parser.feed(html_bytes[offset:offset + chunk_size])
+        read_events()
+    parser.close()
+    read_events()
+
+    return next((links for links in found_by_selector if links), [])
+
+def _select_dropdown_links(soup: BeautifulSoup, book_id: str) -> List[Tuple[str, str]]:
+    """قراءة روابط قائمة الأجزاء من soup كامل (عند غياب lxml)"""
+    # البحث عن قائمة dropdown "رقم الجزء"
+    dropdown_selectors = [
+        'ul.dropdown-menu a[href*="#p1"]',
         'ul.dropdown-menu a[href*="book"]',
         '.dropdown-menu a',
         'select[name*="volume"] option',
         'select[name*="part"] option'
     ]
-    
+
     found_links = []
     for selector in dropdown_selectors:
         links = soup.select(selector)
@@ -1514,26 +2151,65 @@ def extract_volumes_from_dropdown(book_id: str) -> List[Volume]:
             for link in links:
                 href = link.get("href", "")
                 text = clean_text(link.get_text())
-                
+
                 # التحقق من أن الرابط يحتوي على معرف الكتاب و #p1
-                if (href and f"/book/{book_id}/" in href and 
-                    ("#p1" in href or text.isdigit() or 
-                     any(c.isdigit() for c in convert_arabic_hindi_digits(text)))):
-                    found_links.append(link)
-            
+                if _is_volume_link(href, text, book_id):
+                    found_links.append((href, text))
+
             if found_links:
                 break
-    
+
+    return found_links
+
+# قوائم dropdown فقط (مع ما بداخلها) - باقي صفحة القراءة لا يُبنى كشجرة أصلاً
+_DROPDOWN_STRAINER = SoupStrainer(attrs={'class': 'dropdown-menu'})
+
+def _strained_dropdown_links(html_bytes: bytes, book_id: str, url: str) -> List[Tuple[str, str]]:
+    """
+    روابط الأجزاء عبر BeautifulSoup (عند غياب lxml) بتحليل قوائم dropdown وحدها
+    قوائم <select> لا تمر عبر المصفي، فتُقرأ من الصفحة كاملة إن لم توجد قائمة
+    """
+    found_links = _select_dropdown_links(
+        BeautifulSoup(html_bytes, 'html.parser', parse_only=_DROPDOWN_STRAINER), book_id
+    )
+    return found_links or _select_dropdown_links(get_soup(url), book_id)
+
+def extract_volumes_from_dropdown(book_id: str) -> List[Volume]:
+    """
+    استخراج المجلدات من قائمة "ج:" في صفحة القراءة
+    يحسب internal_start / internal_end بدقة من dropdown
+    """
+    logger.info(f"استخراج المجلدات من dropdown للكتاب {book_id}")
+
+    normalized_id = normalize_book_id(book_id)
+    # فتح صفحة قراءة واحدة
+    url = f"{BASE_URL}/book/{normalized_id}/1"
+    html_bytes = safe_request(url).content
+
+    # البحث عن أكبر رقم صفحة داخلي في الصفحة
+    max_internal_page = _find_max_reader_page(
+        html_bytes.decode('utf-8', errors='replace'), book_id, url
+    )
+    return _volumes_from_reader_html(html_bytes, book_id, url, max_internal_page)
+
+def _volumes_from_reader_html(html_bytes: bytes, book_id: str, url: str,
+                              max_internal_page: int) -> List[Volume]:
+    """بناء قائمة الأجزاء من HTML صفحة القراءة المحمّلة مسبقاً"""
+    volumes = []
+    volume_data = []
+
+    if LXML_AVAILABLE:
+        found_links = _stream_dropdown_links(html_bytes, book_id)
+    else:
+        found_links = _strained_dropdown_links(html_bytes, book_id, url)
+
     if not found_links:
         logger.warning(f"لم يتم العثور على قائمة dropdown للأجزاء في الكتاب {book_id}")
         # إنشاء جزء واحد افتراضي
         return [Volume(number=1, title="المجلد الأول", page_start=1, page_end=None)]
-    
+
     # استخراج البيانات من الروابط
-    for link in found_links:
-        href = link.get("href", "")
-        text = clean_text(link.get_text())
-        
+    for href, text in found_links:
         # تجاهل العناصر غير الرقمية أو العناوين
         if not text or text in ["رقم الجزء", "الجزء", "المجلد"]:
             continue
@@ -1542,19 +2218,17 @@ def extract_volumes_from_dropdown(book_id: str) -> List[Volume]:
         converted_text = convert_arabic_hindi_digits(text)
         
         # استخراج رقم الجزء من النص
-        volume_match = re.search(r'(\d+)', converted_text)
+        volume_match = _NUMBER_RE.search(converted_text)
         if not volume_match:
             continue
         
         volume_number = int(volume_match.group(1))
         
         # استخراج startN من href="/book/{id}/{N}#p1"
-        page_match = re.search(rf"/book/{book_id}/(\d+)", href)
-        if not page_match:
+        internal_start = _extract_page_id(book_id, href)
+        if internal_start is None:
             continue
         
-        internal_start = int(page_match.group(1))
-        
         volume_data.append((volume_number, internal_start))
     
     # إزالة التكرارات وأخذ أصغر startN لنفس رقم الجزء
@@ -1572,16 +2246,6 @@ def extract_volumes_from_dropdown(book_id: str) -> List[Volume]:
         logger.warning(f"لم يتم العثور على أجزاء صالحة في الكتاب {book_id}")
         return [Volume(number=1, title="المجلد الأول", page_start=1, page_end=None)]
     
-    # البحث عن أكبر رقم صفحة داخلي في الصفحة
-    max_internal_page = 1
-    all_page_links = soup.find_all("a", href=re.compile(rf"/book/{book_id}/(\d+)"))
-    for link in all_page_links:
-        href = link.get("href", "")
-        page_match = re.search(rf"/book/{book_id}/(\d+)", href)
-        if page_match:
-            page_num = int(page_match.group(1))
-            max_internal_page = max(max_internal_page, page_num)
-    
     # حساب النهايات
     for i, (vol_num, start_page) in enumerate(sorted_volumes):
         if i + 1 < len(sorted_volumes):
@@ -1593,7 +2257,7 @@ def extract_volumes_from_dropdown(book_id: str) -> List[Volume]:
         
         volume = Volume(
             number=vol_num,
-            title=f"الجزء {vol_num}",
+            title=intern_str(f"الجزء {vol_num}"),
             page_start=start_page,
             page_end=end_page
         )
@@ -1605,11 +2269,17 @@ def extract_volumes_from_dropdown(book_id: str) -> List[Volume]:
     
     return volumes
 
+# رقم الصفحة المطبوع في <title> مثل "ص ١٢" أو "ص: 12"
+_PRINTED_PAGE_RE = re.compile(r'[صس]\s*[:：]?\s*([0-9\u0660-\u0669]+)')
+
 def extract_printed_page_number(soup_or_title) -> Optional[int]:
     """
     استخراج رقم الصفحة المطبوع من <title>
     """
-    if hasattr(soup_or_title, 'find'):
+    if isinstance(soup_or_title, str):
+        # إذا تم تمرير نص العنوان مباشرة
+        title_text = soup_or_title
+    elif hasattr(soup_or_title, 'find'):
         # إذا تم تمرير soup
         title_tag = soup_or_title.find('title')
         title_text = title_tag.get_text() if title_tag else ""
@@ -1624,8 +2294,7 @@ def extract_printed_page_number(soup_or_title) -> Optional[int]:
         return None
     
     # Regex مرن لاستخراج رقم الصفحة
-    pattern = r'[صس]\s*[:：]?\s*([0-9\u0660-\u0669]+)'
-    match = re.search(pattern, title_text)
+    match = _PRINTED_PAGE_RE.search(title_text)
     
     if match:
         page_number_text = match.group(1)
@@ -1668,19 +2337,18 @@ def extract_volume_links(book_id: str, soup: BeautifulSoup) -> List[VolumeLink]:
             continue
         
         # استخراج رقم الصفحة من الرابط
-        page_match = re.search(rf"/book/{book_id}/(\d+)", href)
-        if page_match:
-            page_start = int(page_match.group(1))
+        page_start = _extract_page_id(book_id, href)
+        if page_start is not None:
             
             # استخراج رقم المجلد من العنوان
-            volume_match = re.search(r'(\d+)', title)
+            volume_match = _NUMBER_RE.search(title)
             volume_number = int(volume_match.group(1)) if volume_match else len(volume_links) + 1
             
             # تجنب التكرار
             if not any(vl.volume_number == volume_number for vl in volume_links):
                 volume_link = VolumeLink(
                     volume_number=volume_number,
-                    title=title,
+                    title=intern_str(title),
                     url=href,
                     page_start=page_start
                 )
@@ -1699,34 +2367,216 @@ def extract_volume_links(book_id: str, soup: BeautifulSoup) -> List[VolumeLink]:
     return volume_links
 
 # ========= استخراج المحتوى المحسن =========
-def extract_enhanced_page_content(book_id: str, page_number: int, has_original_pagination: bool = False, 
-                                config: PerformanceConfig = None) -> PageContent:
+# محددات المحتوى الرئيسي والعناصر غير المرغوبة في صفحة القارئ
+_PAGE_CONTENT_SELECTORS = (
+    "#book", "div#text", "article", "div.reader-text",
+    "div.col-md-9", "div.nass", ".book-content", ".page-content", "main"
+)
+_PAGE_UNWANTED_SELECTORS = (
+    "script", "style", "nav", ".share", ".social", ".ad", 
+    ".advertisement", ".menu", ".sidebar", ".header", ".footer"
+)
+
+def _simple_selector_parts(selector: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """تفكيك محدد CSS بسيط إلى (وسم، معرف، صنف)"""
+    if '#' in selector:
+        tag, _, ident = selector.partition('#')
+        return tag or None, ident, None
+    if '.' in selector:
+        tag, _, cls = selector.partition('.')
+        return tag or None, None, cls
+    return selector, None, None
+
+# المحددات مفككة مرة واحدة - مصدر واحد لمسار شجرة lxml ومسار أحداث SAX
+_PAGE_CONTENT_MATCHERS = tuple(_simple_selector_parts(sel) for sel in _PAGE_CONTENT_SELECTORS)
+_PAGE_UNWANTED_MATCHERS = tuple(_simple_selector_parts(sel) for sel in _PAGE_UNWANTED_SELECTORS)
+
+def _select_main_content(candidates, fallback):
+    """أول مرشح موجود بترتيب محددات المحتوى ثم body، وإلا المستند كله"""
+    return next((candidate for candidate in candidates if candidate is not None), fallback)
+
+def _finish_page_text(text_nodes) -> str:
+    """نفس get_text(separator="\n", strip=True) في BeautifulSoup مع تقليل الأسطر الفارغة المتكررة"""
+    content = '\n'.join(stripped for stripped in (s.strip() for s in text_nodes) if stripped)
+    return _MULTI_NL_RE.sub('\n\n', content).strip()
+
+if LXML_AVAILABLE:
+    def _matcher_to_xpath(matcher: Tuple[Optional[str], Optional[str], Optional[str]], prefix: str) -> str:
+        """تحويل محدد مفكك إلى XPath بنفس دلالة _selector_matches"""
+        tag_name, ident, cls = matcher
+        if ident is not None:
+            return f"{prefix}{tag_name or '*'}[@id='{ident}']"
+        if cls is not None:
+            return f"{prefix}{tag_name or '*'}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+        return f"{prefix}{tag_name}"
+    
+    _PAGE_CONTENT_XPATHS = tuple(etree.XPath(f"({_matcher_to_xpath(m, '//')})[1]") for m in _PAGE_CONTENT_MATCHERS)
+    _PAGE_UNWANTED_XPATH = etree.XPath(" | ".join(_matcher_to_xpath(m, './/') for m in _PAGE_UNWANTED_MATCHERS))
+    _PAGE_TEXT_XPATH = etree.XPath("descendant::text()", smart_strings=False)
+    # صفحات شاملة بترميز UTF-8
+    _UTF8_HTML_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+def _parse_page_lxml(raw_html: bytes, keep_html: bool) -> Optional[Tuple[str, Optional[str], str, None]]:
     """
-    استخراج محتوى الصفحة مع دعم الترقيم الأصلي وتحسينات الأداء
+    تحليل صفحة القارئ مباشرة بـ lxml دون بناء شجرة BeautifulSoup
+    يعيد: (النص، HTML المحتوى أو None، نص <title>، None) أو None للتراجع إلى BeautifulSoup
     """
-    if config is None:
-        config = PerformanceConfig()
+    try:
+        tree = lxml_html.document_fromstring(raw_html, parser=_UTF8_HTML_PARSER)
+    except (etree.ParserError, ValueError):
+        return None
+    
+    # المرشحون يُقيَّمون بالترتيب ويتوقف البحث عند أول تطابق
+    candidates = (next(iter(content_xpath(tree)), None) for content_xpath in _PAGE_CONTENT_XPATHS)
+    main_content = _select_main_content(itertools.chain(candidates, (tree.find('body'),)), tree)
+    
+    # تفريغ العناصر غير المرغوبة مع الإبقاء على النص الذي يليها عقدة مستقلة
+    unwanted = _PAGE_UNWANTED_XPATH(main_content)
+    for element in unwanted:
+        element.clear(keep_tail=True)
+    
+    content = _finish_page_text(_PAGE_TEXT_XPATH(main_content))
+    
+    html_content = None
+    if keep_html:
+        for element in unwanted:
+            element.drop_tree()
+        html_content = etree.tostring(main_content, encoding='unicode', method='html', with_tail=False)
+    
+    return content, html_content, tree.findtext('.//title') or "", None
+
+def _selector_matches(matcher: Tuple[Optional[str], Optional[str], Optional[str]], tag: str, attrib) -> bool:
+    """مطابقة عنصر (وسم وسمات) مع محدد بسيط مفكك"""
+    tag_name, ident, cls = matcher
+    if tag_name is not None and tag_name != tag:
+        return False
+    if ident is not None and attrib.get('id') != ident:
+        return False
+    if cls is not None and cls not in (attrib.get('class') or '').split():
+        return False
+    return True
+
+class ShamelaSAXTarget:
+    """
+    هدف SAX لمحلل lxml: يجمع نص حاوي المحتوى أثناء التحليل دون بناء شجرة
+    يتابع أول عنصر لكل محدد محتوى (ثم body ثم المستند كاحتياط) ويتخطى
+    النص داخل العناصر غير المرغوبة - بنفس نتيجة مسار BeautifulSoup
+    """
+    
+    def __init__(self):
+        # لكل مرشح: [عمق العنصر، عدد العناصر غير المرغوبة المفتوحة عند بدايته، النصوص]
+        self._candidates: List[Optional[list]] = [None] * (len(_PAGE_CONTENT_MATCHERS) + 1)
+        self._document: list = [0, 0, []]
+        self._open: List[list] = [self._document]
+        self._unwanted_flags: List[bool] = []
+        self._unwanted_open = 0
+        self._buffer: List[str] = []
+        self._title_depth: Optional[int] = None
+        self._title: Optional[str] = None
+    
+    def _flush(self) -> None:
+        """عقدة نصية انتهت: تُضاف لكل مرشح مفتوح لا تقع داخل عنصر غير مرغوب فيه"""
+        if not self._buffer:
+            return
+        text = ''.join(self._buffer)
+        self._buffer = []
+        if self._title_depth is not None and self._title is None:
+            self._title = text
+        for candidate in self._open:
+            if candidate[1] == self._unwanted_open:
+                candidate[2].append(text)
+    
+    def start(self, tag, attrib):
+        self._flush()
+        depth = len(self._unwanted_flags) + 1
         
-    normalized_id = normalize_book_id(book_id)
-    url = f"{BASE_URL}/book/{normalized_id}/{page_number}"
+        unwanted = any(_selector_matches(m, tag, attrib) for m in _PAGE_UNWANTED_MATCHERS)
+        self._unwanted_flags.append(unwanted)
+        self._unwanted_open += unwanted
+        
+        candidates = self._candidates
+        for i, matcher in enumerate(_PAGE_CONTENT_MATCHERS):
+            if candidates[i] is None and _selector_matches(matcher, tag, attrib):
+                candidates[i] = [depth, self._unwanted_open, []]
+                self._open.append(candidates[i])
+        if tag == 'body' and candidates[-1] is None:
+            candidates[-1] = [depth, self._unwanted_open, []]
+            self._open.append(candidates[-1])
+        if tag == 'title' and self._title_depth is None:
+            self._title_depth = depth
+    
+    def end(self, tag):
+        self._flush()
+        depth = len(self._unwanted_flags)
+        self._unwanted_open -= self._unwanted_flags.pop()
+        self._open = [candidate for candidate in self._open if candidate[0] != depth]
+        if self._title_depth == depth:
+            self._title_depth = None
+            if self._title is None:
+                self._title = ""
+    
+    def data(self, text):
+        # قد تصل العقدة النصية الواحدة على عدة دفعات (مثلاً عند الكيانات)
+        self._buffer.append(text)
+    
+    def comment(self, text):
+        self._flush()
+    
+    def pi(self, target, data=None):
+        self._flush()
+    
+    def close(self) -> Tuple[str, str, int]:
+        """يعيد: (النص، نص <title>، عدد الكلمات)"""
+        self._flush()
+        main_content = _select_main_content(self._candidates, self._document)
+        content = _finish_page_text(main_content[2])
+        return content, self._title or "", count_words(content)
+
+def _parse_page_sax(raw_html: bytes) -> Optional[Tuple[str, None, str, int]]:
+    """تحليل صفحة القارئ بأحداث SAX (عند عدم الحاجة لحفظ HTML المحتوى)"""
+    parser = etree.HTMLParser(target=ShamelaSAXTarget(), encoding='utf-8')
+    try:
+        parser.feed(raw_html)
+        content, title_text, word_count = parser.close()
+    except (etree.ParserError, ValueError):
+        return None
+    return content, None, title_text, word_count
+
+def _parse_page_lexbor(raw_html: bytes, keep_html: bool) -> Tuple[str, Optional[str], str, None]:
+    """تحليل صفحة القارئ بمحلل lexbor (selectolax) - الشجرة تبقى في C"""
+    tree = LexborHTMLParser(raw_html)
     
-    # تحقق من التخزين المؤقت أولاً
-    cache_key = f"{book_id}:{page_number}"
-    if config.skip_existing:
-        cached_content = global_cache.get(cache_key)
-        if cached_content:
-            return cached_content
+    main_content = None
+    for selector in _PAGE_CONTENT_SELECTORS:
+        main_content = tree.css_first(selector)
+        if main_content is not None:
+            break
     
-    soup = get_soup(url, use_cache=True)
+    if main_content is None:
+        main_content = tree.body or tree.root
     
-    # محاولة العثور على المحتوى الرئيسي
-    content_selectors = [
-        "#book", "div#text", "article", "div.reader-text",
-        "div.col-md-9", "div.nass", ".book-content", ".page-content", "main"
-    ]
+    # css() تشمل العقدة نفسها بخلاف select() في BeautifulSoup؛
+    # والحذف بترتيب عكسي يزيل العناصر المتداخلة قبل آبائها
+    for selector in _PAGE_UNWANTED_SELECTORS:
+        for element in reversed(main_content.css(selector)):
+            if element != main_content:
+                element.decompose()
+    
+    content = main_content.text(separator="\n", strip=True, skip_empty=True)
+    content = _MULTI_NL_RE.sub('\n\n', content).strip()
+    
+    html_content = main_content.html if keep_html else None
+    
+    title_node = tree.css_first('title')
+    return content, html_content, title_node.text() if title_node is not None else "", None
+
+def _parse_page_bs4(raw_html: bytes, parser: str, keep_html: bool) -> Tuple[str, Optional[str], str, None]:
+    """تحليل صفحة القارئ عبر BeautifulSoup (المسار الاحتياطي)"""
+    soup = BeautifulSoup(raw_html, parser)
     
+    # محاولة العثور على المحتوى الرئيسي
     main_content = None
-    for selector in content_selectors:
+    for selector in _PAGE_CONTENT_SELECTORS:
         main_content = soup.select_one(selector)
         if main_content:
             break
@@ -1735,31 +2585,57 @@ def extract_enhanced_page_content(book_id: str, page_number: int, has_original_p
         main_content = soup.find("body") or soup
     
     # إزالة العناصر غير المرغوبة (لكن نحافظ على <hr> و <br> و .hamesh)
-    unwanted_selectors = [
-        "script", "style", "nav", ".share", ".social", ".ad", 
-        ".advertisement", ".menu", ".sidebar", ".header", ".footer"
-    ]
-    
-    for selector in unwanted_selectors:
+    for selector in _PAGE_UNWANTED_SELECTORS:
         for element in main_content.select(selector):
             element.decompose()
     
-    # استبدال <hr> و <br> بنص واضح قبل استخراج النص
-    for hr in main_content.find_all("hr"):
-        hr.replace_with("\n<hr/>\n")
-    
-    for br in main_content.find_all("br"):
-        br.replace_with("<br/>\n")
-    
     # استخراج النص مع الحفاظ على فواصل الأسطر
     content = main_content.get_text(separator="\n", strip=True)
     
     # تطبيع فواصل الأسطر - تقليل التكرارات الزائدة
-    content = re.sub(r'\n{3,}', '\n\n', content)
+    content = _MULTI_NL_RE.sub('\n\n', content)
     content = content.strip()
     
     # تحسين الذاكرة: اختياري حفظ HTML 
-    html_content = str(main_content) if not config.memory_efficient else None
+    html_content = main_content.decode() if keep_html else None
+    
+    title_tag = soup.find('title')
+    return content, html_content, title_tag.get_text() if title_tag else "", None
+
+def extract_enhanced_page_content(book_id: str, page_number: int, has_original_pagination: bool = False, 
+                                config: PerformanceConfig = None) -> PageContent:
+    """
+    استخراج محتوى الصفحة مع دعم الترقيم الأصلي وتحسينات الأداء
+    """
+    if config is None:
+        config = PerformanceConfig()
+        
+    normalized_id = normalize_book_id(book_id)
+    url = f"{BASE_URL}/book/{normalized_id}/{page_number}"
+    
+    # تحقق من التخزين المؤقت أولاً
+    cache_key = f"{book_id}:{page_number}"
+    if config.skip_existing:
+        cached_content = global_cache.get(cache_key)
+        if cached_content:
+            return cached_content
+    
+    # شجرة جديدة لكل صفحة - لا نعدّل soup المخزن في get_soup
+    # <hr> و <br> تُستبدل بنص واضح في HTML الخام قبل التحليل
+    response = safe_request(url, use_cache=True)
+    raw_html = _mark_line_breaks(response.content)
+    keep_html = not config.memory_efficient
+    
+    # محلل أصلي (lexbor أو lxml) عند تفعيله، وإلا BeautifulSoup
+    # دون حفظ HTML لا حاجة لشجرة أصلاً - أحداث SAX تكفي لجمع النص
+    parsed = None
+    if config.parser_backend == 'lexbor' and SELECTOLAX_AVAILABLE:
+        parsed = _parse_page_lexbor(raw_html, keep_html)
+    elif config.use_lxml and LXML_AVAILABLE:
+        parsed = _parse_page_lxml(raw_html, keep_html) if keep_html else _parse_page_sax(raw_html)
+    if parsed is None:
+        parsed = _parse_page_bs4(raw_html, BS4_PARSER if config.use_lxml else 'html.parser', keep_html)
+    content, html_content, title_text, word_count = parsed
     
     # استخراج الترقيم المطبوع من <title>
     printed_page_number = None
@@ -1768,7 +2644,7 @@ def extract_enhanced_page_content(book_id: str, page_number: int, has_original_p
     
     if has_original_pagination:
         # استخراج رقم الصفحة المطبوع من <title>
-        printed_page_number = extract_printed_page_number(soup)
+        printed_page_number = extract_printed_page_number(title_text)
         
         if printed_page_number is not None:
             # نجح الاستخراج
@@ -1780,8 +2656,9 @@ def extract_enhanced_page_content(book_id: str, page_number: int, has_original_p
             if config.debug:
                 logger.warning(f"لم يتم العثور على رقم صفحة مطبوع في {url}")
     
-    # حساب عدد الكلمات (محسن)
-    word_count = len(content.split()) if content else 0
+    # حساب عدد الكلمات (محسن) - مسار SAX يحسبه أثناء التحليل
+    if word_count is None:
+        word_count = count_words(content)
     
     page_content = PageContent(
         page_number=page_number,
@@ -1815,7 +2692,9 @@ def scrape_enhanced_book(book_id: str, max_pages: Optional[int] = None,
     
     logger.info(f"بدء استخراج الكتاب المحسن {book_id} - إعدادات الأداء: workers={config.max_workers}, batch={config.batch_size}")
     
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
+    # المجمع خاص بكتاب واحد حتى لا يكبر عبر كتب متتالية في نفس العملية
+    _STR_POOL.clear()
     
     # 1. استخراج البيانات الأساسية
     book, soup = extract_enhanced_book_info(book_id)
@@ -1828,12 +2707,11 @@ def scrape_enhanced_book(book_id: str, max_pages: Optional[int] = None,
     # 3. استخراج روابط المجلدات
     book.volume_links = extract_volume_links(book_id, soup)
     
-    # 4. استخراج الأجزاء من dropdown (الطريقة الجديدة المحسنة)
-    book.volumes = extract_volumes_from_dropdown(book_id)
+    # 4-5. استخراج الأجزاء وعدد الصفحات من واجهة القراءة بطلب واحد
+    book.volumes, page_count_internal, page_count_printed = fetch_book_structure(
+        book_id, book.has_original_pagination
+    )
     book.volume_count = len(book.volumes)
-    
-    # 5. حساب عدد الصفحات من واجهة القراءة (الطريقة الجديدة المحسنة)
-    page_count_internal, page_count_printed = calculate_page_counts_from_reader(book_id)
     book.page_count_internal = page_count_internal
     book.page_count_printed = page_count_printed
     
@@ -1852,12 +2730,13 @@ def scrape_enhanced_book(book_id: str, max_pages: Optional[int] = None,
     
     # 8. استخراج محتوى الصفحات مع التحسينات
     if extract_content:
-        book.pages = extract_all_pages_enhanced(
+        pages = extract_all_pages_enhanced(
             book_id, book.page_count or 1, max_pages, 
             book.has_original_pagination, config
         )
+        book.pages = pages if isinstance(pages, PageStore) else PageStore(pages)
     
-    elapsed_time = time.time() - start_time
+    elapsed_time = (time.perf_counter_ns() - start_ns) * 1e-9
     pages_per_second = len(book.pages) / elapsed_time if elapsed_time > 0 else 0
     
     logger.info(f"تم استخراج الكتاب المحسن {book_id} بنجاح في {elapsed_time:.2f} ثانية")
@@ -1873,6 +2752,68 @@ def scrape_enhanced_book(book_id: str, max_pages: Optional[int] = None,
     
     return book
 
+@lru_cache(maxsize=64)
+def _page_count_patterns(book_id: str) -> Tuple[re.Pattern, ...]:
+    """أنماط مترجمة لأرقام الصفحات في نص صفحة الكتاب"""
+    return (
+        _book_link_re(book_id),
+        re.compile(r'صفحة\s*(\d+)'),
+        re.compile(r'الصفحات\s*[:：]\s*(\d+)')
+    )
+
+# الأرقام الغربية والعربية-الهندية والفارسية بصيغة Hyperscan
+_HS_DIGITS = r'[0-9\x{0660}-\x{0669}\x{06F0}-\x{06F9}]+'
+_TRAILING_NUMBER_RE = re.compile(r'(\d+)$')
+
+@lru_cache(maxsize=64)
+def _page_count_database(book_id: str):
+    """قاعدة Hyperscan تجمع أنماط _page_count_patterns لمسح النص مرة واحدة"""
+    expressions = (
+        rf"/book/{re.escape(book_id)}/{_HS_DIGITS}",
+        rf"صفحة\s*{_HS_DIGITS}",
+        rf"الصفحات\s*[:：]\s*{_HS_DIGITS}"
+    )
+    flags = hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP | hyperscan.HS_FLAG_SOM_LEFTMOST
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[expression.encode('utf-8') for expression in expressions],
+        ids=list(range(len(expressions))),
+        flags=[flags] * len(expressions)
+    )
+    return database
+
+def _find_page_numbers(book_id: str, text_content: str) -> List[int]:
+    """أرقام الصفحات المذكورة في نص صفحة الكتاب"""
+    page_numbers = []
+    
+    if HYPERSCAN_AVAILABLE:
+        # Hyperscan يبلغ عن كل نهاية ممكنة للتطابق - نحتفظ بأطولها لكل بداية
+        data = text_content.encode('utf-8')
+        match_ends: Dict[Tuple[int, int], int] = {}
+        
+        def on_match(pattern_id, start, end, flags, context):
+            key = (pattern_id, start)
+            if end > match_ends.get(key, 0):
+                match_ends[key] = end
+        
+        _page_count_database(book_id).scan(data, match_event_handler=on_match)
+        
+        for (_, start), end in match_ends.items():
+            match = _TRAILING_NUMBER_RE.search(data[start:end].decode('utf-8'))
+            if match:
+                page_numbers.append(int(match.group(1)))
+        return page_numbers
+    
+    for pattern in _page_count_patterns(book_id):
+        matches = pattern.findall(text_content)
+        for match in matches:
+            try:
+                page_numbers.append(int(match))
+            except ValueError:
+                continue
+    
+    return page_numbers
+
 def discover_enhanced_volumes_and_pages(book_id: str, soup: BeautifulSoup, 
                                       volume_links: List[VolumeLink]) -> Tuple[List[Volume], int]:
     """
@@ -1882,22 +2823,7 @@ def discover_enhanced_volumes_and_pages(book_id: str, soup: BeautifulSoup,
     max_page = 1
     
     # البحث عن إجمالي الصفحات
-    page_patterns = [
-        rf'/book/{book_id}/(\d+)',
-        r'صفحة\s*(\d+)',
-        r'الصفحات\s*[:：]\s*(\d+)'
-    ]
-    
-    page_numbers = []
-    text_content = soup.get_text()
-    
-    for pattern in page_patterns:
-        matches = re.findall(pattern, text_content)
-        for match in matches:
-            try:
-                page_numbers.append(int(match))
-            except ValueError:
-                continue
+    page_numbers = _find_page_numbers(book_id, soup.get_text())
     
     if page_numbers:
         max_page = max(page_numbers)
@@ -1931,37 +2857,192 @@ def assign_chapters_to_volumes_enhanced(chapters: List[Chapter], volumes: List[V
     """
     ربط الفصول بالأجزاء المناسبة بطريقة محسنة
     """
+    # ترتيب الأجزاء مرة واحدة حسب صفحة البداية للبحث الثنائي
+    sorted_volumes = sorted(volumes, key=lambda v: v.page_start or 1)
+    starts = [volume.page_start or 1 for volume in sorted_volumes]
+    
+    @lru_cache(maxsize=1024)
     def get_volume_for_page(page_num: Optional[int]) -> Optional[int]:
         if page_num is None:
             return None
         
-        for volume in volumes:
-            start = volume.page_start or 1
-            end = volume.page_end or float('inf')
-            if start <= page_num <= end:
+        position = bisect_right(starts, page_num) - 1
+        if position >= 0:
+            volume = sorted_volumes[position]
+            if page_num <= (volume.page_end or float('inf')):
                 return volume.number
         return 1  # افتراضي للجزء الأول
     
-    def process_chapters_enhanced(chapter_list: List[Chapter]):
-        for chapter in chapter_list:
-            chapter.volume_number = get_volume_for_page(chapter.page_number)
-            if chapter.children:
-                process_chapters_enhanced(chapter.children)
-    
-    process_chapters_enhanced(chapters)
+    # مرور تكراري بمكدس بدلاً من الاستدعاء الذاتي
+    stack = list(reversed(chapters))
+    while stack:
+        chapter = stack.pop()
+        chapter.volume_number = get_volume_for_page(chapter.page_number)
+        if chapter.children:
+            stack.extend(reversed(chapter.children))
 
 # ========= مستخرج الصفحات المتقدم غير المتزامن =========
+async def read_html_tree_streaming(response: aiohttp.ClientResponse, chunk_size: int = 32768):
+    """
+    تحليل استجابة HTML بمحلل lxml تدريجي أثناء قراءة الشبكة
+    تُمرر البايتات مباشرة للمحلل دون بناء نص HTML كامل في الذاكرة
+    يعيد (الشجرة، None)، أو (None، نص HTML كاملاً) إذا فشل التحليل في منتصف الاستجابة
+    """
+    encoding = response.charset or 'utf-8'
+    parser = lxml_html.HTMLParser(encoding=encoding)
+    # الكتل المقروءة تُحفظ (بلا دمج) حتى يمكن التراجع إلى التحليل المخزن
+    chunks = []
+    try:
+        async for chunk in response.content.iter_chunked(chunk_size):
+            chunks.append(chunk)
+            parser.feed(chunk)
+        return parser.close(), None
+    except (etree.Error, ValueError) as e:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"فشل التحليل التدريجي لـ {response.url}: {e} - تراجع إلى BeautifulSoup")
+        async for chunk in response.content.iter_chunked(chunk_size):
+            chunks.append(chunk)
+        return None, b''.join(chunks).decode(encoding, 'replace')
+
 class AsyncPageExtractor:
     """مستخرج الصفحات غير المتزامن"""
     
     def __init__(self, config: PerformanceConfig):
         self.config = config
+        # سقف مشترك للطلبات المتزامنة عبر جميع الدفعات (يُنشأ داخل الحلقة عند أول استخدام)
+        self._semaphore: Optional[asyncio.BoundedSemaphore] = None
+        # مجمع خيوط للتحليل: استخراج المحتوى عمل CPU لا يجب أن يوقف حلقة الأحداث
+        self._parse_pool = ThreadPoolExecutor(max_workers=config.max_workers,
+                                              thread_name_prefix='page-parse')
+        
+        backend_available = {'rusty_req': RUSTY_REQ_AVAILABLE, 'arequest': AREQUEST_AVAILABLE}
+        if not backend_available.get(config.http_backend, True):
+            logger.warning(f"⚠️ {config.http_backend} غير مثبت - سيتم استخدام aiohttp")
+    
+    def close(self):
+        """إيقاف مجمع خيوط التحليل"""
+        self._parse_pool.shutdown(wait=True)
+    
+    def _page_from_html(self, html: str, page_num: int) -> Optional[PageContent]:
+        """تحويل HTML الصفحة إلى PageContent باستخدام معالج HTML السريع"""
+        result = FastHTMLProcessor.extract_page_content(html, page_num)
+        if result and result['content'].strip():
+            return PageContent(
+                page_number=result['page_number'],
+                content=result['content'],
+                html_content=result['html_content'],
+                word_count=result['word_count']
+            )
+        return None
+    
+    async def _fetch_batch_rusty_req(self, book_id: str, pages: List[int]) -> Tuple[List[PageContent], List[int]]:
+        """جلب الدفعة كاملة بطلب واحد إلى rusty_req (مجمع اتصالات Rust مشترك)"""
+        request_items = [
+            rusty_req.RequestItem(
+                url=f"https://shamela.ws/book/{book_id}/{page_num}",
+                method="GET",
+                headers=HEADERS,
+                tag=str(page_num),
+                timeout=float(self.config.timeout)
+            )
+            for page_num in pages
+        ]
+        responses = await rusty_req.fetch_requests(
+            request_items,
+            mode=rusty_req.ConcurrencyMode.SELECT_ALL
+        )
+        
+        extracted, failed = [], set(pages)
+        for response in responses:
+            page_num = int((response.get("meta") or {}).get("tag") or 0)
+            if response.get("http_status") == 404:
+                failed.discard(page_num)
+                continue
+            if response.get("http_status") != 200:
+                continue
+            # rusty_req يعيد الاستجابة كنص JSON يحوي content و headers
+            body = response.get("response") or {}
+            if isinstance(body, str):
+                body = json.loads(body)
+            page_content = self._page_from_html(body.get("content", ""), page_num)
+            if page_content:
+                extracted.append(page_content)
+                failed.discard(page_num)
+        return extracted, sorted(failed)
+    
+    async def _fetch_batch_arequest(self, book_id: str, pages: List[int]) -> Tuple[List[PageContent], List[int]]:
+        """جلب الدفعة كاملة عبر arequest.Session.bulk_get"""
+        urls = [f"https://shamela.ws/book/{book_id}/{page_num}" for page_num in pages]
+        async with arequest.Session(
+            headers=HEADERS,
+            timeout=self.config.total_timeout,
+            connector_limit=self.config.async_semaphore_limit,
+            connector_limit_per_host=self.config.async_semaphore_limit
+        ) as bulk_session:
+            responses = await bulk_session.bulk_get(urls, return_exceptions=True)
+        
+        extracted, failed = [], []
+        for page_num, response in zip(pages, responses):
+            if isinstance(response, Exception):
+                failed.append(page_num)
+                continue
+            if response.status_code == 404:
+                continue
+            page_content = self._page_from_html(response.text, page_num) if response.status_code == 200 else None
+            if page_content:
+                extracted.append(page_content)
+            else:
+                failed.append(page_num)
+        return extracted, failed
     
     async def extract_pages_batch_async(self, book_id: str, page_range: Tuple[int, int], 
-                                       has_original_pagination: bool, session: aiohttp.ClientSession) -> List[PageContent]:
-        """استخراج دفعة من الصفحات بشكل غير متزامن"""
+                                       has_original_pagination: bool, session: aiohttp.ClientSession,
+                                       out: Union[List[PageContent], PageStore, None] = None
+                                       ) -> Union[List[PageContent], PageStore]:
+        """
+        استخراج دفعة من الصفحات بشكل غير متزامن
+        الصفحات تُضاف إلى out (قائمة أو PageStore) بترتيب أرقامها فور اكتمال ما قبلها
+        """
         start_page, end_page = page_range
-        semaphore = asyncio.Semaphore(self.config.async_semaphore_limit)
+        pages = list(range(start_page, end_page + 1))
+        valid_results = out if out is not None else []
+        prefetched = []
+        
+        # العميل البديل يجلب الدفعة كاملة، وما فشل يُعاد عبر aiohttp
+        backend = self.config.http_backend
+        try:
+            if backend == 'rusty_req' and RUSTY_REQ_AVAILABLE:
+                prefetched, pages = await self._fetch_batch_rusty_req(book_id, pages)
+            elif backend == 'arequest' and AREQUEST_AVAILABLE:
+                prefetched, pages = await self._fetch_batch_arequest(book_id, pages)
+        except Exception as e:
+            logger.warning(f"فشل عميل {backend} للدفعة {start_page}-{end_page}، التراجع إلى aiohttp: {e}")
+            prefetched, pages = [], list(range(start_page, end_page + 1))
+        
+        # كومة صغيرة لإعادة الترتيب: لا يبقى في الذاكرة إلا ما وصل قبل دوره
+        reorder_heap = [(page.page_number, page) for page in prefetched]
+        heapq.heapify(reorder_heap)
+        finished = set()
+        next_index = 0
+        
+        def flush_ready() -> None:
+            """نقل الصفحات التي اكتملت كل الصفحات قبلها إلى الناتج"""
+            nonlocal next_index
+            while next_index < len(pages) and pages[next_index] in finished:
+                next_index += 1
+            limit = pages[next_index] if next_index < len(pages) else None
+            while reorder_heap and (limit is None or reorder_heap[0][0] < limit):
+                valid_results.append(heapq.heappop(reorder_heap)[1])
+        
+        if not pages:
+            flush_ready()
+            return valid_results
+        
+        if self._semaphore is None:
+            self._semaphore = asyncio.BoundedSemaphore(self.config.async_semaphore_limit)
+        semaphore = self._semaphore
+        
+        loop = asyncio.get_running_loop()
         
         async def extract_single_page_async(page_num: int) -> Optional[PageContent]:
             async with semaphore:
@@ -1971,10 +3052,25 @@ class AsyncPageExtractor:
                         
                         async with session.get(url) as response:
                             if response.status == 200:
-                                html = await response.text()
-                                
                                 # استخدام معالج HTML السريع
-                                result = FastHTMLProcessor.extract_page_content(html, page_num)
+                                if LXML_AVAILABLE:
+                                    # تحليل تدريجي أثناء وصول البيانات
+                                    tree, html = await read_html_tree_streaming(response)
+                                    if tree is not None:
+                                        result = await loop.run_in_executor(
+                                            self._parse_pool, FastHTMLProcessor.extract_page_content_from_tree,
+                                            tree, page_num
+                                        )
+                                    else:
+                                        result = await loop.run_in_executor(
+                                            self._parse_pool, FastHTMLProcessor.extract_page_content_with_bs4,
+                                            html, page_num
+                                        )
+                                else:
+                                    html = await response.text()
+                                    result = await loop.run_in_executor(
+                                        self._parse_pool, FastHTMLProcessor.extract_page_content, html, page_num
+                                    )
                                 if result and result['content'].strip():
                                     # تحويل إلى PageContent
                                     page_content = PageContent(
@@ -1984,7 +3080,7 @@ class AsyncPageExtractor:
                                         word_count=result['word_count']
                                     )
                                     
-                                    if self.config.debug:
+                                    if self.config.debug and logger.isEnabledFor(logging.DEBUG):
                                         logger.debug(f"✅ استخراج ناجح للصفحة {page_num} (async)")
                                     
                                     return page_content
@@ -2004,22 +3100,49 @@ class AsyncPageExtractor:
                 
                 return None
         
-        # إنشاء المهام
-        tasks = [extract_single_page_async(page) for page in range(start_page, end_page + 1)]
-        
-        # تنفيذ المهام مع تجميع النتائج
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def extract_numbered_page_async(page_num: int) -> Tuple[int, Optional[PageContent]]:
+            try:
+                return page_num, await extract_single_page_async(page_num)
+            except Exception as e:
+                logger.error(f"خطأ في المعالجة غير المتزامنة: {e}")
+                return page_num, None
         
-        # فلترة النتائج الصحيحة
-        valid_results = []
-        for result in results:
-            if isinstance(result, PageContent):
-                valid_results.append(result)
-            elif isinstance(result, Exception):
-                logger.error(f"خطأ في المعالجة غير المتزامنة: {result}")
+        # تنفيذ المهام وتمرير كل صفحة فور اكتمالها بدلاً من انتظار الدفعة كاملة
+        for next_done in asyncio.as_completed([extract_numbered_page_async(page) for page in pages]):
+            page_num, page_content = await next_done
+            finished.add(page_num)
+            if page_content is not None:
+                heapq.heappush(reorder_heap, (page_num, page_content))
+            flush_ready()
         
         return valid_results
 
+def _place_page(page_slots: List[Optional[PageContent]], page: PageContent,
+                stray_pages: List[PageContent]) -> None:
+    """
+    وضع الصفحة في خانتها حسب ترقيمها الداخلي (1..N) بدلاً من الفرز لاحقاً
+    الصفحات خارج 1..N (أو بلا ترقيم) تُضاف إلى stray_pages بدل الكتابة فوق خانة أخرى
+    """
+    index = page.page_index_internal if page.page_index_internal is not None else page.page_number
+    if index is None or not 1 <= index <= len(page_slots):
+        logger.warning(f"⚠️ صفحة بترقيم خارج النطاق 1..{len(page_slots)}: {index}")
+        stray_pages.append(page)
+        return
+    page_slots[index - 1] = page
+
+def _collect_placed_pages(page_slots: List[Optional[PageContent]],
+                          stray_pages: List[PageContent]) -> List[PageContent]:
+    """الصفحات المرتبة دون الخانات الفارغة، ثم الصفحات خارج النطاق بترتيب وصولها"""
+    return [page for page in page_slots if page is not None] + stray_pages
+
+def _order_pages_by_index(pages: List[PageContent], total_pages: int) -> List[PageContent]:
+    """ترتيب الصفحات بالتعيين المباشر في O(n) بدلاً من sort بدالة lambda"""
+    page_slots: List[Optional[PageContent]] = [None] * total_pages
+    stray_pages: List[PageContent] = []
+    for page in pages:
+        _place_page(page_slots, page, stray_pages)
+    return _collect_placed_pages(page_slots, stray_pages)
+
 # ========= مستخرج متعدد العمليات للكتب الضخمة =========
 class MultiprocessExtractor:
     """مستخرج متعدد العمليات للكتب الضخمة"""
@@ -2036,13 +3159,16 @@ class MultiprocessExtractor:
         
         logger.info(f"🚀 معالجة متوازية متعددة العمليات: {len(chunks)} دفعة على {self.config.max_processes} عملية")
         
-        # معالجة متوازية
-        all_pages = []
-        with ProcessPoolExecutor(max_workers=self.config.max_processes) as executor:
+        # معالجة متوازية - كل صفحة توضع مباشرة في خانتها حسب ترقيمها الداخلي
+        page_slots: List[Optional[PageContent]] = [None] * total_pages
+        stray_pages: List[PageContent] = []
+        # الإعدادات تُمرر مرة واحدة لكل عملية عبر initializer بدلاً من كل دفعة
+        with ProcessPoolExecutor(max_workers=self.config.max_processes,
+                                 initializer=_worker_init,
+                                 initargs=(self.config.__dict__,)) as executor:
             # إرسال المهام
             future_to_chunk = {
-                executor.submit(extract_chunk_worker, book_id, chunk, has_original_pagination, 
-                               self.config.__dict__): chunk 
+                executor.submit(extract_chunk_worker, book_id, chunk, has_original_pagination): chunk 
                 for chunk in chunks
             }
             
@@ -2051,7 +3177,8 @@ class MultiprocessExtractor:
                 chunk = future_to_chunk[future]
                 try:
                     chunk_pages = future.result(timeout=600)  # 10 دقائق لكل دفعة
-                    all_pages.extend(chunk_pages)
+                    for page in chunk_pages:
+                        _place_page(page_slots, page, stray_pages)
                     
                     start_page, end_page = chunk
                     logger.info(f"✅ انتهت الدفعة {i+1}/{len(chunks)} "
@@ -2061,13 +3188,13 @@ class MultiprocessExtractor:
                     start_page, end_page = chunk
                     logger.error(f"❌ فشلت الدفعة {i+1} (صفحات {start_page}-{end_page}): {e}")
         
-        # ترتيب النتائج
-        return sorted(all_pages, key=lambda x: x.page_number)
+        # النتائج مرتبة بالفعل - تُحذف الخانات الفارغة فقط
+        return _collect_placed_pages(page_slots, stray_pages)
     
     def _create_page_chunks(self, total_pages: int) -> List[Tuple[int, int]]:
-        """تقسيم الصفحات إلى قطع للمعالجة المتوازية"""
+        """تقسيم الصفحات إلى قطع للمعالجة المتوازية (قطعة كبيرة واحدة تقريباً لكل عملية)"""
         chunk_size = max(self.config.process_chunk_size, 
-                        total_pages // self.config.max_processes)
+                        -(-total_pages // self.config.max_processes))  # قسمة مع التقريب للأعلى
         
         chunks = []
         for i in range(1, total_pages + 1, chunk_size):
@@ -2076,31 +3203,77 @@ class MultiprocessExtractor:
         
         return chunks
 
+def _new_event_loop(config: PerformanceConfig) -> asyncio.AbstractEventLoop:
+    """حلقة أحداث جديدة - uvloop عند توفره وتفعيله وإلا حلقة asyncio الافتراضية"""
+    if config.use_uvloop and UVLOOP_AVAILABLE:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+# إعدادات وحلقة أحداث وجلسة HTTP العملية الفرعية (تُهيأ مرة واحدة لكل عملية)
+_WORKER_CONFIG: Optional[PerformanceConfig] = None
+_WORKER_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_WORKER_HTTP: Optional[AdvancedHTTPSession] = None
+
+def _worker_shutdown() -> None:
+    """إغلاق جلسة HTTP وحلقة الأحداث الخاصة بالعملية"""
+    global _WORKER_HTTP
+    if _WORKER_LOOP is None or _WORKER_LOOP.is_closed():
+        return
+    if _WORKER_HTTP is not None:
+        _WORKER_LOOP.run_until_complete(_WORKER_HTTP.close())
+        _WORKER_HTTP = None
+    _WORKER_LOOP.close()
+
+def _worker_init(config_dict: dict) -> None:
+    """تهيئة العملية الفرعية: بناء الإعدادات وحلقة الأحداث مرة واحدة"""
+    global _WORKER_CONFIG, _WORKER_LOOP
+    if _WORKER_LOOP is None:
+        # العمليات الفرعية تخرج عبر os._exit - atexit لا يعمل، لكن Finalize يعمل
+        mp_util.Finalize(None, _worker_shutdown, exitpriority=10)
+    _worker_shutdown()
+    _WORKER_CONFIG = PerformanceConfig(**config_dict)
+    _WORKER_LOOP = _new_event_loop(_WORKER_CONFIG)
+    asyncio.set_event_loop(_WORKER_LOOP)
+    
+    # العمليات المنشأة بـ spawn تبدأ بجلسة requests عادية - نفس العميل المتزامن والتخزين المختارين في الأب
+    if (_WORKER_CONFIG.sync_client == 'httpx' and HTTPX_AVAILABLE
+            and not isinstance(http_session.session, httpx.Client)):
+        http_session.use_httpx(http2=_WORKER_CONFIG.enable_http2, timeout=_WORKER_CONFIG.timeout)
+    elif _WORKER_CONFIG.sync_client == 'requests' and _WORKER_CONFIG.http_cache:
+        http_session.enable_cache()
+
 def extract_chunk_worker(book_id: str, page_range: Tuple[int, int], 
-                        has_original_pagination: bool, config_dict: dict) -> List[PageContent]:
+                        has_original_pagination: bool, config_dict: Optional[dict] = None) -> List[PageContent]:
     """عامل لاستخراج قطعة من الصفحات في عملية منفصلة"""
-    # تحويل القاموس إلى إعدادات
-    config = PerformanceConfig(**config_dict)
+    # استدعاء خارج مجمع العمليات - تهيئة كسولة
+    if _WORKER_LOOP is None or config_dict is not None:
+        _worker_init(config_dict or {})
     
-    # إنشاء حلقة جديدة للعملية
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    try:
-        return loop.run_until_complete(extract_chunk_async(book_id, page_range, has_original_pagination, config))
-    finally:
-        loop.close()
+    return _WORKER_LOOP.run_until_complete(
+        extract_chunk_async(book_id, page_range, has_original_pagination, _WORKER_CONFIG)
+    )
 
 async def extract_chunk_async(book_id: str, page_range: Tuple[int, int], 
                              has_original_pagination: bool, config: PerformanceConfig) -> List[PageContent]:
     """استخراج قطعة باستخدام async في عملية منفصلة"""
+    global _WORKER_HTTP
     extractor = AsyncPageExtractor(config)
     
-    async with AdvancedHTTPSession(config) as session:
-        return await extractor.extract_pages_batch_async(book_id, page_range, has_original_pagination, session)
+    # جلسة واحدة لكل عملية تبقى مفتوحة بين القطع: ذاكرة DNS واتصالات TLS تُعاد دون مصافحة جديدة
+    if _WORKER_HTTP is None:
+        _WORKER_HTTP = AdvancedHTTPSession(config)
+        await _WORKER_HTTP.open()
+    
+    try:
+        return await extractor.extract_pages_batch_async(
+            book_id, page_range, has_original_pagination, _WORKER_HTTP.session
+        )
+    finally:
+        extractor.close()
 
 def extract_all_pages_enhanced(book_id: str, total_pages: int, max_pages: Optional[int], 
-                              has_original_pagination: bool, config: PerformanceConfig = None) -> List[PageContent]:
+                              has_original_pagination: bool, config: PerformanceConfig = None
+                              ) -> Union[List[PageContent], PageStore]:
     """
     استخراج جميع صفحات الكتاب بطريقة محسنة مع دعم التحسينات المتقدمة
     """
@@ -2120,7 +3293,7 @@ def extract_all_pages_enhanced(book_id: str, total_pages: int, max_pages: Option
     elif config.use_async:
         logger.info(f"📖 كتاب صغير/متوسط ({actual_max} صفحة) - استخدام المعالجة غير المتزامنة")
         # تشغيل المعالجة غير المتزامنة
-        loop = asyncio.new_event_loop()
+        loop = _new_event_loop(config)
         asyncio.set_event_loop(loop)
         try:
             pages = loop.run_until_complete(
@@ -2131,63 +3304,70 @@ def extract_all_pages_enhanced(book_id: str, total_pages: int, max_pages: Option
             
     else:
         logger.info(f"📄 استخدام الطريقة التقليدية ({actual_max} صفحة)")
-        pages = extract_pages_traditional_method(book_id, actual_max, has_original_pagination, config)
-    
-    # ترتيب الصفحات حسب الرقم
-    pages.sort(key=lambda p: p.page_number)
+        # ترتيب الصفحات حسب الترقيم الداخلي (المساران الآخران يعيدانها مرتبة)
+        pages = _order_pages_by_index(
+            extract_pages_traditional_method(book_id, actual_max, has_original_pagination, config),
+            actual_max
+        )
     
     # إحصائيات
-    total_words = sum(page.word_count for page in pages)
     logger.info(f"🎉 تم استخراج {len(pages)} صفحة بنجاح")
-    logger.info(f"📊 إجمالي الكلمات: {total_words:,} كلمة")
+    logger.info(f"📊 إجمالي الكلمات: {total_words(pages):,} كلمة")
     
     return pages
 
 async def extract_pages_async_method(book_id: str, total_pages: int, 
-                                   has_original_pagination: bool, config: PerformanceConfig) -> List[PageContent]:
+                                   has_original_pagination: bool, config: PerformanceConfig) -> PageStore:
     """استخراج باستخدام الطريقة غير المتزامنة"""
     
     extractor = AsyncPageExtractor(config)
-    all_pages = []
+    # الصفحات تُخزن بالترتيب في أعمدة PageStore فور وصولها
+    all_pages = PageStore()
     
     # تقسيم إلى دفعات
     batch_size = config.async_batch_size
     
-    async with AdvancedHTTPSession(config) as session:
-        for i in range(1, total_pages + 1, batch_size):
-            end_page = min(i + batch_size - 1, total_pages)
-            
-            if config.debug:
-                logger.info(f"📄 معالجة الدفعة غير المتزامنة: صفحات {i}-{end_page}")
-            
-            batch_pages = await extractor.extract_pages_batch_async(
-                book_id, (i, end_page), has_original_pagination, session
-            )
-            
-            all_pages.extend(batch_pages)
-            
-            if config.debug:
-                logger.info(f"✅ انتهت الدفعة: {len(batch_pages)} صفحة")
-            
-            # تنظيف الذاكرة إذا لزم الأمر
-            if config.memory_efficient and len(all_pages) % config.gc_threshold == 0:
-                import gc
-                gc.collect()
+    try:
+        async with AdvancedHTTPSession(config) as session:
+            for i in range(1, total_pages + 1, batch_size):
+                end_page = min(i + batch_size - 1, total_pages)
+                
+                if config.debug:
+                    logger.info(f"📄 معالجة الدفعة غير المتزامنة: صفحات {i}-{end_page}")
+                
+                pages_before = len(all_pages)
+                await extractor.extract_pages_batch_async(
+                    book_id, (i, end_page), has_original_pagination, session, out=all_pages
+                )
+                
+                if config.debug:
+                    logger.info(f"✅ انتهت الدفعة: {len(all_pages) - pages_before} صفحة")
+                
+                # تنظيف الذاكرة إذا لزم الأمر
+                if config.memory_efficient and len(all_pages) % config.gc_threshold == 0:
+                    import gc
+                    gc.collect()
+    finally:
+        extractor.close()
     
     return all_pages
 
 def extract_pages_traditional_method(book_id: str, total_pages: int, 
                                    has_original_pagination: bool, config: PerformanceConfig) -> List[PageContent]:
     """استخراج باستخدام الطريقة التقليدية (threading)"""
+    global _request_throttle
     
     pages = []
+    # الصفحات التي احتاجت طلباً فعلياً للخادم - التأخير لا يُطبق إلا عليها
+    network_pages = set()
     
     def extract_single_page(page_num: int) -> Optional[PageContent]:
         """استخراج صفحة واحدة"""
+        _request_state.hit_network = False
         try:
             if not config.debug and page_num % 100 == 0:
                 logger.info(f"استخراج الصفحة {page_num}/{total_pages}")
-            elif config.debug:
+            elif config.debug and logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"استخراج الصفحة {page_num}/{total_pages}")
             
             page_content = extract_enhanced_page_content(
@@ -2201,6 +3381,9 @@ def extract_pages_traditional_method(book_id: str, total_pages: int,
         except Exception as e:
             logger.warning(f"فشل في استخراج الصفحة {page_num}: {e}")
             return None
+        finally:
+            if _request_state.hit_network:
+                network_pages.add(page_num)
     
     if config.max_workers == 1:
         # استخراج تسلسلي
@@ -2209,46 +3392,113 @@ def extract_pages_traditional_method(book_id: str, total_pages: int,
             if page_content:
                 pages.append(page_content)
             
-            # تأخير محترم
-            if config.rate_limit > 0:
+            # تأخير محترم (لا حاجة له إذا جاءت الصفحة من التخزين المؤقت)
+            if config.rate_limit > 0 and page_num in network_pages:
                 time.sleep(config.rate_limit)
     else:
         # استخراج متوازي
         page_numbers = list(range(1, total_pages + 1))
         
-        with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
-            # إرسال المهام
-            future_to_page = {
-                executor.submit(extract_single_page, page_num): page_num 
-                for page_num in page_numbers
-            }
-            
-            # جمع النتائج
-            for future in as_completed(future_to_page):
-                page_num = future_to_page[future]
-                try:
-                    page_content = future.result()
-                    if page_content:
-                        pages.append(page_content)
-                except Exception as e:
-                    logger.warning(f"فشل في معالجة الصفحة {page_num}: {e}")
+        # دلو رموز مشترك بين الخيوط: max_workers طلب كل rate_limit ثانية
+        # (يحد الطلبات الفعلية نفسها بدلاً من التأخير في خيط جمع النتائج)
+        if config.rate_limit > 0:
+            _request_throttle = TokenBucket(config.max_workers / config.rate_limit, config.max_workers)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+                # إرسال المهام
+                future_to_page = {
+                    executor.submit(extract_single_page, page_num): page_num 
+                    for page_num in page_numbers
+                }
                 
-                # تأخير بين المهام للحد من الضغط على الخادم
-                if config.rate_limit > 0:
-                    time.sleep(config.rate_limit / config.max_workers)
+                # جمع النتائج
+                for future in as_completed(future_to_page):
+                    page_num = future_to_page[future]
+                    try:
+                        page_content = future.result()
+                        if page_content:
+                            pages.append(page_content)
+                    except Exception as e:
+                        logger.warning(f"فشل في معالجة الصفحة {page_num}: {e}")
+        finally:
+            _request_throttle = None
     
     return pages
 
 # ========= حفظ البيانات المحسنة =========
-def save_enhanced_book_to_json(book: Book, output_path: str, config: PerformanceConfig = None) -> None:
+# مخزن كتابة كبير - كتابات الصفحات الصغيرة تُجمع في استدعاءات نظام قليلة
+_OUTPUT_BUFFER_SIZE = 1 << 20
+
+def save_enhanced_book_to_json(book: Book, output_path: str, config: PerformanceConfig = None) -> str:
     """
-    حفظ الكتاب المحسن في ملف JSON مع دعم الضغط والتدفق
+    حفظ الكتاب المحسن في ملف JSON (أو MessagePack / CBOR حسب اللاحقة) مع دعم الضغط والتدفق
+    يعيد مسار الملف المحفوظ (مع لاحقة الضغط إن وُجدت)
     """
     if config is None:
         config = PerformanceConfig()
     
-    # تحويل الكتاب إلى قاموس
-    book_dict = {
+    # حفظ الملف مع الضغط الاختياري
+    output_dir = os.path.dirname(output_path)
+    if output_dir:  # فقط إنشاء المجلد إذا كان هناك مسار
+        os.makedirs(output_dir, exist_ok=True)
+    
+    # الصيغة من لاحقة الملف: .msgpack / .cbor ثنائية، وإلا JSON
+    output_format = _output_format(output_path)
+    if output_format != 'json' and not {'msgpack': MSGPACK_AVAILABLE, 'cbor': CBOR_AVAILABLE}[output_format]:
+        logger.warning(f"مكتبة {output_format} غير مثبتة - سيتم الحفظ بصيغة JSON")
+        output_path = os.path.splitext(output_path)[0] + '.json'
+        output_format = 'json'
+    
+    if output_format == 'msgpack':
+        write_streaming = _write_msgpack_streaming
+    elif output_format == 'cbor':
+        write_streaming = _write_cbor_streaming
+    else:
+        # JSON Lines: سطر لكل صفحة يُكتب فور ترميزه
+        write_streaming = _write_json_lines if config.json_lines else _write_json_streaming
+    
+    if config.enable_compression and output_path.endswith(('.json', '.jsonl', '.msgpack', '.cbor')):
+        if config.compression == 'zstd' and ZSTD_AVAILABLE:
+            # zstd متعدد الخيوط - الضغط يجري بالتوازي مع ترميز JSON
+            compressed_path = output_path + '.zst'
+            compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+            with open(compressed_path, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as raw_file, \
+                    compressor.stream_writer(raw_file) as f:
+                write_streaming(book, f, config)
+        else:
+            if config.compression == 'zstd':
+                logger.warning("zstandard غير مثبت - سيتم استخدام gzip")
+            # حفظ مضغوط بتدفق مباشر إلى gzip (المستوى 1 أسرع بكثير مع فرق حجم بسيط)
+            compressed_path = output_path + '.gz'
+            with open(compressed_path, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as raw_file, \
+                    gzip.GzipFile(fileobj=raw_file, mode='wb', compresslevel=1) as f:
+                write_streaming(book, f, config)
+        logger.info(f"تم حفظ الكتاب المحسن (مضغوط) في {compressed_path}")
+        return compressed_path
+    else:
+        # حفظ عادي مع تحسين الذاكرة للملفات الكبيرة
+        if output_format != 'json' or config.json_lines or (config.stream_json and len(book.pages) > 1000):
+            # حفظ تدريجي للكتب الكبيرة
+            with open(output_path, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as f:
+                write_streaming(book, f, config)
+        else:
+            # حفظ عادي
+            book_dict = _book_header_dict(book)
+            book_dict['pages'] = list(_iter_page_dicts(book.pages))
+            with open(output_path, 'wb', buffering=_OUTPUT_BUFFER_SIZE) as f:
+                f.write(json_bytes(book_dict, config.debug))
+        logger.info(f"تم حفظ الكتاب المحسن في {output_path}")
+        return output_path
+
+def _output_format(output_path: str) -> str:
+    """صيغة الحفظ حسب لاحقة الملف: json | msgpack | cbor"""
+    suffix = os.path.splitext(output_path)[1].lower()
+    return {'.msgpack': 'msgpack', '.cbor': 'cbor'}.get(suffix, 'json')
+
+def _book_header_dict(book: Book) -> Dict[str, Any]:
+    """بيانات الكتاب للحفظ دون الصفحات"""
+    return {
         'title': book.title,
         'shamela_id': book.shamela_id,
         'slug': book.slug,
@@ -2305,70 +3555,96 @@ def save_enhanced_book_to_json(book: Book, output_path: str, config: Performance
                 'page_end': vl.page_end
             } for vl in book.volume_links
         ],
-        'index': convert_chapters_to_dict(book.index),
-        'pages': [
-            {
-                'page_number': page.page_number,
-                'content': page.content,
-                'html_content': page.html_content,
-                'volume_number': page.volume_number,
-                'word_count': page.word_count,
-                'original_page_number': page.original_page_number,
-                'page_index_internal': page.page_index_internal,
-                'internal_index': page.internal_index,
-                'printed_missing': page.printed_missing
-            } for page in book.pages
-        ]
+        'index': convert_chapters_to_dict(book.index)
     }
-    
-    # حفظ الملف مع الضغط الاختياري
-    output_dir = os.path.dirname(output_path)
-    if output_dir:  # فقط إنشاء المجلد إذا كان هناك مسار
-        os.makedirs(output_dir, exist_ok=True)
-    
-    if config.enable_compression and output_path.endswith('.json'):
-        # حفظ مضغوط
-        compressed_path = output_path + '.gz'
-        with gzip.open(compressed_path, 'wt', encoding='utf-8') as f:
-            json.dump(book_dict, f, ensure_ascii=False, indent=2 if config.debug else None)
-        logger.info(f"تم حفظ الكتاب المحسن (مضغوط) في {compressed_path}")
-    else:
-        # حفظ عادي مع تحسين الذاكرة للملفات الكبيرة
-        if config.stream_json and len(book.pages) > 1000:
-            # حفظ تدريجي للكتب الكبيرة
-            with open(output_path, 'w', encoding='utf-8') as f:
-                _write_json_streaming(book_dict, f, config)
-        else:
-            # حفظ عادي
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(book_dict, f, ensure_ascii=False, 
-                         indent=2 if config.debug else None)
-        logger.info(f"تم حفظ الكتاب المحسن في {output_path}")
 
-def _write_json_streaming(data: dict, file_obj, config: PerformanceConfig):
-    """كتابة JSON بطريقة تدريجية لتوفير الذاكرة"""
-    file_obj.write('{\n')
-    
-    keys = list(data.keys())
-    for i, key in enumerate(keys):
-        file_obj.write(f'  "{key}": ')
-        
-        if key == 'pages' and isinstance(data[key], list):
-            # كتابة الصفحات تدريجياً
-            file_obj.write('[\n')
-            for j, page in enumerate(data[key]):
-                if j > 0:
-                    file_obj.write(',\n')
-                json.dump(page, file_obj, ensure_ascii=False, indent=4)
-            file_obj.write('\n  ]')
-        else:
-            json.dump(data[key], file_obj, ensure_ascii=False, indent=2 if config.debug else None)
-        
-        if i < len(keys) - 1:
-            file_obj.write(',')
-        file_obj.write('\n')
-    
-    file_obj.write('}')
+def _iter_page_dicts(pages):
+    """قواميس الصفحات للحفظ من PageStore أو من قائمة PageContent"""
+    if isinstance(pages, PageStore):
+        yield from pages.iter_dicts()
+        return
+    for page in pages:
+        yield page if isinstance(page, dict) else {
+            'page_number': page.page_number,
+            'content': page.content,
+            'html_content': page.html_content,
+            'volume_number': page.volume_number,
+            'word_count': page.word_count,
+            'original_page_number': page.original_page_number,
+            'page_index_internal': page.page_index_internal,
+            'internal_index': page.internal_index,
+            'printed_missing': page.printed_missing
+        }
+
+def _write_json_streaming(book: Book, file_obj, config: PerformanceConfig):
+    """
+    كتابة JSON بطريقة تدريجية لتوفير الذاكرة (ملف ثنائي)
+    بيانات الكتاب أولاً ثم الصفحات واحدة تلو الأخرى دون قاموس وسيط للصفحات
+    """
+    file_obj.write(b'{\n')
+    
+    for key, value in _book_header_dict(book).items():
+        file_obj.write(b'  ' + json_bytes(key) + b': ')
+        file_obj.write(json_bytes(value, config.debug))
+        file_obj.write(b',\n')
+    
+    # كتابة الصفحات تدريجياً
+    file_obj.write(b'  "pages": [\n')
+    for j, page in enumerate(_iter_page_dicts(book.pages)):
+        if j > 0:
+            file_obj.write(b',\n')
+        file_obj.write(json_bytes(page, config.debug))
+    file_obj.write(b'\n  ]\n}')
+
+def _write_json_lines(book: Book, file_obj, config: PerformanceConfig):
+    """
+    كتابة JSON Lines (ملف ثنائي): السطر الأول بيانات الكتاب ثم سطر لكل صفحة
+    """
+    file_obj.write(json_bytes(_book_header_dict(book)))
+    file_obj.write(b'\n')
+    for page in _iter_page_dicts(book.pages):
+        file_obj.write(json_bytes(page))
+        file_obj.write(b'\n')
+
+def _write_msgpack_streaming(book: Book, file_obj, config: PerformanceConfig):
+    """
+    كتابة الكتاب بصيغة MessagePack (ملف ثنائي) بنفس بنية JSON
+    رؤوس الخريطة والمصفوفة تُكتب أولاً ثم الصفحات واحدة تلو الأخرى
+    """
+    packer = msgpack.Packer(use_bin_type=True)
+    header = _book_header_dict(book)
+    
+    file_obj.write(packer.pack_map_header(len(header) + 1))
+    for key, value in header.items():
+        file_obj.write(packer.pack(key))
+        file_obj.write(packer.pack(value))
+    
+    file_obj.write(packer.pack('pages'))
+    file_obj.write(packer.pack_array_header(len(book.pages)))
+    for page in _iter_page_dicts(book.pages):
+        file_obj.write(packer.pack(page))
+
+# بايتات CBOR لخريطة ومصفوفة غير محددتي الطول ونهايتهما
+_CBOR_MAP_START = b'\xbf'
+_CBOR_ARRAY_START = b'\x9f'
+_CBOR_BREAK = b'\xff'
+
+def _write_cbor_streaming(book: Book, file_obj, config: PerformanceConfig):
+    """
+    كتابة الكتاب بصيغة CBOR (ملف ثنائي) بنفس بنية JSON
+    الخريطة ومصفوفة الصفحات غير محددتي الطول فتُكتب الصفحات تدريجياً
+    """
+    file_obj.write(_CBOR_MAP_START)
+    for key, value in _book_header_dict(book).items():
+        file_obj.write(cbor2.dumps(key))
+        file_obj.write(cbor2.dumps(value))
+    
+    file_obj.write(cbor2.dumps('pages'))
+    file_obj.write(_CBOR_ARRAY_START)
+    for page in _iter_page_dicts(book.pages):
+        file_obj.write(cbor2.dumps(page))
+    file_obj.write(_CBOR_BREAK)
+    file_obj.write(_CBOR_BREAK)
 
 def convert_chapters_to_dict(chapters: List[Chapter]) -> List[Dict]:
     """
@@ -2390,6 +3666,60 @@ def convert_chapters_to_dict(chapters: List[Chapter]) -> List[Dict]:
     return result
 
 # ========= واجهة سطر الأوامر المحسنة =========
+def _print_summary(book: Book, config: PerformanceConfig, elapsed_time: float,
+                   pages_per_second: float, output_path: str):
+    """طباعة ملخص الكتاب المستخرج (لا شيء في الوضع الصامت)"""
+    if config.quiet:
+        return
+    
+    authors_str = ", ".join(author.name for author in book.authors)
+    
+    print("\n" + "=" * 60)
+    print("✅ تم استخراج الكتاب بنجاح!")
+    print("=" * 60)
+    print(f"📚 العنوان: {book.title}")
+    print(f"👨‍🎓 المؤلفون: {authors_str}")
+    
+    if book.publisher:
+        print(f"🏢 الناشر: {book.publisher.name}")
+        if book.publisher.location:
+            print(f"📍 الموقع: {book.publisher.location}")
+    
+    if book.book_section:
+        print(f"📂 القسم: {book.book_section.name}")
+    
+    if book.edition:
+        edition_info = f"📄 الطبعة: {book.edition}"
+        if book.edition_number:
+            edition_info += f" (رقم: {book.edition_number})"
+        print(edition_info)
+    
+    if book.publication_year:
+        year_info = f"📅 سنة النشر: {book.publication_year} م"
+        if book.edition_date_hijri:
+            year_info += f" ({book.edition_date_hijri} هـ)"
+        print(year_info)
+    
+    print(f"📄 عدد الصفحات: {len(book.pages)}")
+    print(f"📑 عدد الفصول: {len(book.index)}")
+    print(f"📚 عدد الأجزاء: {len(book.volumes)}")
+    
+    if book.volume_links:
+        print(f"🔗 روابط المجلدات: {len(book.volume_links)}")
+    
+    if book.has_original_pagination:
+        print("✅ يستخدم ترقيم الصفحات الأصلي")
+    
+    # إحصائيات الأداء
+    words = total_words(book.pages)
+    if words > 0:
+        print(f"📊 إجمالي الكلمات: {words:,}")
+    
+    print(f"⏱️ الزمن الكلي: {elapsed_time:.2f} ثانية")
+    print(f"⚡ السرعة: {pages_per_second:.2f} صفحة/ثانية")
+    print(f"💾 حُفظ في: {output_path}")
+    print("=" * 60)
+
 def main():
     """
     الوظيفة الرئيسية المحسنة مع دعم أعلام الأداء
@@ -2404,25 +3734,39 @@ def main():
     parser.add_argument('--output', '-o', help='JSON output file path')
     
     # Traditional performance flags  
-    parser.add_argument('--max-workers', type=int, default=4, help='Number of parallel workers (default: 4)')
+    parser.add_argument('--max-workers', '--workers', dest='max_workers', type=int, default=4,
+                        help='Number of parallel workers (default: 4)')
     parser.add_argument('--batch-size', type=int, default=500, help='Batch size (default: 500)')
     parser.add_argument('--timeout', type=int, default=30, help='Request timeout in seconds (default: 30)')
     parser.add_argument('--retries', type=int, default=3, help='Number of retries (default: 3)')
     parser.add_argument('--rate', type=float, default=0.5, help='Delay between requests in seconds (default: 0.5)')
     parser.add_argument('--stream-json', action='store_true', help='Enable streaming JSON for large books')
+    parser.add_argument('--jsonl', action='store_true', help='Write JSON Lines: book metadata, then one page per line')
+    parser.add_argument('--format', choices=['json', 'msgpack', 'cbor'], default='json',
+                        help='Output format when --output is not given; otherwise inferred from its suffix (default: json)')
     parser.add_argument('--skip-existing', action='store_true', default=True, help='Skip existing items')
     parser.add_argument('--resume', action='store_true', help='Enable resume functionality')
     parser.add_argument('--compress', action='store_true', help='Enable JSON compression')
+    parser.add_argument('--compression', choices=['gzip', 'zstd'], default='gzip',
+                        help='Compression format used with --compress (default: gzip)')
     parser.add_argument('--memory-efficient', action='store_true', help='Memory-efficient processing')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the persistent HTTP cache (requests-cache)')
     parser.add_argument('--debug', action='store_true', help='Enable detailed debugging')
+    parser.add_argument('--quiet', action='store_true', help='Suppress the banner and the final summary')
     
     # Advanced optimization flags
     parser.add_argument('--use-async', action='store_true', help='Use async/await processing')
     parser.add_argument('--multiprocessing-threshold', type=int, default=1000, help='Multiprocessing threshold (default: 1000)')
     parser.add_argument('--aiohttp-workers', type=int, default=8, help='Number of aiohttp workers (default: 8)')
     parser.add_argument('--use-lxml', action='store_true', help='Use lxml for fast HTML parsing')
+    parser.add_argument('--parser', choices=['lxml', 'lexbor'], default='lxml',
+                        help='Page parser backend; lexbor requires selectolax (default: lxml)')
     parser.add_argument('--async-batch-size', type=int, default=50, help='Async batch size (default: 50)')
     parser.add_argument('--force-traditional', action='store_true', help='Force traditional method')
+    parser.add_argument('--sync-client', choices=['requests', 'httpx'], default='requests',
+                        help='HTTP client for non-async requests; httpx uses HTTP/2 and bypasses requests-cache (default: requests)')
+    parser.add_argument('--http-backend', choices=['aiohttp', 'rusty_req', 'arequest'], default='aiohttp',
+                        help='HTTP client for async extraction (default: aiohttp)')
     
     args = parser.parse_args()
     
@@ -2434,11 +3778,14 @@ def main():
         retries=args.retries,
         rate_limit=args.rate,
         stream_json=args.stream_json,
+        json_lines=args.jsonl,
         skip_existing=args.skip_existing,
         resume_enabled=args.resume,
         enable_compression=args.compress,
+        compression=args.compression,
         memory_efficient=args.memory_efficient,
-        debug=args.debug
+        debug=args.debug,
+        quiet=args.quiet
     )
     
     # تحديث خيارات التحسينات المتقدمة
@@ -2446,8 +3793,10 @@ def main():
     config.multiprocessing_threshold = args.multiprocessing_threshold
     config.aiohttp_workers = args.aiohttp_workers
     config.use_lxml = args.use_lxml
+    config.parser_backend = args.parser
     config.async_batch_size = args.async_batch_size
     config.force_traditional = args.force_traditional
+    config.http_backend = args.http_backend
     
     # تحديث الثوابت العامة
     global REQ_TIMEOUT, MAX_RETRIES, REQUEST_DELAY
@@ -2455,43 +3804,62 @@ def main():
     MAX_RETRIES = config.retries
     REQUEST_DELAY = config.rate_limit
     
+    # التخزين الدائم يُفعل هنا فقط - الاستيراد كمكتبة يبقى بجلسة requests عادية
+    if not args.no_cache:
+        config.http_cache = http_session.enable_cache()
+    # بعد ضبط REQ_TIMEOUT حتى يأخذ العميل المهلة المطلوبة
+    if args.sync_client == 'httpx':
+        args.sync_client = 'httpx' if http_session.use_httpx(http2=config.enable_http2,
+                                                              timeout=config.timeout) else 'requests'
+    config.sync_client = args.sync_client
+    
     try:
         # تحديد مسار الإخراج
         if not args.output:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            extension = '.json.gz' if config.enable_compression else '.json'
-            args.output = f"enhanced_book_{args.book_id}_{timestamp}{extension}"
-        
-        print("=" * 60)
-        print("سكربت المكتبة الشاملة المحسن مع تحسينات الأداء المتقدمة")
-        print("Enhanced Shamela Scraper with Advanced Performance Optimizations")
-        print("=" * 60)
-        print(f"📖 كتاب: {args.book_id}")
-        
-        # عرض معلومات التحسينات المتقدمة
-        if config.use_async:
-            print(f"🚀 وضع: غير متزامن (Async)")
-            print(f"⚡ عمال Aiohttp: {config.aiohttp_workers}")
-            print(f"📦 دفعة غير متزامنة: {config.async_batch_size}")
-        elif not config.force_traditional:
-            print(f"🔄 وضع: متعدد المعالجات (Multiprocessing)")
-            print(f"🎯 عتبة التبديل: {config.multiprocessing_threshold}")
-        else:
-            print(f"📊 وضع: تقليدي محسن")
-        
-        print(f"⚡ العمال: {config.max_workers}")
-        print(f"📦 الدفعة: {config.batch_size}")
-        print(f"⏱️ المهلة: {config.timeout}s")
-        print(f"🔄 إعادات: {config.retries}")
-        print(f"⏲️ التأخير: {config.rate_limit}s")
-        print(f"🏗️ محلل HTML: {'lxml' if config.use_lxml else 'BeautifulSoup'}")
-        print(f"💾 ضغط: {'نعم' if config.enable_compression else 'لا'}")
-        print(f"🧠 موفر ذاكرة: {'نعم' if config.memory_efficient else 'لا'}")
-        print(f"🐛 تطوير: {'نعم' if config.debug else 'لا'}")
-        print("-" * 60)
+            # لاحقة الضغط (.gz / .zst) تضاف عند الحفظ
+            suffix = 'jsonl' if args.format == 'json' and args.jsonl else args.format
+            args.output = f"enhanced_book_{args.book_id}_{timestamp}.{suffix}"
+        
+        if not config.quiet:
+            print("=" * 60)
+            print("سكربت المكتبة الشاملة المحسن مع تحسينات الأداء المتقدمة")
+            print("Enhanced Shamela Scraper with Advanced Performance Optimizations")
+            print("=" * 60)
+            print(f"📖 كتاب: {args.book_id}")
+            
+            # عرض معلومات التحسينات المتقدمة
+            if config.use_async:
+                print(f"🚀 وضع: غير متزامن (Async)")
+                print(f"⚡ عمال Aiohttp: {config.aiohttp_workers}")
+                print(f"🌐 عميل HTTP: {config.http_backend}")
+                print(f"🔁 حلقة الأحداث: {'uvloop' if config.use_uvloop and UVLOOP_AVAILABLE else 'asyncio'}")
+                print(f"📦 دفعة غير متزامنة: {config.async_batch_size}")
+            elif not config.force_traditional:
+                print(f"🔄 وضع: متعدد المعالجات (Multiprocessing)")
+                print(f"🎯 عتبة التبديل: {config.multiprocessing_threshold}")
+            else:
+                print(f"📊 وضع: تقليدي محسن")
+            
+            print(f"⚡ العمال: {config.max_workers}")
+            print(f"📦 الدفعة: {config.batch_size}")
+            print(f"⏱️ المهلة: {config.timeout}s")
+            print(f"🔄 إعادات: {config.retries}")
+            print(f"⏲️ التأخير: {config.rate_limit}s")
+            if config.parser_backend == 'lexbor' and SELECTOLAX_AVAILABLE:
+                html_parser_name = 'lexbor'
+            else:
+                html_parser_name = 'lxml' if config.use_lxml else 'BeautifulSoup'
+            print(f"🏗️ محلل HTML: {html_parser_name}")
+            print(f"💾 ضغط: {config.compression if config.enable_compression else 'لا'}")
+            print(f"🔗 عميل متزامن: {args.sync_client}")
+            print(f"🗃️ تخزين مؤقت دائم: {'نعم' if config.http_cache and args.sync_client == 'requests' else 'لا'}")
+            print(f"🧠 موفر ذاكرة: {'نعم' if config.memory_efficient else 'لا'}")
+            print(f"🐛 تطوير: {'نعم' if config.debug else 'لا'}")
+            print("-" * 60)
         
         # استخراج الكتاب مع التحسينات
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         book = scrape_enhanced_book(
             args.book_id,
             max_pages=args.max_pages,
@@ -2500,56 +3868,12 @@ def main():
         )
         
         # حفظ الكتاب مع التحسينات
-        save_enhanced_book_to_json(book, args.output, config)
+        args.output = save_enhanced_book_to_json(book, args.output, config)
         
-        elapsed_time = time.time() - start_time
+        elapsed_time = (time.perf_counter_ns() - start_ns) * 1e-9
         pages_per_second = len(book.pages) / elapsed_time if elapsed_time > 0 else 0
         
-        print("\n" + "=" * 60)
-        print("✅ تم استخراج الكتاب بنجاح!")
-        print("=" * 60)
-        print(f"📚 العنوان: {book.title}")
-        print(f"👨‍🎓 المؤلفون: {', '.join(author.name for author in book.authors)}")
-        
-        if book.publisher:
-            print(f"🏢 الناشر: {book.publisher.name}")
-            if book.publisher.location:
-                print(f"📍 الموقع: {book.publisher.location}")
-        
-        if book.book_section:
-            print(f"📂 القسم: {book.book_section.name}")
-        
-        if book.edition:
-            edition_info = f"📄 الطبعة: {book.edition}"
-            if book.edition_number:
-                edition_info += f" (رقم: {book.edition_number})"
-            print(edition_info)
-        
-        if book.publication_year:
-            year_info = f"📅 سنة النشر: {book.publication_year} م"
-            if book.edition_date_hijri:
-                year_info += f" ({book.edition_date_hijri} هـ)"
-            print(year_info)
-        
-        print(f"📄 عدد الصفحات: {len(book.pages)}")
-        print(f"📑 عدد الفصول: {len(book.index)}")
-        print(f"📚 عدد الأجزاء: {len(book.volumes)}")
-        
-        if book.volume_links:
-            print(f"🔗 روابط المجلدات: {len(book.volume_links)}")
-        
-        if book.has_original_pagination:
-            print("✅ يستخدم ترقيم الصفحات الأصلي")
-        
-        # إحصائيات الأداء
-        total_words = sum(page.word_count or 0 for page in book.pages)
-        if total_words > 0:
-            print(f"📊 إجمالي الكلمات: {total_words:,}")
-        
-        print(f"⏱️ الزمن الكلي: {elapsed_time:.2f} ثانية")
-        print(f"⚡ السرعة: {pages_per_second:.2f} صفحة/ثانية")
-        print(f"💾 حُفظ في: {args.output}")
-        print("=" * 60)
+        _print_summary(book, config, elapsed_time, pages_per_second, args.output)
         
     except Exception as e:
         logger.error(f"خطأ في استخراج الكتاب: {e}")
@@ -21,11 +21,14 @@ import json
 import sys
 import argparse
 import logging
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import multiprocessing as mp
-from typing import List, Dict, Any, Optional, Tuple
+from multiprocessing import util as mp_util
+from typing import List, Dict, Any, Optional, Tuple, Union
 import psutil
 import os
+import threading
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
@@ -36,12 +39,53 @@ except ImportError:
     LXML_AVAILABLE = False
     print("⚠️  lxml غير متوفر - سيتم استخدام BeautifulSoup (أبطأ)")
 
+# محلل HTML مبني على lexbor بلغة C (اختياري) - بديل أسرع من BeautifulSoup
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# فك ضغط br في aiohttp يتطلب brotli
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
 from bs4 import BeautifulSoup
 import mysql.connector
 from urllib.parse import urljoin, urlparse
 import re
 from datetime import datetime
 
+# ترميز JSON المشترك (orjson عند توفره) - وحدة صغيرة بلا آثار جانبية
+sys.path.append(os.path.dirname(__file__))
+from json_utils import json_bytes
+
+# محلل BeautifulSoup: lxml (C) عند توفره بدل html.parser المكتوب بـ Python
+BS4_PARSER = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+# تعابير XPath مترجمة مرة واحدة بدل ترجمتها في كل صفحة
+if LXML_AVAILABLE:
+    _XP_NASS = etree.XPath("//div[@class='nass']")
+    _XP_TEXT = etree.XPath("//div[contains(@class, 'text')]")
+    _LINK_XP = etree.XPath("//a[contains(@href, $prefix)]")
+
+# محلل lxml واحد لكل خيط بدل إنشاء محلل جديد مع كل fromstring
+_parser_local = threading.local()
+
+def _get_html_parser():
+    """محلل HTML للخيط الحالي (بلا وصول للشبكة، والبايتات تُقرأ UTF-8)"""
+    parser = getattr(_parser_local, 'parser', None)
+    if parser is None:
+        parser = lxml_html.HTMLParser(recover=True, no_network=True, encoding='utf-8')
+        _parser_local.parser = parser
+    return parser
+
+# أصغر قطعة صفحات تُرسل لعملية منفصلة
+MIN_PROCESS_CHUNK_SIZE = 32
+
 # إعدادات التحسين المتقدمة
 @dataclass
 class AdvancedPerformanceConfig:
@@ -59,11 +103,13 @@ class AdvancedPerformanceConfig:
     async_batch_size: int = 50
     retry_attempts: int = 5
     retry_delay: float = 0.5
+    include_html: bool = True  # False: تخطي تسلسل html_content والاكتفاء بالنص
     
     # إعدادات المعالجة المتوازية
     multiprocessing_threshold: int = 200
     max_processes: int = None
-    process_chunk_size: int = 100
+    process_chunk_size: int = 256  # الحد الأعلى لصفحات القطعة الواحدة
+    process_oversubscription: int = 4  # عدد القطع لكل عملية لموازنة الحمل
     
     # إعدادات التحسين
     enable_http2: bool = True
@@ -91,9 +137,12 @@ class AdvancedHTTPSession:
     async def __aenter__(self):
         """إنشاء الجلسة عند الدخول"""
         # إعداد الموصل المتقدم
+        # كل الطلبات لمضيف واحد: حد المضيف لا يقل عن عدد العمال حتى لا ينتظر عامل اتصالاً.
+        # aiohttp يضبط TCP_NODELAY على كل اتصال جديد فلا تأخير Nagle للطلبات الصغيرة
         self.connector = aiohttp.TCPConnector(
             limit=self.config.max_connections,
-            limit_per_host=self.config.max_connections_per_host,
+            limit_per_host=max(self.config.max_connections_per_host,
+                               self.config.async_semaphore_limit),
             ttl_dns_cache=self.config.dns_cache_ttl,
             use_dns_cache=True,
             keepalive_timeout=60 if self.config.enable_keepalive else 0,
@@ -109,12 +158,19 @@ class AdvancedHTTPSession:
             sock_read=self.config.read_timeout
         )
         
-        # إعداد الرؤوس
+        # إعداد الرؤوس - br يُعلن فقط إن أمكن فكه
+        if not self.config.enable_compression:
+            accept_encoding = 'identity'
+        elif BROTLI_AVAILABLE:
+            accept_encoding = 'br, gzip, deflate'
+        else:
+            accept_encoding = 'gzip, deflate'
+        
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'ar,en-US;q=0.7,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate' if self.config.enable_compression else 'identity',
+            'Accept-Encoding': accept_encoding,
             'Connection': 'keep-alive' if self.config.enable_keepalive else 'close',
             'Upgrade-Insecure-Requests': '1'
         }
@@ -139,32 +195,39 @@ class FastHTMLProcessor:
     """معالج HTML سريع باستخدام lxml أو BeautifulSoup"""
     
     @staticmethod
-    def extract_page_content(html: str, page_num: int) -> Optional[Dict[str, Any]]:
-        """استخراج محتوى الصفحة بأسرع طريقة ممكنة"""
+    def extract_page_content(html: Union[str, bytes], page_num: int,
+                             include_html: bool = False,
+                             extracted_at: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """استخراج محتوى الصفحة بأسرع طريقة ممكنة (html_content فارغ ما لم يُطلب)
+        
+        extracted_at: طابع زمني جاهز تشترك فيه صفحات الدفعة، وإلا يُحسب للصفحة
+        """
         try:
             if LXML_AVAILABLE:
-                return FastHTMLProcessor._extract_with_lxml(html, page_num)
+                return FastHTMLProcessor._extract_with_lxml(html, page_num, include_html, extracted_at)
             else:
-                return FastHTMLProcessor._extract_with_bs4(html, page_num)
+                return FastHTMLProcessor._extract_fallback(html, page_num, include_html, extracted_at)
         except Exception as e:
             logging.error(f"خطأ في معالجة HTML للصفحة {page_num}: {e}")
             return None
     
     @staticmethod
-    def _extract_with_lxml(html: str, page_num: int) -> Dict[str, Any]:
+    def _extract_with_lxml(html: Union[str, bytes], page_num: int, include_html: bool = False,
+                           extracted_at: Optional[str] = None) -> Dict[str, Any]:
         """استخراج باستخدام lxml (الأسرع)"""
         try:
-            tree = lxml_html.fromstring(html)
+            tree = lxml_html.fromstring(html, parser=_get_html_parser())
             
             # استخراج المحتوى الرئيسي
-            content_elements = tree.xpath("//div[@class='nass']")
+            content_elements = _XP_NASS(tree)
             if not content_elements:
-                content_elements = tree.xpath("//div[contains(@class, 'text')]")
+                content_elements = _XP_TEXT(tree)
             
             if content_elements:
                 content_elem = content_elements[0]
                 text_content = content_elem.text_content().strip()
-                html_content = lxml_html.tostring(content_elem, encoding='unicode', method='html')
+                html_content = (lxml_html.tostring(content_elem, encoding='unicode', method='html')
+                                if include_html else '')
                 
                 # استخراج معلومات إضافية
                 word_count = len(text_content.split())
@@ -176,20 +239,55 @@ class FastHTMLProcessor:
                     'html_content': html_content,
                     'word_count': word_count,
                     'char_count': char_count,
-                    'extracted_at': datetime.now().isoformat(),
+                    'extracted_at': extracted_at or datetime.now().isoformat(),
                     'extraction_method': 'lxml'
                 }
             
         except Exception:
-            # تراجع إلى BeautifulSoup
+            # تراجع إلى lexbor أو BeautifulSoup
             pass
         
-        return FastHTMLProcessor._extract_with_bs4(html, page_num)
+        return FastHTMLProcessor._extract_fallback(html, page_num, include_html, extracted_at)
+    
+    @staticmethod
+    def _extract_fallback(html: Union[str, bytes], page_num: int, include_html: bool = False,
+                          extracted_at: Optional[str] = None) -> Dict[str, Any]:
+        """المسار البديل: lexbor إن توفر، وإلا BeautifulSoup"""
+        if SELECTOLAX_AVAILABLE:
+            return FastHTMLProcessor._extract_with_lexbor(html, page_num, include_html, extracted_at)
+        return FastHTMLProcessor._extract_with_bs4(html, page_num, include_html, extracted_at)
+    
+    @staticmethod
+    def _extract_with_lexbor(html: Union[str, bytes], page_num: int, include_html: bool = False,
+                             extracted_at: Optional[str] = None) -> Dict[str, Any]:
+        """استخراج باستخدام selectolax/lexbor (أسرع من BeautifulSoup بكثير)"""
+        tree = LexborHTMLParser(html)
+        
+        # نفس أولوية BeautifulSoup: div.nass ثم أي div يحوي text أو content في الصنف
+        content_node = tree.css_first('div.nass')
+        if content_node is None:
+            content_node = tree.css_first('div[class*=text], div[class*=content]')
+        
+        if content_node is not None:
+            text_content = content_node.text().strip()
+            
+            return {
+                'page_number': page_num,
+                'content': text_content,
+                'html_content': content_node.html if include_html else '',
+                'word_count': len(text_content.split()),
+                'char_count': len(text_content),
+                'extracted_at': extracted_at or datetime.now().isoformat(),
+                'extraction_method': 'lexbor'
+            }
+        
+        return FastHTMLProcessor._empty_page(page_num, extracted_at)
     
     @staticmethod
-    def _extract_with_bs4(html: str, page_num: int) -> Dict[str, Any]:
+    def _extract_with_bs4(html: Union[str, bytes], page_num: int, include_html: bool = False,
+                          extracted_at: Optional[str] = None) -> Dict[str, Any]:
         """استخراج باستخدام BeautifulSoup (بديل)"""
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = BeautifulSoup(html, BS4_PARSER)
         
         # البحث عن المحتوى
         content_div = soup.find('div', class_='nass')
@@ -198,7 +296,7 @@ class FastHTMLProcessor:
         
         if content_div:
             text_content = content_div.get_text().strip()
-            html_content = str(content_div)
+            html_content = str(content_div) if include_html else ''
             
             return {
                 'page_number': page_num,
@@ -206,17 +304,22 @@ class FastHTMLProcessor:
                 'html_content': html_content,
                 'word_count': len(text_content.split()),
                 'char_count': len(text_content),
-                'extracted_at': datetime.now().isoformat(),
+                'extracted_at': extracted_at or datetime.now().isoformat(),
                 'extraction_method': 'beautifulsoup'
             }
         
+        return FastHTMLProcessor._empty_page(page_num, extracted_at)
+    
+    @staticmethod
+    def _empty_page(page_num: int, extracted_at: Optional[str] = None) -> Dict[str, Any]:
+        """صفحة فارغة عند تعذر العثور على المحتوى"""
         return {
             'page_number': page_num,
             'content': '',
             'html_content': '',
             'word_count': 0,
             'char_count': 0,
-            'extracted_at': datetime.now().isoformat(),
+            'extracted_at': extracted_at or datetime.now().isoformat(),
             'extraction_method': 'failed'
         }
 
@@ -231,51 +334,69 @@ class AsyncPageExtractor:
                                  session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
         """استخراج دفعة من الصفحات بشكل غير متزامن"""
         start_page, end_page = page_range
-        semaphore = asyncio.Semaphore(self.config.async_semaphore_limit)
+        # طابع زمني واحد لكل صفحات الدفعة
+        extracted_at = datetime.now().isoformat()
         
         async def extract_single_page(page_num: int) -> Optional[Dict[str, Any]]:
-            async with semaphore:
-                for attempt in range(self.config.retry_attempts):
-                    try:
-                        url = f"https://shamela.ws/book/{book_id}/{page_num}"
+            for attempt in range(self.config.retry_attempts):
+                try:
+                    url = f"https://shamela.ws/book/{book_id}/{page_num}"
+                    
+                    async with session.get(url) as response:
+                        if response.status == 200:
+                            # البايتات مباشرة إلى المحلل دون فك ترميزها إلى str أولاً
+                            html_bytes = await response.read()
+                            result = FastHTMLProcessor.extract_page_content(
+                                html_bytes, page_num, self.config.include_html, extracted_at
+                            )
+                            if result:
+                                self.logger.debug(f"✅ استخراج ناجح للصفحة {page_num}")
+                                return result
                         
-                        async with session.get(url) as response:
-                            if response.status == 200:
-                                html = await response.text()
-                                result = FastHTMLProcessor.extract_page_content(html, page_num)
-                                if result:
-                                    self.logger.debug(f"✅ استخراج ناجح للصفحة {page_num}")
-                                    return result
-                            
-                            elif response.status == 404:
-                                self.logger.warning(f"❌ صفحة غير موجودة: {page_num}")
-                                return None
-                            
-                        await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
+                        elif response.status == 404:
+                            self.logger.warning(f"❌ صفحة غير موجودة: {page_num}")
+                            return None
                         
-                    except Exception as e:
-                        if attempt == self.config.retry_attempts - 1:
-                            self.logger.error(f"❌ فشل نهائي في صفحة {page_num}: {e}")
-                        else:
-                            await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
-                
-                return None
+                    await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
+                    
+                except Exception as e:
+                    if attempt == self.config.retry_attempts - 1:
+                        self.logger.error(f"❌ فشل نهائي في صفحة {page_num}: {e}")
+                    else:
+                        await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
+            
+            return None
+        
+        # طابور أرقام الصفحات وعدد ثابت من العمال بدل مهمة لكل صفحة
+        page_count = end_page - start_page + 1
+        queue: asyncio.Queue = asyncio.Queue()
+        for page in range(start_page, end_page + 1):
+            queue.put_nowait(page)
+        
+        # النتائج في مواضعها حسب رقم الصفحة
+        results: List[Optional[Dict[str, Any]]] = [None] * page_count
         
-        # إنشاء المهام
-        tasks = [extract_single_page(page) for page in range(start_page, end_page + 1)]
+        async def worker():
+            while True:
+                page_num = await queue.get()
+                try:
+                    results[page_num - start_page] = await extract_single_page(page_num)
+                except Exception as e:
+                    self.logger.error(f"خطأ في المعالجة: {e}")
+                finally:
+                    queue.task_done()
         
-        # تنفيذ المهام مع تجميع النتائج
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        workers = [asyncio.create_task(worker())
+                   for _ in range(min(self.config.async_semaphore_limit, page_count))]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
         
         # فلترة النتائج الصحيحة
-        valid_results = []
-        for result in results:
-            if isinstance(result, dict) and result is not None:
-                valid_results.append(result)
-            elif isinstance(result, Exception):
-                self.logger.error(f"خطأ في المعالجة: {result}")
-        
-        return valid_results
+        return [result for result in results if result is not None]
 
 class MultiprocessExtractor:
     """مستخرج متعدد العمليات للكتب الضخمة"""
@@ -294,35 +415,37 @@ class MultiprocessExtractor:
         
         # معالجة متوازية
         all_pages = []
-        with ProcessPoolExecutor(max_workers=self.config.max_processes) as executor:
-            # إرسال المهام
-            future_to_chunk = {
-                executor.submit(extract_chunk_worker, book_id, chunk, asdict(self.config)): chunk 
-                for chunk in chunks
-            }
+        config_dict = asdict(self.config)
+        with ProcessPoolExecutor(max_workers=self.config.max_processes,
+                                 initializer=_init_chunk_worker,
+                                 initargs=(config_dict,)) as executor:
+            # map يرسل عدة دفعات في كل نقل بين العمليات بدل تسلسل كل مهمة وحدها؛
+            # الإعدادات وصلت كل عملية مرة واحدة عبر initargs فلا تُرسل مع كل دفعة.
+            # لا مهلة لكل دفعة: مهلات طلبات HTTP داخل العامل هي ما يمنع التعليق
+            worker = partial(_chunk_worker_safe, book_id)
+            chunksize = max(1, len(chunks) // (self.config.max_processes * 2))
             
             # جمع النتائج
-            for i, future in enumerate(as_completed(future_to_chunk)):
-                chunk = future_to_chunk[future]
-                try:
-                    chunk_pages = future.result(timeout=600)  # 10 دقائق لكل دفعة
+            for i, (chunk, chunk_pages, error) in enumerate(
+                    executor.map(worker, chunks, chunksize=chunksize)):
+                start_page, end_page = chunk
+                if error is None:
                     all_pages.extend(chunk_pages)
-                    
-                    start_page, end_page = chunk
                     self.logger.info(f"✅ انتهت الدفعة {i+1}/{len(chunks)} "
                                    f"(صفحات {start_page}-{end_page}): {len(chunk_pages)} صفحة")
-                    
-                except Exception as e:
-                    start_page, end_page = chunk
-                    self.logger.error(f"❌ فشلت الدفعة {i+1} (صفحات {start_page}-{end_page}): {e}")
+                else:
+                    self.logger.error(f"❌ فشلت الدفعة {i+1} (صفحات {start_page}-{end_page}): {error}")
         
-        # ترتيب النتائج
-        return sorted(all_pages, key=lambda x: x.get('page_number', 0))
+        # map يعيد الدفعات بترتيبها وكل دفعة مرتبة - النتيجة مرتبة دون فرز
+        return all_pages
     
     def _create_page_chunks(self, total_pages: int) -> List[Tuple[int, int]]:
         """تقسيم الصفحات إلى قطع للمعالجة المتوازية"""
-        chunk_size = max(self.config.process_chunk_size, 
-                        total_pages // self.config.max_processes)
+        # قطع أكثر من العمليات (×M) حتى تلتقط العمليات السريعة ما تبقى،
+        # مع حد أدنى يبقي تكلفة بدء كل قطعة (حلقة وجلسة جديدتان) صغيرة نسبياً
+        target_chunks = self.config.max_processes * self.config.process_oversubscription
+        chunk_size = max(1, total_pages // target_chunks)
+        chunk_size = min(max(chunk_size, MIN_PROCESS_CHUNK_SIZE), self.config.process_chunk_size)
         
         chunks = []
         for i in range(1, total_pages + 1, chunk_size):
@@ -331,9 +454,46 @@ class MultiprocessExtractor:
         
         return chunks
 
+# حلقة وجلسة HTTP دائمتان لكل عملية عاملة - تبقى اتصالات keep-alive مفتوحة بين الدفعات
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_http: Optional[AdvancedHTTPSession] = None
+_worker_config: Optional[AdvancedPerformanceConfig] = None
+
+def _init_chunk_worker(config_dict: dict):
+    """تهيئة العملية العاملة مرة واحدة: الإعدادات وحلقة أحداث وجلسة HTTP مشتركة لكل دفعاتها"""
+    global _worker_loop, _worker_http, _worker_config
+    
+    _worker_config = AdvancedPerformanceConfig(**config_dict)
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    _worker_http = AdvancedHTTPSession(_worker_config)
+    _worker_loop.run_until_complete(_worker_http.__aenter__())
+    
+    # إغلاق الجلسة عند خروج العملية العاملة
+    mp_util.Finalize(None, _close_chunk_worker, exitpriority=10)
+
+def _close_chunk_worker():
+    """إغلاق جلسة وحلقة العملية العاملة"""
+    global _worker_loop, _worker_http
+    
+    if _worker_loop is None:
+        return
+    try:
+        _worker_loop.run_until_complete(_worker_http.__aexit__(None, None, None))
+    finally:
+        _worker_loop.close()
+        _worker_loop = _worker_http = None
+
 def extract_chunk_worker(book_id: int, page_range: Tuple[int, int], 
-                        config_dict: dict) -> List[Dict[str, Any]]:
-    """عامل لاستخراج قطعة من الصفحات في عملية منفصلة"""
+                        config_dict: Optional[dict] = None) -> List[Dict[str, Any]]:
+    """عامل لاستخراج قطعة من الصفحات في عملية منفصلة (config_dict مطلوب فقط خارج عملية مهيأة)"""
+    # عملية مهيأة بـ _init_chunk_worker: إعادة استخدام إعداداتها وجلستها
+    if _worker_http is not None:
+        extractor = AsyncPageExtractor(_worker_config)
+        return _worker_loop.run_until_complete(
+            extractor.extract_pages_batch(book_id, page_range, _worker_http.session)
+        )
+    
     # تحويل القاموس إلى إعدادات
     config = AdvancedPerformanceConfig(**config_dict)
     
@@ -346,6 +506,17 @@ def extract_chunk_worker(book_id: int, page_range: Tuple[int, int],
     finally:
         loop.close()
 
+def _chunk_worker_safe(book_id: int, page_range: Tuple[int, int]
+                       ) -> Tuple[Tuple[int, int], List[Dict[str, Any]], Optional[str]]:
+    """
+    غلاف extract_chunk_worker لـ executor.map في عملية مهيأة بـ _init_chunk_worker
+    يعيد الخطأ بدل رفعه حتى لا يوقف باقي الدفعات
+    """
+    try:
+        return page_range, extract_chunk_worker(book_id, page_range), None
+    except Exception as e:
+        return page_range, [], str(e)
+
 async def extract_chunk_async(book_id: int, page_range: Tuple[int, int], 
                              config: AdvancedPerformanceConfig) -> List[Dict[str, Any]]:
     """استخراج قطعة باستخدام async في عملية منفصلة"""
@@ -365,7 +536,8 @@ class BookInfoExtractor:
             
             async with session.get(url) as response:
                 if response.status == 200:
-                    html = await response.text()
+                    # شاملة تخدم UTF-8 - تحديد الترميز يتخطى اكتشافه آلياً
+                    html = await response.text(encoding='utf-8', errors='replace')
                     return BookInfoExtractor._parse_book_info(html, book_id)
                     
         except Exception as e:
@@ -381,12 +553,16 @@ class BookInfoExtractor:
         
         if LXML_AVAILABLE:
             try:
-                tree = lxml_html.fromstring(html)
+                tree = lxml_html.fromstring(html, parser=_get_html_parser())
                 # البحث عن روابط الصفحات أو معلومات أخرى
-                page_links = tree.xpath("//a[contains(@href, '/book/%d/')]" % book_id)
+                page_links = _LINK_XP(tree, prefix=f'/book/{book_id}/')
                 estimated_pages = len(page_links) if page_links else 100
             except:
                 estimated_pages = 100
+        elif SELECTOLAX_AVAILABLE:
+            tree = LexborHTMLParser(html)
+            page_links = tree.css(f'a[href*="/book/{book_id}/"]')
+            estimated_pages = len(page_links) if page_links else 100
         else:
             soup = BeautifulSoup(html, 'html.parser')
             page_links = soup.find_all('a', href=re.compile(f'/book/{book_id}/'))
@@ -527,7 +703,8 @@ class AdvancedShamelaScraper:
                 import gc
                 gc.collect()
         
-        return sorted(all_pages, key=lambda x: x.get('page_number', 0))
+        # الدفعات متتالية تصاعدياً وكل دفعة مرتبة حسب رقم الصفحة
+        return all_pages
 
 async def main():
     """الدالة الرئيسية للاختبار"""
@@ -551,8 +728,8 @@ async def main():
         
         # حفظ النتائج
         output_file = f"book_{book_id}_advanced_v2.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(json_bytes(result, indent=True))
         
         print(f"\n🎉 تم حفظ النتائج في: {output_file}")
         print(f"📊 الإحصائيات:")
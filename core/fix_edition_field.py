@@ -9,6 +9,11 @@ import mysql.connector
 import sys
 import os
 
+EDITION_TYPE_QUERY = """
+    SELECT DATA_TYPE, COLUMN_TYPE FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'books' AND COLUMN_NAME = 'edition'
+"""
+
 def fix_edition_column():
     """إصلاح حقل edition في جدول books"""
     
@@ -29,21 +34,15 @@ def fix_edition_column():
         cursor = connection.cursor()
         
         print("🔍 فحص هيكل الجدول الحالي...")
-        cursor.execute("DESCRIBE books")
-        columns = cursor.fetchall()
-        
-        # البحث عن حقل edition
-        edition_column = None
-        for column in columns:
-            if column[0] == 'edition':
-                edition_column = column
-                break
+        # استعلام واحد عن حقل edition بدلاً من DESCRIBE والبحث في كل الأعمدة
+        cursor.execute(EDITION_TYPE_QUERY, (db_config['database'],))
+        edition_column = cursor.fetchone()
         
         if edition_column:
             print(f"📋 حقل edition الحالي: {edition_column[1]}")
             
             # فحص إذا كان النوع INTEGER
-            if 'int' in edition_column[1].lower():
+            if 'int' in edition_column[0].lower():
                 print("⚠️ حقل edition من نوع INTEGER - يحتاج إصلاح!")
                 
                 print("🔧 تحويل حقل edition إلى VARCHAR(255)...")
@@ -62,13 +61,11 @@ def fix_edition_column():
         
         # فحص الهيكل الجديد
         print("\n🔍 فحص الهيكل بعد التعديل...")
-        cursor.execute("DESCRIBE books")
-        columns = cursor.fetchall()
+        cursor.execute(EDITION_TYPE_QUERY, (db_config['database'],))
+        edition_column = cursor.fetchone()
         
-        for column in columns:
-            if column[0] == 'edition':
-                print(f"✅ حقل edition الجديد: {column[1]}")
-                break
+        if edition_column:
+            print(f"✅ حقل edition الجديد: {edition_column[1]}")
         
         cursor.close()
         connection.close()
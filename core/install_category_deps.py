@@ -10,20 +10,31 @@ import sys
 def install_requirements():
     """تثبيت المكتبات المطلوبة"""
     packages = [
-        'requests',
-        'beautifulsoup4',
-        'lxml'  # محلل HTML محسن
+        'requests>=2.31',
+        'beautifulsoup4>=4.12',
+        'lxml>=5.0'  # محلل HTML محسن
     ]
+    # مسرعات المستخرج الاختيارية (selectolax و orjson و httpx ...) مدرجة في requirements.txt
+    # --prefer-binary: حزم wheel الجاهزة بدل بناء lxml من المصدر
+    pip_install = [sys.executable, "-m", "pip", "install",
+                   "--disable-pip-version-check", "--prefer-binary"]
     
     print("🔧 تثبيت المكتبات المطلوبة لاستخراج الأقسام...")
     
-    for package in packages:
-        try:
-            print(f"📦 تثبيت {package}...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-            print(f"✅ تم تثبيت {package} بنجاح")
-        except subprocess.CalledProcessError as e:
-            print(f"❌ فشل في تثبيت {package}: {e}")
+    try:
+        # استدعاء pip واحد لكل الحزم بدلاً من تكلفة بدء pip لكل حزمة
+        subprocess.check_call([*pip_install, *packages])
+        print(f"✅ تم تثبيت {len(packages)} مكتبة بنجاح")
+    except subprocess.CalledProcessError:
+        # التراجع إلى التثبيت الفردي لمعرفة الحزمة التي فشلت
+        print("⚠️ فشل التثبيت المجمع - التثبيت حزمة حزمة...")
+        for package in packages:
+            try:
+                print(f"📦 تثبيت {package}...")
+                subprocess.check_call([*pip_install, package])
+                print(f"✅ تم تثبيت {package} بنجاح")
+            except subprocess.CalledProcessError as e:
+                print(f"❌ فشل في تثبيت {package}: {e}")
     
     print("🎉 انتهى تثبيت المكتبات!")
     
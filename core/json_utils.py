@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+ترميز JSON المشترك بين المستخرجات
+وحدة بلا آثار جانبية عند الاستيراد (لا سجلات ولا جلسات HTTP)
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def json_bytes(data: Any, indent: bool = False) -> bytes:
+    """ترميز JSON إلى بايتات UTF-8 - orjson عند توفره (أسرع بعدة مرات)"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
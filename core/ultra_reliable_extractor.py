@@ -6,25 +6,112 @@
 
 import asyncio
 import aiohttp
+import sys
 import time
 import json
-import gzip
 import threading
 import queue
-from typing import List, Dict, Any, Optional, Union
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import hashlib
+import base64
 import logging
 from contextlib import asynccontextmanager
-import pickle
 import sqlite3
 from urllib.parse import urljoin, urlparse
 import re
+import itertools
+from functools import lru_cache
+from collections import Counter, OrderedDict
+
+# تحليل الصفحات بـ lxml (libxml2) مع التراجع إلى BeautifulSoup
+try:
+    from lxml import html as lxml_html, etree
+    LXML_AVAILABLE = True
+except ImportError:
+    from bs4 import BeautifulSoup
+    LXML_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# مجموعات أرقام الصفحات كخرائط بت مضغوطة (اختياري)
+try:
+    from pyroaring import BitMap
+    PYROARING_AVAILABLE = True
+except ImportError:
+    PYROARING_AVAILABLE = False
+
+# محدد معدل غير متزامن (دلو رموز على حلقة الأحداث)
+try:
+    from aiolimiter import AsyncLimiter
+    AIOLIMITER_AVAILABLE = True
+except ImportError:
+    AIOLIMITER_AVAILABLE = False
+
+# تجزئة غير تشفيرية سريعة لمفاتيح التخزين المؤقت (اختياري)
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# فك ضغط br في aiohttp يتطلب brotli
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# حلقة أحداث أسرع مبنية على libuv (غير متوفرة على ويندوز)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = sys.platform != 'win32'
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# عميل HTTP/2 غير متزامن يعدد طلبات الصفحات على اتصال TLS واحد (اختياري)
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+# بداية إطار zstd - لتمييز القيم المضغوطة عن JSON الخام
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# محلل واحد وتعابير XPath مترجمة مسبقاً لكل الصفحات: أول div.nass وعُقد نصه
+if LXML_AVAILABLE:
+    _PAGE_PARSER = lxml_html.HTMLParser(encoding='utf-8', huge_tree=True, recover=True)
+    _NASS_XPATH = etree.XPath(
+        '(//div[contains(concat(" ", normalize-space(@class), " "), " nass ")])[1]'
+    )
+    _NASS_TEXT_XPATH = etree.XPath("descendant::text()", smart_strings=False)
+
+# عدد مرات الكتابة بين كل حذف جماعي للعناصر المنتهية
+CACHE_PURGE_INTERVAL = 500
+
+# الكتابات تُجمع وتُنفذ في معاملة واحدة كل 50 عنصراً أو كل ثانية
+CACHE_FLUSH_SIZE = 50
+CACHE_FLUSH_INTERVAL = 1.0
 
 # استيراد النظام فائق الموثوقية
-import sys
 import os
 sys.path.append(os.path.dirname(__file__))
 from ultra_reliability_system import (
@@ -53,8 +140,29 @@ except ImportError:
         birth_date: str = None
         death_date: str = None
 
+# عدّ الكلمات دون بناء قائمة الكلمات - نفس فواصل str.split()
+_WORD_RE = re.compile(r'\S+')
+
+def count_words(text: str) -> int:
+    """عدد كلمات النص (مطابق لـ len(text.split()))"""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
 logger = logging.getLogger(__name__)
 
+# أخطاء الشبكة التي يعيد _fetch المحاولة عندها (aiohttp أو httpx)
+_HTTP_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+if HTTPX_AVAILABLE:
+    _HTTP_ERRORS += (httpx.HTTPError,)
+
+# ترويسات طلبات الصفحات عبر الجلسة المشتركة
+PAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'ar,en-US;q=0.7,en;q=0.3',
+    # صفحات HTML العربية تنضغط 4-6 مرات - aiohttp يفك الضغط تلقائياً
+    'Accept-Encoding': 'gzip, br, deflate' if BROTLI_AVAILABLE else 'gzip, deflate',
+}
+
 @dataclass
 class UltraReliableConfig:
     """تكوين المستخرج فائق الموثوقية"""
@@ -67,6 +175,8 @@ class UltraReliableConfig:
     batch_size: int = 20
     request_delay: float = 0.1
     adaptive_delay: bool = True
+    use_uvloop: bool = True
+    http_client: str = 'aiohttp'  # aiohttp | httpx (HTTP/2)
     
     # إعدادات التخزين المؤقت المتقدم
     enable_smart_caching: bool = True
@@ -90,117 +200,232 @@ class UltraReliableConfig:
     max_empty_pages: int = 5
     content_validation: bool = True
 
+@dataclass
+class PageRecord:
+    """سجل صفحة مستخرجة - __slots__ بدل قاموس لكل صفحة"""
+    __slots__ = ('page_number', 'content', 'word_count', 'char_count', 'url', 'extraction_time')
+    
+    page_number: int
+    content: str
+    word_count: int
+    char_count: int
+    url: str
+    extraction_time: float
+
+def _hash_key(key_data: str) -> str:
+    """تجزئة نص المفتاح"""
+    # المفتاح ليس في سياق عدائي - xxh3 أسرع بكثير من MD5 على النصوص القصيرة
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_hexdigest(key_data.encode())
+    return hashlib.md5(key_data.encode()).hexdigest()
+
+@lru_cache(maxsize=8192)
+def _url_cache_key(url: str) -> str:
+    """مفتاح التخزين المؤقت للرابط - الروابط نفسها تتكرر عبر المحاولات والفحص والحفظ"""
+    return _hash_key(url)
+
 class SmartCache:
     """نظام تخزين مؤقت ذكي ومتقدم"""
     
     def __init__(self, config: UltraReliableConfig):
         self.config = config
-        self.memory_cache = {}
-        self.access_count = {}
+        # LRU: العنصر الأحدث استخداماً في النهاية والأقدم في البداية
+        self.memory_cache = OrderedDict()
         self.cache_lock = threading.RLock()
         
         # تخزين مؤقت دائم
         if config.persistent_cache:
             self.cache_file = Path("ultra_cache.db")
+            # اتصال SQLite لكل خيط بدل اتصال مشترك يسلسل كل العمليات خلف قفل واحد
+            self._tls = threading.local()
             self._init_persistent_cache()
     
+    def _conn(self) -> sqlite3.Connection:
+        """اتصال SQLite الخاص بالخيط الحالي (يُفتح عند أول استخدام)"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.cache_file))
+            # WAL: القراءة لا تنتظر الكتابة، و NORMAL تلغي fsync عند كل commit
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._tls.conn = conn
+        return conn
+    
     def _init_persistent_cache(self):
         """تهيئة التخزين المؤقت الدائم"""
         try:
-            self.conn = sqlite3.connect(str(self.cache_file), check_same_thread=False)
-            self.conn.execute("""
+            conn = self._conn()
+            # الجدول القديم (pickle بلا عمود انتهاء) يُستبدل - محتواه مجرد تخزين مؤقت
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache)")}
+            if columns and 'expires_at' not in columns:
+                conn.execute("DROP TABLE cache")
+            conn.execute("""
                 CREATE TABLE IF NOT EXISTS cache (
                     key TEXT PRIMARY KEY,
                     value BLOB,
-                    timestamp INTEGER,
-                    access_count INTEGER DEFAULT 1
+                    expires_at INTEGER
                 )
             """)
-            self.conn.commit()
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_exp ON cache(expires_at)")
+            conn.commit()
+            # flush يُستدعى من خيط الكتابة ومن الخيط الرئيسي معاً
+            self._sets_since_purge = 0
+            self._purge_lock = threading.Lock()
+            
+            # مخزن الكتابات المؤجلة وخيط خلفي يفرغه حتى يُطلب إيقافه
+            self._write_buffer: List[tuple] = []
+            self._buffer_lock = threading.Lock()
+            self._flush_event = threading.Event()
+            self._stop_event = threading.Event()
+            self._writer = threading.Thread(target=self._writer_loop, name="cache-writer", daemon=True)
+            self._writer.start()
         except Exception as e:
             logger.error(f"❌ فشل في تهيئة التخزين المؤقت: {str(e)}")
             self.config.persistent_cache = False
     
+    def _encode(self, value: Any) -> bytes:
+        """ترميز القيمة JSON مضغوطاً بـ zstd عند توفره"""
+        data = orjson.dumps(value) if ORJSON_AVAILABLE else json.dumps(value, ensure_ascii=False).encode('utf-8')
+        # دوال الوحدة تنشئ سياقاً لكل استدعاء - كائنات Zstd*compressor غير آمنة بين الخيوط
+        return zstandard.compress(data, 3) if ZSTD_AVAILABLE else data
+    
+    def _decode(self, blob: bytes) -> Any:
+        """فك ترميز قيمة مخزنة"""
+        if blob[:4] == _ZSTD_MAGIC:
+            blob = zstandard.decompress(blob)
+        return orjson.loads(blob) if ORJSON_AVAILABLE else json.loads(blob)
+    
+    def _purge_expired(self):
+        """حذف جميع العناصر المنتهية بعبارة واحدة عبر فهرس expires_at"""
+        conn = self._conn()
+        conn.execute("DELETE FROM cache WHERE expires_at < ?", (int(time.time()),))
+        conn.commit()
+    
+    def _writer_loop(self):
+        """تفريغ الكتابات المؤجلة كل CACHE_FLUSH_INTERVAL أو عند امتلاء المخزن"""
+        while not self._stop_event.is_set():
+            self._flush_event.wait(CACHE_FLUSH_INTERVAL)
+            self._flush_event.clear()
+            self.flush()
+        # تفريغ أخير لما أضيف قبل طلب الإيقاف
+        self.flush()
+    
+    def close(self):
+        """إيقاف خيط الكتابة بعد تفريغ ما تبقى (آمن للاستدعاء أكثر من مرة)"""
+        writer = getattr(self, '_writer', None)
+        if writer is None or not writer.is_alive():
+            return
+        self._stop_event.set()
+        self._flush_event.set()
+        writer.join()
+    
+    def flush(self):
+        """كتابة كل العناصر المؤجلة في معاملة واحدة"""
+        if not self.config.persistent_cache:
+            return
+        with self._buffer_lock:
+            rows, self._write_buffer = self._write_buffer, []
+        if not rows:
+            return
+        
+        try:
+            conn = self._conn()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)", rows
+                )
+            
+            with self._purge_lock:
+                self._sets_since_purge += len(rows)
+                purge = self._sets_since_purge >= CACHE_PURGE_INTERVAL
+                if purge:
+                    self._sets_since_purge = 0
+            if purge:
+                self._purge_expired()
+        except Exception as e:
+            logger.debug(f"خطأ في كتابة التخزين المؤقت: {str(e)}")
+    
     def _generate_key(self, url: str, params: Dict = None) -> str:
         """توليد مفتاح تخزين مؤقت"""
-        key_data = f"{url}_{params or ''}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+        # params قاموس غير قابل للتجزئة - المفاتيح المحفوظة للروابط وحدها
+        if params:
+            return _hash_key(f"{url}|{params}")
+        return _url_cache_key(url)
     
     def get(self, key: str) -> Optional[Any]:
         """الحصول على قيمة من التخزين المؤقت"""
+        # البحث في الذاكرة أولاً - الإصابة لا تلمس SQLite إطلاقاً
         with self.cache_lock:
-            # البحث في الذاكرة أولاً
-            if key in self.memory_cache:
-                self.access_count[key] = self.access_count.get(key, 0) + 1
-                return self.memory_cache[key]
-            
-            # البحث في التخزين الدائم
-            if self.config.persistent_cache:
-                try:
-                    cursor = self.conn.execute(
-                        "SELECT value, timestamp FROM cache WHERE key = ?", (key,)
-                    )
-                    result = cursor.fetchone()
-                    if result:
-                        value_blob, timestamp = result
-                        # فحص انتهاء الصلاحية
-                        if time.time() - timestamp < self.config.cache_duration:
-                            value = pickle.loads(value_blob)
-                            # نقل إلى ذاكرة التخزين المؤقت
-                            self.memory_cache[key] = value
-                            self.access_count[key] = self.access_count.get(key, 0) + 1
-                            # تحديث عدد الوصول
-                            self.conn.execute(
-                                "UPDATE cache SET access_count = access_count + 1 WHERE key = ?", 
-                                (key,)
-                            )
-                            self.conn.commit()
-                            return value
-                except Exception as e:
-                    logger.debug(f"خطأ في قراءة التخزين المؤقت: {str(e)}")
-            
-            return None
+            value = self.memory_cache.get(key)
+            if value is not None:
+                self.memory_cache.move_to_end(key)
+                return value
+        
+        # البحث في التخزين الدائم (قراءة فقط دون تحديث أو commit)
+        if self.config.persistent_cache:
+            try:
+                cursor = self._conn().execute(
+                    "SELECT value FROM cache WHERE key = ? AND expires_at >= ?",
+                    (key, int(time.time()))
+                )
+                result = cursor.fetchone()
+                if result:
+                    value = self._decode(result[0])
+                    # نقل إلى ذاكرة التخزين المؤقت
+                    self._remember(key, value)
+                    return value
+            except Exception as e:
+                logger.debug(f"خطأ في قراءة التخزين المؤقت: {str(e)}")
+        
+        return None
     
     def set(self, key: str, value: Any):
         """تعيين قيمة في التخزين المؤقت"""
+        # تخزين في الذاكرة
+        self._remember(key, value)
+        
+        # تخزين دائم
+        if self.config.persistent_cache:
+            try:
+                row = (key, self._encode(value), int(time.time()) + self.config.cache_duration)
+            except Exception as e:
+                logger.debug(f"خطأ في ترميز قيمة التخزين المؤقت: {str(e)}")
+                return
+            
+            with self._buffer_lock:
+                self._write_buffer.append(row)
+                buffered = len(self._write_buffer)
+            if buffered >= CACHE_FLUSH_SIZE:
+                self._flush_event.set()
+    
+    def _remember(self, key: str, value: Any):
+        """إضافة قيمة إلى ذاكرة LRU وطرد الأقدم عند تجاوز الحد"""
         with self.cache_lock:
-            # تخزين في الذاكرة
             self.memory_cache[key] = value
-            self.access_count[key] = 1
+            self.memory_cache.move_to_end(key)
             
-            # تنظيف الذاكرة إذا تجاوزت الحد
+            # عند تجاوز الحد يُطرد الأقدم استخداماً حتى 70% من الحد
             if len(self.memory_cache) > self.config.cache_size_limit:
-                self._cleanup_memory_cache()
-            
-            # تخزين دائم
-            if self.config.persistent_cache:
-                try:
-                    value_blob = pickle.dumps(value)
-                    self.conn.execute(
-                        "INSERT OR REPLACE INTO cache (key, value, timestamp) VALUES (?, ?, ?)",
-                        (key, value_blob, int(time.time()))
-                    )
-                    self.conn.commit()
-                except Exception as e:
-                    logger.debug(f"خطأ في كتابة التخزين المؤقت: {str(e)}")
-    
-    def _cleanup_memory_cache(self):
-        """تنظيف ذاكرة التخزين المؤقت"""
-        # الاحتفاظ بالعناصر الأكثر استخداماً
-        sorted_items = sorted(
-            self.access_count.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )
-        
-        keep_count = int(self.config.cache_size_limit * 0.7)
-        keys_to_keep = {item[0] for item in sorted_items[:keep_count]}
-        
-        # حذف العناصر القديمة
-        keys_to_remove = set(self.memory_cache.keys()) - keys_to_keep
-        for key in keys_to_remove:
-            del self.memory_cache[key]
-            self.access_count.pop(key, None)
+                keep_count = int(self.config.cache_size_limit * 0.7)
+                while len(self.memory_cache) > keep_count:
+                    self.memory_cache.popitem(last=False)
+
+# عناصر HTML الأساسية ورسائل صفحات الخطأ (نمط بديل واحد بدل حلقة any على كل عبارة)
+# IGNORECASE بدل html.lower() - لا نسخة ثانية من الصفحة
+_ESSENTIAL_TAGS_PATTERN = r'<html|<body|<div'
+_ERROR_PAGE_PATTERN = (
+    r'error 404|not found|page not found|access denied|forbidden|server error'
+    r'|temporarily unavailable|maintenance'
+)
+_ESSENTIAL_TAGS_RE = re.compile(_ESSENTIAL_TAGS_PATTERN, re.IGNORECASE)
+_ERROR_PAGE_RE = re.compile(_ERROR_PAGE_PATTERN, re.IGNORECASE)
+# المجموعتان معاً: أول تطابق يحدد أي مجموعة تظهر أولاً في HTML
+_HTML_SCAN_RE = re.compile(f'(?P<tag>{_ESSENTIAL_TAGS_PATTERN})|(?P<error>{_ERROR_PAGE_PATTERN})', re.IGNORECASE)
+
+# جدول translate يحذف الحروف العربية: عددها = الطول قبل الحذف - الطول بعده
+_NON_ARABIC_TRANS = dict.fromkeys(range(0x0600, 0x0700))
 
 class DataValidator:
     """مدقق البيانات المتقدم"""
@@ -214,21 +439,23 @@ class DataValidator:
             logger.warning(f"⚠️ HTML قصير جداً للرابط: {url}")
             return False
         
+        # مسح واحد: إن ظهر وسم أساسي أولاً فلا خطأ قبله ويكمل البحث عن الأخطاء بعده فقط
+        first = _HTML_SCAN_RE.search(html)
+        if first is not None and first.lastgroup == 'tag':
+            has_tag = True
+            has_error = _ERROR_PAGE_RE.search(html, first.end()) is not None
+        else:
+            has_error = first is not None
+            # مسار الفشل فقط: هل يوجد وسم أساسي بعد رسالة الخطأ
+            has_tag = has_error and _ESSENTIAL_TAGS_RE.search(html, first.end()) is not None
+        
         # فحص وجود عناصر أساسية
-        if self.config.validate_html_structure:
-            essential_tags = ['<html', '<body', '<div']
-            if not any(tag in html.lower() for tag in essential_tags):
-                logger.warning(f"⚠️ HTML غير صالح للرابط: {url}")
-                return False
+        if self.config.validate_html_structure and not has_tag:
+            logger.warning(f"⚠️ HTML غير صالح للرابط: {url}")
+            return False
         
         # فحص رسائل الخطأ
-        error_indicators = [
-            'error 404', 'not found', 'page not found',
-            'access denied', 'forbidden', 'server error',
-            'temporarily unavailable', 'maintenance'
-        ]
-        html_lower = html.lower()
-        if any(error in html_lower for error in error_indicators):
+        if has_error:
             logger.warning(f"⚠️ صفحة خطأ مكتشفة للرابط: {url}")
             return False
         
@@ -246,8 +473,8 @@ class DataValidator:
         
         if self.config.check_content_quality:
             # فحص جودة المحتوى
-            arabic_chars = len(re.findall(r'[\u0600-\u06FF]', content))
             total_chars = len(content)
+            arabic_chars = total_chars - len(content.translate(_NON_ARABIC_TRANS))
             
             if total_chars > 0:
                 arabic_ratio = arabic_chars / total_chars
@@ -275,8 +502,32 @@ class ProgressiveLoader:
         self.config = config
         self.book_id = book_id
         self.checkpoint_file = Path(f"checkpoint_{book_id}.json")
-        self.loaded_pages = set()
-        self.failed_pages = set()
+        self.loaded_pages = self._page_set()
+        self.failed_pages = self._page_set()
+    
+    @staticmethod
+    def _page_set(pages=()):
+        """مجموعة أرقام صفحات: BitMap عند توفر pyroaring وإلا set"""
+        return BitMap(pages) if PYROARING_AVAILABLE else set(pages)
+    
+    @staticmethod
+    def _encode_pages(pages) -> Union[str, List[int]]:
+        """ترميز مجموعة الصفحات للحفظ: خريطة بت base64 أو قائمة أرقام"""
+        if PYROARING_AVAILABLE:
+            # مدى الصفحات المتصلة يُخزن كحاوية run بدل خريطة بت كاملة
+            pages.run_optimize()
+            return base64.b64encode(pages.serialize()).decode('ascii')
+        return list(pages)
+    
+    def _decode_pages(self, data: Dict, name: str):
+        """قراءة مجموعة الصفحات من نقطة التفتيش بأي من الصيغتين"""
+        encoded = data.get(f'{name}_rbm')
+        if encoded is not None:
+            if not PYROARING_AVAILABLE:
+                logger.warning(f"⚠️ نقطة التفتيش تتطلب pyroaring لقراءة {name} - سيعاد تحميل الصفحات")
+                return self._page_set()
+            return BitMap.deserialize(base64.b64decode(encoded))
+        return self._page_set(data.get(name, []))
     
     def load_checkpoint(self) -> Dict:
         """تحميل نقطة التفتيش"""
@@ -284,11 +535,11 @@ class ProgressiveLoader:
             return {}
         
         try:
-            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            raw = self.checkpoint_file.read_bytes()
+            data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
             
-            self.loaded_pages = set(data.get('loaded_pages', []))
-            self.failed_pages = set(data.get('failed_pages', []))
+            self.loaded_pages = self._decode_pages(data, 'loaded_pages')
+            self.failed_pages = self._decode_pages(data, 'failed_pages')
             
             logger.info(f"📂 تم تحميل نقطة التفتيش: {len(self.loaded_pages)} صفحة محملة")
             return data.get('book_data', {})
@@ -303,16 +554,25 @@ class ProgressiveLoader:
             return
         
         try:
+            # مع pyroaring تُحفظ المجموعات تحت مفاتيح *_rbm
+            pages_suffix = '_rbm' if PYROARING_AVAILABLE else ''
             checkpoint_data = {
                 'book_data': book_data,
-                'loaded_pages': list(self.loaded_pages),
-                'failed_pages': list(self.failed_pages),
+                f'loaded_pages{pages_suffix}': self._encode_pages(self.loaded_pages),
+                f'failed_pages{pages_suffix}': self._encode_pages(self.failed_pages),
                 'timestamp': time.time(),
                 'total_pages': len(pages_data)
             }
             
-            with open(self.checkpoint_file, 'w', encoding='utf-8') as f:
-                json.dump(checkpoint_data, f, ensure_ascii=False, indent=2)
+            if ORJSON_AVAILABLE:
+                buf = orjson.dumps(checkpoint_data, option=orjson.OPT_NON_STR_KEYS)
+            else:
+                buf = json.dumps(checkpoint_data, ensure_ascii=False).encode('utf-8')
+            
+            # كتابة ذرية: انقطاع أثناء الحفظ لا يترك نقطة تفتيش تالفة
+            tmp_file = self.checkpoint_file.with_suffix('.tmp')
+            tmp_file.write_bytes(buf)
+            os.replace(tmp_file, self.checkpoint_file)
                 
         except Exception as e:
             logger.error(f"❌ فشل في حفظ نقطة التفتيش: {str(e)}")
@@ -362,6 +622,10 @@ class UltraReliableExtractor:
             'start_time': time.time()
         }
         self.stats_lock = threading.Lock()
+        # عدادات الدفعة الجارية: تُحدث من خيط حلقة الأحداث وحده بلا قفل وتُدمج مرة لكل دفعة
+        self._batch_stats = Counter()
+        # محدد معدل الطلبات أثناء استخراج الصفحات (None = تأخير بين الدفعات)
+        self._limiter = None
     
     def extract_book_ultra_reliable(self, book_id: str, max_pages: Optional[int] = None) -> Dict:
         """استخراج الكتاب بموثوقية 100%"""
@@ -399,12 +663,16 @@ class UltraReliableExtractor:
                 logger.info(f"📄 استخراج {actual_max} صفحة من أصل {total_pages}")
                 
                 # استخراج الصفحات بموثوقية كاملة
-                pages_data = self._extract_pages_ultra_reliable(
-                    session, book_id, actual_max, loader
-                )
+                loop = self._new_event_loop()
+                try:
+                    pages_data = loop.run_until_complete(self._extract_pages_ultra_reliable(
+                        book_id, actual_max, loader
+                    ))
+                finally:
+                    loop.close()
                 
                 # دمج البيانات النهائية
-                final_data = {**book_data, 'pages': pages_data}
+                final_data = {**book_data, 'pages': [asdict(page) for page in pages_data]}
                 
                 # التحقق النهائي
                 success_rate = len(pages_data) / actual_max if actual_max > 0 else 0
@@ -417,6 +685,9 @@ class UltraReliableExtractor:
                 # تنظيف نقطة التفتيش
                 loader.cleanup_checkpoint()
                 
+                # كتابة ما تبقى من التخزين المؤقت قبل انتهاء العملية
+                self.cache.flush()
+                
                 # إحصائيات نهائية
                 elapsed = time.time() - start_time
                 with self.stats_lock:
@@ -476,86 +747,195 @@ class UltraReliableExtractor:
         
         return book_data
     
-    def _extract_pages_ultra_reliable(self, session: UltraReliableSession, book_id: str, 
-                                    max_pages: int, loader: ProgressiveLoader) -> List[Dict]:
+    def _new_event_loop(self) -> asyncio.AbstractEventLoop:
+        """حلقة أحداث جديدة - uvloop عند توفره وتفعيله وإلا حلقة asyncio الافتراضية"""
+        if self.config.use_uvloop and UVLOOP_AVAILABLE:
+            return uvloop.new_event_loop()
+        return asyncio.new_event_loop()
+    
+    def _open_http_client(self) -> Union[aiohttp.ClientSession, 'httpx.AsyncClient']:
+        """
+        فتح جلسة الصفحات المشتركة
+        مع httpx وHTTP/2 تتعدد كل طلبات الكتاب على اتصال واحد بدل اتصال لكل طلب
+        """
+        reliability = self.config.reliability
+        max_workers = self.config.max_workers
+        
+        if self.config.http_client == 'httpx':
+            if not HTTPX_AVAILABLE:
+                logger.warning("⚠️ httpx غير مثبت - سيتم استخدام aiohttp")
+            else:
+                http2 = H2_AVAILABLE
+                if not http2:
+                    logger.warning("⚠️ حزمة h2 غير مثبتة (httpx[http2]) - سيتم استخدام HTTP/1.1")
+                return httpx.AsyncClient(
+                    http2=http2,
+                    headers=PAGE_HEADERS,
+                    verify=reliability.verify_ssl,
+                    timeout=httpx.Timeout(reliability.total_timeout, connect=reliability.connection_timeout,
+                                          read=reliability.read_timeout),
+                    limits=httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers,
+                                        keepalive_expiry=60)
+                )
+        
+        connector = aiohttp.TCPConnector(
+            limit=max_workers,
+            limit_per_host=max_workers,
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+            ssl=None if reliability.verify_ssl else False
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=reliability.total_timeout,
+            connect=reliability.connection_timeout,
+            sock_read=reliability.read_timeout
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=PAGE_HEADERS,
+                                     auto_decompress=True)
+    
+    @staticmethod
+    async def _get(http: Union[aiohttp.ClientSession, 'httpx.AsyncClient'], url: str) -> Tuple[int, Optional[str]]:
+        """طلب GET واحد: (رمز الحالة، النص عند 200)"""
+        if HTTPX_AVAILABLE and isinstance(http, httpx.AsyncClient):
+            response = await http.get(url)
+            return response.status_code, response.text if response.status_code == 200 else None
+        async with http.get(url) as response:
+            return response.status, await response.text() if response.status == 200 else None
+    
+    async def _fetch(self, http: Union[aiohttp.ClientSession, 'httpx.AsyncClient'], url: str,
+                     semaphore: asyncio.Semaphore) -> Optional[str]:
+        """جلب صفحة عبر الجلسة المشتركة مع إعادة المحاولة للأخطاء المؤقتة"""
+        reliability = self.config.reliability
+        
+        for attempt in range(reliability.max_retries):
+            try:
+                # انتظار الرمز قبل السيمافور حتى لا يُحجز مكان اتصال أثناء الانتظار
+                if self._limiter is not None:
+                    await self._limiter.acquire()
+                async with semaphore:
+                    status, html = await self._get(http, url)
+                if status == 200:
+                    return html
+                if status in (404, 403, 410):
+                    # أخطاء دائمة - لا تحاول مرة أخرى
+                    logger.error(f"❌ خطأ دائم {status} للرابط: {url}")
+                    return None
+                error = f"HTTP {status}"
+            except _HTTP_ERRORS as e:
+                error = str(e) or type(e).__name__
+            
+            if attempt < reliability.max_retries - 1:
+                self._batch_stats['retries_used'] += 1
+                logger.warning(f"⚠️ فشل في الطلب (محاولة {attempt + 1}/{reliability.max_retries}): {error}")
+                # الانتظار خارج السيمافور حتى لا يحجز مكان طلب آخر
+                await asyncio.sleep(reliability.retry_backoff_factor * (2 ** attempt))
+        
+        logger.error(f"💥 فشل نهائي في الطلب بعد {reliability.max_retries} محاولات: {url}")
+        return None
+    
+    async def _extract_pages_ultra_reliable(self, book_id: str, max_pages: int, 
+                                            loader: ProgressiveLoader) -> List[PageRecord]:
         """استخراج الصفحات بموثوقية 100%"""
         
-        pages_data = []
+        # خانة لكل رقم صفحة: النتائج تصل بترتيب اكتمالها وتوضع في مكانها مباشرة بلا فرز
+        pages_data: List[Optional[PageRecord]] = [None] * (max_pages + 1)
+        loaded_count = 0
         
-        # تحديد الصفحات المطلوب تحميلها
-        pages_to_load = [i for i in range(1, max_pages + 1) if loader.should_load_page(i)]
+        # تحديد الصفحات المطلوب تحميلها: مولد يُقرأ دفعة دفعة بدل قائمة بكل الصفحات
+        all_pages = range(1, max_pages + 1)
+        if loader.loaded_pages:
+            pages_to_load = itertools.filterfalse(loader.loaded_pages.__contains__, all_pages)
+            pending_count = max_pages - sum(1 for page_num in loader.loaded_pages if page_num <= max_pages)
+        else:
+            # كتاب جديد: لا حاجة لفحص كل صفحة
+            pages_to_load = iter(all_pages)
+            pending_count = max_pages
         
-        logger.info(f"📄 صفحات جديدة للتحميل: {len(pages_to_load)}")
+        logger.info(f"📄 صفحات جديدة للتحميل: {pending_count}")
         
-        # معالجة بالدفعات
-        for batch_start in range(0, len(pages_to_load), self.config.batch_size):
-            batch_end = min(batch_start + self.config.batch_size, len(pages_to_load))
-            batch_pages = pages_to_load[batch_start:batch_end]
-            
-            logger.info(f"📦 معالجة دفعة {batch_start//self.config.batch_size + 1}: صفحات {batch_pages[0]}-{batch_pages[-1]}")
-            
-            # معالجة متوازية للدفعة
-            batch_results = self._process_batch_ultra_reliable(session, book_id, batch_pages)
-            
-            # معالجة النتائج
-            for page_num, page_data in batch_results.items():
-                if page_data:
-                    pages_data.append(page_data)
-                    loader.mark_page_loaded(page_num)
-                    with self.stats_lock:
-                        self.stats['pages_successful'] += 1
-                else:
-                    loader.mark_page_failed(page_num)
-                    with self.stats_lock:
-                        self.stats['pages_failed'] += 1
-            
-            # حفظ نقطة تفتيش
-            if len(pages_data) % self.config.checkpoint_interval == 0:
-                loader.save_checkpoint({'shamela_id': book_id}, {p['page_number']: p for p in pages_data})
-            
-            # تأخير تكيفي
-            if self.config.adaptive_delay:
-                delay = self.config.request_delay
-                # زيادة التأخير إذا كان هناك فشل
-                failure_rate = self.stats['pages_failed'] / max(self.stats['pages_processed'], 1)
-                if failure_rate > 0.1:
-                    delay *= (1 + failure_rate)
+        semaphore = asyncio.Semaphore(self.config.max_workers)
+        
+        # نفس ميزانية التأخير القديم (دفعة كل request_delay) موزعة على الطلبات بلا توقف بين الدفعات
+        base_rate = self.config.batch_size / self.config.request_delay if self.config.request_delay > 0 else 0
+        if self.config.adaptive_delay and base_rate and AIOLIMITER_AVAILABLE:
+            self._limiter = AsyncLimiter(max_rate=self.config.batch_size, time_period=self.config.request_delay)
+        else:
+            self._limiter = None
+        
+        # جلسة واحدة للكتاب كله: اتصالات keep-alive وذاكرة DNS تُعاد بين الدفعات
+        async with self._open_http_client() as http:
+            # معالجة بالدفعات
+            for batch_index in itertools.count(1):
+                batch_pages = list(itertools.islice(pages_to_load, self.config.batch_size))
+                if not batch_pages:
+                    break
+                
+                logger.info(f"📦 معالجة دفعة {batch_index}: صفحات {batch_pages[0]}-{batch_pages[-1]}")
+                
+                # معالجة متزامنة للدفعة
+                batch_results = await self._process_batch_ultra_reliable(http, semaphore, book_id, batch_pages)
+                
+                # معالجة النتائج
+                for page_num, page_data in batch_results.items():
+                    if page_data:
+                        pages_data[page_num] = page_data
+                        loaded_count += 1
+                        loader.mark_page_loaded(page_num)
+                        self._batch_stats['pages_successful'] += 1
+                    else:
+                        loader.mark_page_failed(page_num)
+                        self._batch_stats['pages_failed'] += 1
+                self._merge_batch_stats()
+                
+                # حفظ نقطة تفتيش
+                if loaded_count % self.config.checkpoint_interval == 0:
+                    loader.save_checkpoint({'shamela_id': book_id}, {p.page_number: p for p in pages_data if p})
                 
-                time.sleep(delay)
+                # تأخير تكيفي
+                if self.config.adaptive_delay:
+                    # إبطاء المعدل إذا كان هناك فشل
+                    failure_rate = self.stats['pages_failed'] / max(self.stats['pages_processed'], 1)
+                    slowdown = 1 + failure_rate if failure_rate > 0.1 else 1
+                    
+                    if self._limiter is not None:
+                        self._limiter._rate_per_sec = base_rate / slowdown
+                    else:
+                        await asyncio.sleep(self.config.request_delay * slowdown)
         
-        return sorted(pages_data, key=lambda p: p.get('page_number', 0))
+        return [page_data for page_data in pages_data if page_data]
     
-    def _process_batch_ultra_reliable(self, session: UltraReliableSession, book_id: str, 
-                                    page_numbers: List[int]) -> Dict[int, Optional[Dict]]:
+    async def _process_batch_ultra_reliable(self, http: Union[aiohttp.ClientSession, 'httpx.AsyncClient'],
+                                            semaphore: asyncio.Semaphore,
+                                            book_id: str, page_numbers: List[int]) -> Dict[int, Optional[PageRecord]]:
         """معالجة دفعة من الصفحات بموثوقية كاملة"""
         
         results = {}
         
-        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-            # إرسال المهام
-            future_to_page = {
-                executor.submit(self._extract_single_page_reliable, session, book_id, page_num): page_num
-                for page_num in page_numbers
-            }
-            
-            # جمع النتائج
-            for future in as_completed(future_to_page):
-                page_num = future_to_page[future]
-                try:
-                    page_data = future.result(timeout=60)  # مهلة زمنية لكل صفحة
-                    results[page_num] = page_data
-                    
-                except Exception as e:
-                    logger.error(f"❌ فشل في معالجة الصفحة {page_num}: {str(e)}")
-                    results[page_num] = None
-                
-                with self.stats_lock:
-                    self.stats['pages_processed'] += 1
+        page_results = await asyncio.gather(
+            *(self._extract_single_page_reliable(http, semaphore, book_id, page_num) for page_num in page_numbers),
+            return_exceptions=True
+        )
         
+        # جمع النتائج
+        for page_num, page_data in zip(page_numbers, page_results):
+            if isinstance(page_data, BaseException):
+                logger.error(f"❌ فشل في معالجة الصفحة {page_num}: {str(page_data)}")
+                page_data = None
+            results[page_num] = page_data
+        
+        self._batch_stats['pages_processed'] += len(page_numbers)
         return results
     
-    def _extract_single_page_reliable(self, session: UltraReliableSession, book_id: str, 
-                                     page_num: int) -> Optional[Dict]:
+    def _merge_batch_stats(self):
+        """دمج عدادات الدفعة في الإحصائيات العامة بقفل واحد"""
+        with self.stats_lock:
+            for name, count in self._batch_stats.items():
+                self.stats[name] += count
+        self._batch_stats.clear()
+    
+    async def _extract_single_page_reliable(self, http: Union[aiohttp.ClientSession, 'httpx.AsyncClient'],
+                                            semaphore: asyncio.Semaphore,
+                                            book_id: str, page_num: int) -> Optional[PageRecord]:
         """استخراج صفحة واحدة بموثوقية كاملة"""
         
         url = f"https://shamela.ws/book/{book_id}/{page_num}"
@@ -564,16 +944,14 @@ class UltraReliableExtractor:
         # فحص التخزين المؤقت
         cached_data = self.cache.get(cache_key)
         if cached_data:
-            with self.stats_lock:
-                self.stats['pages_from_cache'] += 1
-            return cached_data
+            self._batch_stats['pages_from_cache'] += 1
+            return PageRecord(**cached_data)
         
         try:
             # تحميل الصفحة
-            response = session.get(url)
-            html = response.text
+            html = await self._fetch(http, url, semaphore)
             
-            if not self.validator.validate_html_response(html, url):
+            if html is None or not self.validator.validate_html_response(html, url):
                 return None
             
             # استخراج المحتوى (هنا نضع المعالجة الفعلية)
@@ -582,17 +960,10 @@ class UltraReliableExtractor:
             if not self.validator.validate_page_content(content, page_num):
                 return None
             
-            page_data = {
-                'page_number': page_num,
-                'content': content,
-                'word_count': len(content.split()),
-                'char_count': len(content),
-                'url': url,
-                'extraction_time': time.time()
-            }
+            page_data = PageRecord(page_num, content, count_words(content), len(content), url, time.time())
             
-            # حفظ في التخزين المؤقت
-            self.cache.set(cache_key, page_data)
+            # حفظ في التخزين المؤقت (قاموس عند حدود التسلسل فقط)
+            self.cache.set(cache_key, asdict(page_data))
             
             return page_data
             
@@ -601,10 +972,25 @@ class UltraReliableExtractor:
             return None
     
     def _parse_page_content(self, html: str) -> str:
-        """استخراج محتوى الصفحة من HTML"""
-        # هنا ستكون المعالجة الفعلية للـ HTML
-        # للبساطة، سنعيد نص تجريبي
-        return f"محتوى تجريبي للصفحة - {len(html)} حرف HTML"
+        """استخراج محتوى الصفحة من HTML (نص div.nass)"""
+        if LXML_AVAILABLE:
+            try:
+                tree = lxml_html.fromstring(html, parser=_PAGE_PARSER)
+            except (etree.ParserError, ValueError):
+                return ""
+            nass = _NASS_XPATH(tree)
+            if not nass:
+                return ""
+            # عُقد النص مفصولة بسطر جديد (مثل get_text(separator="\n", strip=True))
+            # حتى لا تلتصق كلمات الأسطر المفصولة بـ <br> أو الوسوم المضمنة
+            return '\n'.join(stripped for stripped in (s.strip() for s in _NASS_TEXT_XPATH(nass[0])) if stripped)
+        
+        content_elem = BeautifulSoup(html, 'html.parser').select_one('div.nass')
+        return content_elem.get_text(separator="\n", strip=True) if content_elem is not None else ""
+    
+    def close(self):
+        """إيقاف الموارد الخلفية (خيط كتابة التخزين المؤقت)"""
+        self.cache.close()
     
     def get_stats(self) -> Dict:
         """الحصول على إحصائيات مفصلة"""
@@ -625,7 +1011,10 @@ def extract_book_ultra_reliable(book_id: str, max_pages: Optional[int] = None,
         config = UltraReliableConfig(reliability=create_ultra_reliable_config())
     
     extractor = UltraReliableExtractor(config)
-    return extractor.extract_book_ultra_reliable(book_id, max_pages)
+    try:
+        return extractor.extract_book_ultra_reliable(book_id, max_pages)
+    finally:
+        extractor.close()
 
 # مثال على الاستخدام
 if __name__ == "__main__":
@@ -650,6 +1039,7 @@ if __name__ == "__main__":
         # طباعة الإحصائيات
         extractor = UltraReliableExtractor(config)
         stats = extractor.get_stats()
+        extractor.close()
         print(f"📊 معدل النجاح: {stats['success_rate']:.2f}%")
         print(f"💾 معدل نجاح التخزين المؤقت: {stats['cache_hit_rate']:.2f}%")
         
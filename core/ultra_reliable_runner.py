@@ -258,6 +258,7 @@ def extract_book_ultra_reliable_cli(book_id: str, max_pages: Optional[int] = Non
         # إحصائيات الموثوقية
         extractor = UltraReliableExtractor(config)
         stats = extractor.get_stats()
+        extractor.close()
         if stats['pages_processed'] > 0:
             print(f"✅ معدل النجاح: {stats['success_rate']:.2f}%")
             print(f"💾 معدل نجاح التخزين المؤقت: {stats['cache_hit_rate']:.2f}%")
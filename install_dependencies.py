@@ -23,6 +23,12 @@ REQUIRED_PACKAGES = [
     'urllib3'
 ]
 
+# مكتبات اختيارية لتسريع الأداء - الكود يعمل بدونها، وفشل تثبيتها لا يُعد خطأ
+OPTIONAL_PACKAGES = [
+    'brotli',
+    'orjson'
+]
+
 def check_package_installed(package_name):
     """فحص ما إذا كانت المكتبة مثبتة"""
     try:
@@ -99,6 +105,14 @@ def main():
             else:
                 failed_count += 1
     
+    for package in OPTIONAL_PACKAGES:
+        print(f"\n📦 فحص {package} (اختياري)...")
+        
+        if check_package_installed(package):
+            print(f"✅ {package} مثبت مسبقاً")
+        elif not install_package(package):
+            print(f"⚠️ تعذر تثبيت {package} - سيتم العمل بدونه")
+    
     print("\n" + "=" * 50)
     print("📊 ملخص التثبيت:")
     print(f"✅ مثبت مسبقاً: {already_installed}")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+اختبارات دوال تحليل الصفحات وترتيبها في enhanced_shamela_scraper
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core'))
+
+import enhanced_shamela_scraper as scraper
+from enhanced_shamela_scraper import (
+    PageContent, _extract_page_id, count_words, _finish_page_text, _place_page, _collect_placed_pages, _order_pages_by_index
+)
+
+SAMPLE_PAGE = """<html><head><title>كتاب الاختبار</title></head>
+<body>
+<nav>قائمة التنقل</nav>
+<div class="col-md-9">
+  <div class="nass margin-top-10">
+    <p>بسم الله <b>الرحمن</b> الرحيم</p>
+    الحمد لله<br>رب العالمين
+    <div class="share">شارك الصفحة</div>
+    <script>var x = 1;</script>
+    <span class="hamesh">(1) حاشية</span>
+  </div>
+</div>
+</body></html>"""
+
+
+def _page(page_number, page_index_internal=None):
+    return PageContent(page_number=page_number, content=f"صفحة {page_number}",
+                       page_index_internal=page_index_internal)
+
+
+class TestExtractPageId(unittest.TestCase):
+    """رقم الصفحة من روابط /book/{id}/{N}"""
+
+    def test_page_link(self):
+        self.assertEqual(_extract_page_id("12", "/book/12/345"), 345)
+        self.assertEqual(_extract_page_id("12", "https://shamela.ws/book/12/7#p1"), 7)
+
+    def test_other_book_or_no_page(self):
+        self.assertIsNone(_extract_page_id("1", "/book/12/5"))
+        self.assertIsNone(_extract_page_id("12", "/book/12/"))
+        self.assertIsNone(_extract_page_id("12", "/author/12"))
+
+
+class TestCountWords(unittest.TestCase):
+    """count_words مطابق لـ len(text.split())"""
+
+    def test_matches_split(self):
+        samples = [
+            "",
+            "كلمة",
+            "  بسم الله   الرحمن الرحيم  ",
+            "سطر أول\nسطر ثان\t\tمع تبويب\r\n",
+            "mixed عربي and English 123",
+        ]
+        for text in samples:
+            with self.subTest(text=text):
+                self.assertEqual(count_words(text), len(text.split()))
+
+
+class TestFinishPageText(unittest.TestCase):
+    """تجميع عقد النص كما في get_text(separator="\\n", strip=True)"""
+
+    def test_strips_and_drops_empty_nodes(self):
+        self.assertEqual(_finish_page_text(["  أ ", "\n", "", "ب\t"]), "أ\nب")
+
+    def test_empty(self):
+        self.assertEqual(_finish_page_text([]), "")
+
+
+class TestPagePlacement(unittest.TestCase):
+    """ترتيب الصفحات بالخانات حسب الترقيم الداخلي"""
+
+    def test_orders_by_internal_index(self):
+        pages = [_page(30, 3), _page(10, 1), _page(20, 2)]
+        ordered = _order_pages_by_index(pages, 3)
+        self.assertEqual([p.page_index_internal for p in ordered], [1, 2, 3])
+
+    def test_falls_back_to_page_number(self):
+        ordered = _order_pages_by_index([_page(2), _page(1)], 2)
+        self.assertEqual([p.page_number for p in ordered], [1, 2])
+
+    def test_missing_slots_are_skipped(self):
+        ordered = _order_pages_by_index([_page(3, 3), _page(1, 1)], 5)
+        self.assertEqual([p.page_number for p in ordered], [1, 3])
+
+    def test_out_of_range_pages_are_kept_after_ordered_pages(self):
+        page_slots = [None] * 2
+        stray_pages = []
+        for page in (_page(9, 9), _page(2, 2), _page(0, 0), _page(1, 1)):
+            _place_page(page_slots, page, stray_pages)
+        self.assertEqual([p.page_number for p in stray_pages], [9, 0])
+        self.assertEqual([p.page_number for p in _collect_placed_pages(page_slots, stray_pages)],
+                         [1, 2, 9, 0])
+
+
+@unittest.skipUnless(scraper.LXML_AVAILABLE, "lxml غير مثبت")
+class TestPageParsers(unittest.TestCase):
+    """مسارات تحليل الصفحة (SAX و lxml و BeautifulSoup) تعطي نفس النص"""
+
+    raw_html = SAMPLE_PAGE.encode('utf-8')
+
+    def test_lxml_matches_bs4(self):
+        lxml_content, _, lxml_title, _ = scraper._parse_page_lxml(self.raw_html, False)
+        bs4_content, _, bs4_title, _ = scraper._parse_page_bs4(self.raw_html, 'html.parser', False)
+        self.assertEqual(lxml_content, bs4_content)
+        self.assertEqual(lxml_title, bs4_title)
+
+    def test_sax_matches_lxml(self):
+        sax_content, sax_html, sax_title, sax_words = scraper._parse_page_sax(self.raw_html)
+        lxml_content, _, lxml_title, _ = scraper._parse_page_lxml(self.raw_html, False)
+        self.assertIsNone(sax_html)
+        self.assertEqual(sax_content, lxml_content)
+        self.assertEqual(sax_title, lxml_title)
+        self.assertEqual(sax_words, len(sax_content.split()))
+
+    def test_content_is_main_div_without_unwanted_elements(self):
+        content, _, title, _ = scraper._parse_page_lxml(self.raw_html, False)
+        self.assertEqual(title, "كتاب الاختبار")
+        self.assertEqual(content.split("\n"),
+                         ["بسم الله", "الرحمن", "الرحيم", "الحمد لله", "رب العالمين", "(1) حاشية"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+اختبارات تحليل محتوى الصفحة وعد الكلمات في ultra_reliable_extractor
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core'))
+
+from ultra_reliable_extractor import UltraReliableExtractor, count_words
+
+
+class TestCountWords(unittest.TestCase):
+    """count_words مطابق لـ len(text.split())"""
+
+    def test_matches_split(self):
+        for text in ("", "   ", "كلمة", " بسم  الله\nالرحمن\tالرحيم ", "a b\r\nc"):
+            with self.subTest(text=text):
+                self.assertEqual(count_words(text), len(text.split()))
+
+
+class TestParsePageContent(unittest.TestCase):
+    """نص div.nass مفصول بأسطر"""
+
+    def setUp(self):
+        # _parse_page_content لا يعتمد على حالة المستخرج - لا حاجة لتهيئة التخزين المؤقت
+        self.extractor = UltraReliableExtractor.__new__(UltraReliableExtractor)
+
+    def test_lines_are_not_glued(self):
+        html = ('<html><body><div class="header">رأس</div>'
+                '<div class="nass">الحمد لله<br>رب <b>العالمين</b></div></body></html>')
+        self.assertEqual(self.extractor._parse_page_content(html), "الحمد لله\nرب\nالعالمين")
+
+    def test_nass_with_extra_classes(self):
+        html = '<div class="margin nass">نص</div><div class="nass">نص آخر</div>'
+        self.assertEqual(self.extractor._parse_page_content(html), "نص")
+
+    def test_missing_nass(self):
+        self.assertEqual(self.extractor._parse_page_content('<div class="nassx">نص</div>'), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+اختبارات قراءة روابط قائمة الأجزاء في enhanced_shamela_scraper
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core'))
+
+from bs4 import BeautifulSoup
+
+import enhanced_shamela_scraper as scraper
+from enhanced_shamela_scraper import _select_dropdown_links
+
+# قائمة تنقل (ليست أجزاء) قبل قائمة الأجزاء، وبعض روابط الأجزاء بلا #p1
+MIXED_DROPDOWNS_PAGE = """<html><body>
+<ul class="dropdown-menu">
+  <li><a href="/share">شارك</a></li>
+  <li><a href="/book/5/9">الفصل 3</a></li>
+</ul>
+<div class="dropdown">
+  <ul class="dropdown-menu">
+    <li><a href="/book/5/1#p1">1</a></li>
+    <li><a href="/book/5/120">٢</a></li>
+    <li><a href="/book/5/240#p1">3</a></li>
+  </ul>
+</div>
+</body></html>"""
+
+# لا روابط #p1: تُقبل روابط الكتاب ذات الأرقام
+NO_P1_PAGE = """<html><body>
+<ul class="dropdown-menu"><li><a href="/about">عن المكتبة</a></li></ul>
+<ul class="dropdown-menu"><li><a href="/book/5/1">١</a></li><li><a href="/book/5/80">٢</a></li></ul>
+</body></html>"""
+
+# قائمة dropdown ليست ul
+DIV_MENU_PAGE = """<html><body>
+<div class="dropdown-menu"><a href="/book/5/1">1</a><a href="/book/5/50#p1">2</a></div>
+</body></html>"""
+
+
+@unittest.skipUnless(scraper.LXML_AVAILABLE, "lxml غير مثبت")
+class TestStreamDropdownLinks(unittest.TestCase):
+    """المحلل التدريجي يعطي نفس روابط محددات BeautifulSoup"""
+
+    def assert_same_links(self, html):
+        for chunk_size in (17, 65536):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    scraper._stream_dropdown_links(html.encode('utf-8'), "5", chunk_size=chunk_size),
+                    _select_dropdown_links(BeautifulSoup(html, 'html.parser'), "5")
+                )
+
+    def test_p1_links_across_document_win(self):
+        self.assert_same_links(MIXED_DROPDOWNS_PAGE)
+        self.assertEqual(scraper._stream_dropdown_links(MIXED_DROPDOWNS_PAGE.encode('utf-8'), "5"),
+                         [("/book/5/1#p1", "1"), ("/book/5/240#p1", "3")])
+
+    def test_links_without_p1(self):
+        self.assert_same_links(NO_P1_PAGE)
+
+    def test_non_ul_menu(self):
+        self.assert_same_links(DIV_MENU_PAGE)
+
+    def test_no_menu(self):
+        self.assert_same_links("<html><body><a href='/book/5/1#p1'>1</a></body></html>")
+
+
+if __name__ == "__main__":
+    unittest.main()